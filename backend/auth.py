@@ -1,11 +1,13 @@
-from fastapi import HTTPException, Depends, status
+from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from bson import ObjectId
+from services.cache import TTLCache
+from services.offload import BoundedExecutor
 import os
 
 # JWT Configuration
@@ -13,8 +15,27 @@ SECRET_KEY = os.getenv("JWT_SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
-# Password hashing
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Embed username/email/avatar claims in tokens so authenticated requests can
+# skip the user lookup entirely. Claims stay as issued until the token expires.
+TOKEN_CLAIMS_ENABLED = os.getenv("AUTH_TOKEN_CLAIMS", "false").lower() == "true"
+
+# Authenticated user cache
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+user_cache = TTLCache(USER_CACHE_MAX_SIZE, USER_CACHE_TTL_SECONDS)
+
+# Database handle, injected once by init_auth
+_database: Optional[AsyncIOMotorDatabase] = None
+
+# Password hashing. Hashes stored with a different cost are upgraded on the
+# next successful login.
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# bcrypt is CPU-bound, so it runs on a bounded pool instead of the event loop
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_QUEUE = int(os.getenv("PASSWORD_HASH_MAX_QUEUE", "64"))
+password_executor = BoundedExecutor("bcrypt", PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE)
 
 # HTTP Bearer token
 security = HTTPBearer()
@@ -27,6 +48,44 @@ def get_password_hash(password: str) -> str:
     """Hash a password"""
     return pwd_context.hash(password)
 
+async def hash_password(password: str) -> str:
+    """Hash a password on the password pool"""
+    return await password_executor.run(pwd_context.hash, password)
+
+async def verify_and_update_password(
+    plain_password: str,
+    hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """Verify a password on the password pool
+
+    Returns the verification result and, when the stored hash uses outdated
+    parameters, a replacement hash to persist.
+    """
+    return await password_executor.run(
+        pwd_context.verify_and_update, plain_password, hashed_password
+    )
+
+def init_auth(db: AsyncIOMotorDatabase):
+    """Inject the database used to resolve authenticated users"""
+    global _database
+    _database = db
+
+def invalidate_user(user_id: str):
+    """Drop a user from the cache after their record changed"""
+    user_cache.invalidate(str(user_id))
+
+def token_data_for(user: dict) -> dict:
+    """Build the access token payload for a user"""
+    data = {"sub": str(user["_id"])}
+    if TOKEN_CLAIMS_ENABLED:
+        data["usr"] = {
+            "username": user["username"],
+            "email": user["email"],
+            "avatar": user["avatar"],
+            "createdAt": user["createdAt"].isoformat()
+        }
+    return data
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a JWT access token"""
     to_encode = data.copy()
@@ -50,7 +109,7 @@ def verify_token(token: str) -> dict:
                 detail="Could not validate credentials",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return {"user_id": user_id}
+        return {"user_id": user_id, "claims": payload.get("usr")}
     except JWTError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -59,23 +118,44 @@ def verify_token(token: str) -> dict:
         )
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security)
 ):
     """Get the current authenticated user"""
-    token = credentials.credentials
+    # Sub-requests of a batch carry the user the batch already resolved
+    user = getattr(request.state, "user", None)
+    if user is not None:
+        return dict(user)
+    return await resolve_user(credentials.credentials)
+
+async def resolve_user(token: str) -> dict:
+    """Resolve the user a bearer token was issued to"""
     token_data = verify_token(token)
-    
-    # Import here to avoid circular imports
-    from server import db as database
-    
-    user = await database.users.find_one({"_id": ObjectId(token_data["user_id"])})
+    user_id = token_data["user_id"]
+
+    # Tokens issued with embedded claims need no lookup at all
+    if token_data["claims"]:
+        user = dict(token_data["claims"])
+        user["_id"] = user_id
+        return user
+
+    user = user_cache.get(user_id)
     if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
-    
-    # Convert ObjectId to string for JSON serialization
-    user["_id"] = str(user["_id"])
-    return user
\ No newline at end of file
+        if ObjectId.is_valid(user_id):
+            user = await _database.users.find_one(
+                {"_id": ObjectId(user_id)},
+                {"password": 0}
+            )
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+
+        # Convert ObjectId to string for JSON serialization
+        user["_id"] = str(user["_id"])
+        user_cache.set(user_id, user)
+
+    # Hand out a copy so handlers cannot mutate the cached entry
+    return dict(user)
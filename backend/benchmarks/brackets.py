@@ -0,0 +1,139 @@
+"""Time bracket generation, full resolution and Swiss pairing.
+
+For 8, 64 and 128 players and every format, measures generating the
+opening matches in memory, then stores them and reports every match through
+``services.brackets.report_result`` (random winners) until the tournament is
+completed, recording per-report latency and the match writes per report.
+Also times Swiss pairing alone over ``--swiss-rounds`` rounds.
+
+Usage (from the backend directory):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.brackets
+    python -m benchmarks.brackets --mongomock
+
+With --mongomock the resolution timings measure mongomock, not MongoDB.
+"""
+from benchmarks.common import load_app, percentiles
+from datetime import datetime
+from bson import ObjectId
+import argparse
+import asyncio
+import json
+import random
+import time
+
+async def resolve(db, bracket_format, players: list, seed: int) -> dict:
+    from models.Match import BracketFormat, MatchStatus
+    from models.Tournament import TournamentStatus
+    from services.brackets import (
+        MATCHES_COLLECTION,
+        default_swiss_rounds,
+        generate_matches,
+        insert_matches,
+        report_result
+    )
+
+    rng = random.Random(seed)
+    now = datetime.utcnow()
+    bracket = {"format": bracket_format, "players": players, "generatedAt": now}
+    if bracket_format == BracketFormat.SWISS:
+        bracket["rounds"] = default_swiss_rounds(len(players))
+
+    tournament = {
+        "_id": ObjectId(),
+        "name": f"Bracket benchmark {bracket_format.value} {len(players)}",
+        "organizer": players[0],
+        "status": TournamentStatus.ACTIVE,
+        "bracket": bracket,
+        "createdAt": now,
+        "updatedAt": now
+    }
+    await db.tournaments.insert_one(tournament)
+
+    start = time.perf_counter()
+    matches = generate_matches(bracket_format, players)
+    generate_ms = (time.perf_counter() - start) * 1000
+    await insert_matches(db, tournament["_id"], matches)
+
+    samples = []
+    writes = []
+    champion = None
+    while champion is None:
+        ready = await db[MATCHES_COLLECTION].find({
+            "tournament": tournament["_id"],
+            "status": MatchStatus.PENDING,
+            "players": {"$ne": None}
+        }).to_list(None)
+        if not ready:
+            break
+
+        for match in ready:
+            start = time.perf_counter()
+            outcome = await report_result(db, tournament, match, rng.choice(match["players"]))
+            samples.append((time.perf_counter() - start) * 1000)
+            # The reported match plus every match a player moved into
+            writes.append(1 + int(bool(match.get("next"))) + int(bool(match.get("loserNext"))))
+            champion = champion or outcome["champion"]
+
+    return {
+        "format": bracket_format.value,
+        "players": len(players),
+        "matches": await db[MATCHES_COLLECTION].count_documents({"tournament": tournament["_id"]}),
+        "generate_ms": round(generate_ms, 3),
+        "report": percentiles(samples),
+        "max_match_writes_per_report": max(writes) if writes else 0,
+        "completed": champion is not None
+    }
+
+def swiss_pairing(players: int, rounds: int, seed: int) -> dict:
+    from models.Match import MatchStatus
+    from services.brackets import swiss_round
+
+    rng = random.Random(seed)
+    field = list(range(players))
+    played = []
+    samples = []
+    for round_number in range(1, rounds + 1):
+        start = time.perf_counter()
+        round_matches = swiss_round(field, played, round_number)
+        samples.append((time.perf_counter() - start) * 1000)
+        for match in round_matches:
+            if match["status"] == MatchStatus.PENDING:
+                match["winner"] = rng.choice(match["players"])
+                match["status"] = MatchStatus.COMPLETED
+        played.extend(round_matches)
+
+    pairs = [frozenset(m["players"]) for m in played if m["players"][1] is not None]
+    return {
+        "players": players,
+        "rounds": rounds,
+        "round": percentiles(samples),
+        "rematches": len(pairs) - len(set(pairs))
+    }
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="8,64,128", help="comma separated player counts")
+    parser.add_argument("--swiss-rounds", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    args = parser.parse_args()
+
+    app, db = load_app(args.mongomock)
+
+    from models.Match import BracketFormat
+    from services.brackets import ensure_match_indexes
+
+    await ensure_match_indexes(db)
+
+    report = {"resolution": [], "swiss_pairing": []}
+    for size in (int(s) for s in args.sizes.split(",")):
+        players = [ObjectId() for _ in range(size)]
+        for bracket_format in BracketFormat:
+            report["resolution"].append(await resolve(db, bracket_format, players, args.seed))
+        report["swiss_pairing"].append(swiss_pairing(size, min(args.swiss_rounds, size - 1), args.seed))
+
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,41 @@
+"""Shared helpers for the benchmark scripts."""
+import os
+import statistics
+
+def load_app(use_mongomock: bool):
+    """Import the FastAPI app, optionally backed by mongomock-motor
+
+    Must run before anything else imports ``server``. Returns ``(app, db)``.
+    """
+    os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+    os.environ.setdefault("DB_NAME", "tourneyhub_benchmark")
+    # Every simulated client shares one address, which the per-IP buckets
+    # would throttle; benchmarks opt back in with RATE_LIMIT_ENABLED=true
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+
+    if use_mongomock:
+        from mongomock_motor import AsyncMongoMockClient
+        import motor.motor_asyncio
+
+        mock_client = AsyncMongoMockClient()
+        motor.motor_asyncio.AsyncIOMotorClient = lambda *args, **kwargs: mock_client
+
+    import server
+    return server.app, server.db
+
+def percentiles(samples_ms: list) -> dict:
+    """Summarize latency samples in milliseconds"""
+    if not samples_ms:
+        return {"count": 0, "p50_ms": None, "p95_ms": None, "p99_ms": None}
+
+    ordered = sorted(samples_ms)
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * q))], 3)
+
+    return {
+        "count": len(ordered),
+        "p50_ms": round(statistics.median(ordered), 3),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99)
+    }
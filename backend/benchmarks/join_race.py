@@ -0,0 +1,118 @@
+"""Fire concurrent joins at one tournament and check capacity holds.
+
+Creates a tournament with ``--slots`` places and ``--players`` users, sends
+every join at once and verifies the tournament ends with exactly ``--slots``
+distinct participants and a matching participantCount. Exits non-zero if it
+was overfilled or under-filled.
+
+Usage (from the backend directory):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.join_race
+    python -m benchmarks.join_race --mongomock
+"""
+from benchmarks.common import load_app, percentiles
+from datetime import datetime, timedelta
+from bson import ObjectId
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+async def seed(db, players: int, slots: int):
+    now = datetime.utcnow()
+    users = [
+        {
+            "_id": ObjectId(),
+            "username": f"racer{i}-{now.timestamp():.0f}",
+            "email": f"racer{i}-{now.timestamp():.0f}@tourneyhub-bench.com",
+            "password": "",
+            "avatar": "",
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i in range(players)
+    ]
+    await db.users.insert_many(users)
+
+    tournament = {
+        "_id": ObjectId(),
+        "name": "Join race",
+        "game": "Chess",
+        "description": "Concurrent join benchmark",
+        "rules": "",
+        "organizer": users[0]["_id"],
+        "organizerName": users[0]["username"],
+        "participants": [],
+        "participantCount": 0,
+        "maxParticipants": slots,
+        "status": "registration",
+        "startDate": now + timedelta(days=2),
+        "endDate": now + timedelta(days=3),
+        "registrationDeadline": now + timedelta(days=1),
+        "prize": "",
+        "prizeAmount": 0,
+        "judges": [],
+        "createdAt": now,
+        "updatedAt": now
+    }
+    await db.tournaments.insert_one(tournament)
+    return users, tournament["_id"]
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--players", type=int, default=500)
+    parser.add_argument("--slots", type=int, default=128)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    args = parser.parse_args()
+
+    app, db = load_app(args.mongomock)
+
+    from auth import create_access_token, token_data_for
+    import httpx
+
+    users, tournament_id = await seed(db, args.players, args.slots)
+    tokens = [create_access_token(token_data_for(user)) for user in users]
+
+    async def join(client, token: str):
+        start = time.perf_counter()
+        response = await client.post(
+            f"/api/tournaments/{tournament_id}/join",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        return response.status_code, (time.perf_counter() - start) * 1000
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        results = await asyncio.gather(*(join(client, token) for token in tokens))
+
+    tournament = await db.tournaments.find_one({"_id": tournament_id})
+    participants = tournament["participants"]
+    codes = {}
+    for code, _ in results:
+        codes[str(code)] = codes.get(str(code), 0) + 1
+
+    report = {
+        "players": args.players,
+        "slots": args.slots,
+        "responses": codes,
+        "participants": len(participants),
+        "distinctParticipants": len(set(participants)),
+        "participantCount": tournament["participantCount"],
+        "latency": percentiles([ms for _, ms in results])
+    }
+    print(json.dumps(report, indent=2))
+
+    expected = min(args.slots, args.players)
+    ok = (
+        len(participants) == expected
+        and len(set(participants)) == expected
+        and tournament["participantCount"] == expected
+        and codes.get("200", 0) == expected
+    )
+    if not ok:
+        print("FAILED: tournament capacity was not enforced", file=sys.stderr)
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,341 @@
+"""Seed a scratch database and load-test the API through concurrent scenarios.
+
+Seeds ``--users`` users, ``--tournaments`` tournaments with
+``--participants`` players each (plus fresh tournaments for the join storm),
+then drives the app with ``--concurrency`` clients per scenario:
+
+    browse       list pages with filters and cursors, plus detail views
+    search       type-ahead searches over tournament names and games
+    join_storm   joins from random users into a few open tournaments
+    login_storm  logins with valid credentials (bcrypt on the pool)
+    profile      authenticated profile views
+
+Each scenario reports throughput, p50/p95/p99 latency and status codes to a
+JSON file. ``--baseline`` compares p95 and throughput with an earlier
+report and exits non-zero when a scenario regressed by more than
+``--tolerance`` percent.
+
+Usage (from the backend directory):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.load_test --output report.json
+    python -m benchmarks.load_test --mongomock --users 200 --tournaments 300
+    python -m benchmarks.load_test --baseline report.json --output new.json
+
+Data is generated from ``--seed``, so runs with equal arguments issue the
+same requests. Timings under ``--mongomock`` measure mongomock, not MongoDB.
+"""
+from benchmarks.common import load_app, percentiles
+from datetime import datetime, timedelta
+from bson import ObjectId
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import time
+
+PASSWORD = "benchmark-password"
+
+GAMES = ["Valorant", "League of Legends", "Counter Strike 2", "Rocket League",
+         "Fortnite", "Dota 2", "Street Fighter 6", "Chess", "Tekken 8", "Apex Legends"]
+WORDS = ["spring", "summer", "winter", "autumn", "open", "cup", "masters", "league",
+         "invitational", "championship", "showdown", "clash", "weekly", "monthly",
+         "series", "finals", "qualifier", "arena", "legends", "rising"]
+STATUSES = ["registration"] * 6 + ["active"] * 3 + ["completed"]
+
+# Collections emptied before seeding
+SEEDED_COLLECTIONS = ["users", "tournaments", "tournament_search", "matches", "user_stats", "platform_stats"]
+
+class State:
+    """Seeded data shared by the scenarios"""
+
+    def __init__(self):
+        self.users = []
+        self.tokens = []
+        self.tournament_ids = []
+        self.join_targets = []
+        self.queries = []
+        self.cursors = []
+
+def make_tournament(rng: random.Random, i: int, users: list, participants: int, now: datetime) -> dict:
+    organizer = rng.choice(users)
+    status = rng.choice(STATUSES)
+    max_participants = rng.choice([16, 32, 64, 128])
+    players = [u["_id"] for u in rng.sample(users, min(participants, max_participants, len(users)))]
+    start = now + timedelta(days=rng.randint(-10, 30))
+    prize = rng.choice(["", "$500", "$1,000", "$5,000 + trophy"])
+    return {
+        "_id": ObjectId(),
+        "name": " ".join(rng.sample(WORDS, 3)) + f" {i}",
+        "game": rng.choice(GAMES),
+        "description": "Synthetic load test tournament",
+        "rules": "",
+        "organizer": organizer["_id"],
+        "organizerName": organizer["username"],
+        "participants": players,
+        "participantCount": len(players),
+        "maxParticipants": max_participants,
+        "status": status,
+        "startDate": start,
+        "endDate": start + timedelta(days=2),
+        "registrationDeadline": start - timedelta(days=1),
+        "prize": prize,
+        "judges": [],
+        "createdAt": now - timedelta(seconds=i),
+        "updatedAt": now - timedelta(seconds=i)
+    }
+
+async def seed(db, args, password_hash: str) -> State:
+    from auth import create_access_token, token_data_for
+    from services.search import build_postings, SEARCH_COLLECTION
+    from services.stats import parse_prize_amount, rebuild_stats
+    from services.user_stats import rebuild_user_stats
+    from services.scheduler import next_transition_at
+
+    rng = random.Random(args.seed)
+    now = datetime.utcnow()
+    state = State()
+
+    for name in SEEDED_COLLECTIONS:
+        await db[name].delete_many({})
+
+    state.users = [
+        {
+            "_id": ObjectId(),
+            "username": f"loaduser{i}",
+            "email": f"loaduser{i}@tourneyhub-bench.com",
+            "password": password_hash,
+            "avatar": "",
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i in range(args.users)
+    ]
+    for start in range(0, len(state.users), args.batch):
+        await db.users.insert_many(state.users[start:start + args.batch], ordered=False)
+
+    for start in range(0, args.tournaments, args.batch):
+        docs = [
+            make_tournament(rng, i, state.users, args.participants, now)
+            for i in range(start, min(start + args.batch, args.tournaments))
+        ]
+        for doc in docs:
+            doc["prizeAmount"] = parse_prize_amount(doc["prize"])
+            doc["nextTransitionAt"] = next_transition_at(doc)
+        await db.tournaments.insert_many(docs, ordered=False)
+        await db[SEARCH_COLLECTION].insert_many([
+            {"term": term, "tournament": doc["_id"], "score": score, "createdAt": doc["createdAt"]}
+            for doc in docs
+            for term, score in build_postings(doc).items()
+        ], ordered=False)
+        state.tournament_ids.extend(str(doc["_id"]) for doc in docs)
+        for doc in docs[:50]:
+            words = doc["name"].split()
+            state.queries.append(words[0][:rng.randint(2, len(words[0]))])
+            state.queries.append(f"{words[1]} {doc['game'].split()[0][:3].lower()}")
+
+    # Open tournaments the join storm fills up
+    targets = []
+    for i in range(args.join_targets):
+        doc = make_tournament(rng, args.tournaments + i, state.users, 0, now)
+        doc.update({
+            "name": f"join storm {i}",
+            "status": "registration",
+            "maxParticipants": 128,
+            "startDate": now + timedelta(days=7),
+            "endDate": now + timedelta(days=8),
+            "registrationDeadline": now + timedelta(days=6),
+            "prizeAmount": 0
+        })
+        doc["nextTransitionAt"] = next_transition_at(doc)
+        targets.append(doc)
+    if targets:
+        await db.tournaments.insert_many(targets)
+    state.join_targets = [str(doc["_id"]) for doc in targets]
+
+    await rebuild_stats(db)
+    await rebuild_user_stats(db)
+
+    state.tokens = [
+        create_access_token(token_data_for(user))
+        for user in state.users[:args.token_users]
+    ]
+    return state
+
+async def browse(client, rng: random.Random, state: State):
+    roll = rng.random()
+    if roll < 0.3 and state.tournament_ids:
+        return await client.get(f"/api/tournaments/{rng.choice(state.tournament_ids)}")
+    if roll < 0.5 and state.cursors:
+        return await client.get("/api/tournaments/", params={"after": rng.choice(state.cursors)})
+
+    params = {"limit": 20}
+    if rng.random() < 0.4:
+        params["status"] = rng.choice(["registration", "active", "completed"])
+    if rng.random() < 0.3:
+        params["game"] = rng.choice(GAMES)
+    response = await client.get("/api/tournaments/", params=params)
+    if response.status_code == 200:
+        cursor = response.json().get("nextCursor")
+        if cursor and len(state.cursors) < 1000:
+            state.cursors.append(cursor)
+    return response
+
+async def search(client, rng: random.Random, state: State):
+    return await client.get("/api/tournaments/", params={"search": rng.choice(state.queries), "limit": 20})
+
+async def join_storm(client, rng: random.Random, state: State):
+    token = rng.choice(state.tokens)
+    return await client.post(
+        f"/api/tournaments/{rng.choice(state.join_targets)}/join",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+async def login_storm(client, rng: random.Random, state: State):
+    user = rng.choice(state.users[:len(state.tokens)])
+    return await client.post("/api/auth/login", json={"email": user["email"], "password": PASSWORD})
+
+async def profile(client, rng: random.Random, state: State):
+    return await client.get(
+        "/api/users/profile",
+        headers={"Authorization": f"Bearer {rng.choice(state.tokens)}"}
+    )
+
+SCENARIOS = {
+    "browse": browse,
+    "search": search,
+    "join_storm": join_storm,
+    "login_storm": login_storm,
+    "profile": profile
+}
+
+# Responses that are a correct answer under load, not a failure
+EXPECTED_STATUSES = {
+    "join_storm": {200, 400}  # full, already registered
+}
+
+async def run_scenario(client, name: str, state: State, args) -> dict:
+    scenario = SCENARIOS[name]
+    expected = EXPECTED_STATUSES.get(name, {200})
+    samples = []
+    statuses = {}
+    remaining = [args.requests]
+
+    async def worker(worker_id: int):
+        rng = random.Random(f"{args.seed}:{name}:{worker_id}")
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            start = time.perf_counter()
+            try:
+                response = await scenario(client, rng, state)
+                code = response.status_code
+            except Exception as e:
+                code = type(e).__name__
+            samples.append((time.perf_counter() - start) * 1000)
+            statuses[code] = statuses.get(code, 0) + 1
+            # In-process transports may complete without suspending; yield anyway
+            await asyncio.sleep(0)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+
+    errors = sum(count for code, count in statuses.items() if code not in expected)
+    return dict(
+        percentiles(samples),
+        seconds=round(elapsed, 3),
+        throughput_rps=round(len(samples) / elapsed, 2) if elapsed else None,
+        errors=errors,
+        statuses={str(code): count for code, count in sorted(statuses.items(), key=lambda item: str(item[0]))}
+    )
+
+def compare(report: dict, baseline: dict, tolerance: float) -> list:
+    """Scenarios whose p95 or throughput got worse than the baseline allows"""
+    regressions = []
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        if before.get("p95_ms") and result["p95_ms"] > before["p95_ms"] * (1 + tolerance / 100):
+            regressions.append(f"{name}: p95 {before['p95_ms']}ms -> {result['p95_ms']}ms")
+        if before.get("throughput_rps") and result["throughput_rps"] < before["throughput_rps"] * (1 - tolerance / 100):
+            regressions.append(f"{name}: throughput {before['throughput_rps']} -> {result['throughput_rps']} req/s")
+        if result["errors"] > before.get("errors", 0):
+            regressions.append(f"{name}: errors {before.get('errors', 0)} -> {result['errors']}")
+    return regressions
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--tournaments", type=int, default=5000)
+    parser.add_argument("--participants", type=int, default=16, help="participants per seeded tournament")
+    parser.add_argument("--join-targets", type=int, default=4, help="open tournaments for the join storm")
+    parser.add_argument("--token-users", type=int, default=500, help="users that log in / hold tokens")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS))
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--output", help="write the JSON report to this file")
+    parser.add_argument("--baseline", help="earlier JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=20.0, help="allowed regression in percent")
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    db_name = os.environ.get("DB_NAME", "tourneyhub_benchmark")
+    if not args.mongomock and "bench" not in db_name:
+        parser.error(f"refusing to wipe database '{db_name}'; use a DB_NAME containing 'bench'")
+
+    app, db = load_app(args.mongomock)
+    # One log line per request would dominate the run
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    import auth
+    import httpx
+
+    state = await seed(db, args, auth.pwd_context.hash(PASSWORD))
+
+    report = {
+        "startedAt": datetime.utcnow().isoformat(),
+        "config": {
+            key: getattr(args, key)
+            for key in ("users", "tournaments", "participants", "join_targets", "concurrency", "requests", "seed")
+        },
+        "backend": "mongomock" if args.mongomock else "mongodb",
+        "scenarios": {}
+    }
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+            for name in scenarios:
+                result = await run_scenario(client, name, state, args)
+                report["scenarios"][name] = result
+                print(f"{name:>12}: {result['throughput_rps']} req/s  p50 {result['p50_ms']}ms  "
+                      f"p95 {result['p95_ms']}ms  p99 {result['p99_ms']}ms  errors {result['errors']}",
+                      file=sys.stderr)
+    finally:
+        await app.router.shutdown()
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            report["regressions"] = compare(report, json.load(f), args.tolerance)
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if report.get("regressions"):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,132 @@
+"""Measure GET /api/tournaments latency while a login storm is running.
+
+Probes the tournament list sequentially, first on an idle app and then while
+``--concurrency`` clients log in back to back, and prints p50/p95/p99 for
+both phases along with event-loop lag. With ``--inline`` bcrypt runs on the event loop as it used to,
+which shows the stall the password pool removes.
+
+Usage (from the backend directory):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.login_storm
+    python -m benchmarks.login_storm --mongomock --inline
+"""
+from benchmarks.common import load_app, percentiles
+from datetime import datetime
+from bson import ObjectId
+import argparse
+import asyncio
+import json
+import time
+
+PASSWORD = "benchmark-password"
+
+class InlineExecutor:
+    """Runs calls directly on the event loop, like the pre-pool code path"""
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    def shutdown(self):
+        pass
+
+async def seed_users(db, count: int, password_hash: str) -> list:
+    emails = [f"storm{i}@tourneyhub-bench.com" for i in range(count)]
+    await db.users.delete_many({"email": {"$in": emails}})
+    now = datetime.utcnow()
+    await db.users.insert_many([
+        {
+            "_id": ObjectId(),
+            "username": f"storm{i}",
+            "email": email,
+            "password": password_hash,
+            "avatar": "",
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i, email in enumerate(emails)
+    ])
+    return emails
+
+async def probe(client, duration: float) -> list:
+    samples = []
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        start = time.perf_counter()
+        response = await client.get("/api/tournaments/")
+        response.raise_for_status()
+        samples.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.005)
+    return samples
+
+async def lag_monitor(stop: asyncio.Event, interval: float = 0.01) -> list:
+    """Record how late the event loop wakes a periodic sleeper"""
+    samples = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        samples.append((time.perf_counter() - start - interval) * 1000)
+    return samples
+
+async def login_loop(client, email: str, stop: asyncio.Event, results: dict):
+    while not stop.is_set():
+        response = await client.post("/api/auth/login", json={"email": email, "password": PASSWORD})
+        results[response.status_code] = results.get(response.status_code, 0) + 1
+        # In-process transports may complete without suspending; yield anyway
+        await asyncio.sleep(0)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--inline", action="store_true", help="hash on the event loop (old behaviour)")
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+
+    app, db = load_app(args.mongomock)
+
+    import auth
+    import httpx
+
+    if args.inline:
+        auth.password_executor = InlineExecutor()
+
+    emails = await seed_users(db, args.concurrency, auth.pwd_context.hash(PASSWORD))
+
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            stop = asyncio.Event()
+            lag = asyncio.create_task(lag_monitor(stop))
+            idle = await probe(client, args.duration)
+            stop.set()
+            idle_lag = await lag
+
+            stop = asyncio.Event()
+            lag = asyncio.create_task(lag_monitor(stop))
+            logins = {}
+            storm = [asyncio.create_task(login_loop(client, email, stop, logins)) for email in emails]
+            loaded = await probe(client, args.duration)
+            stop.set()
+            await asyncio.gather(*storm)
+            loaded_lag = await lag
+    finally:
+        await app.router.shutdown()
+
+    report = {
+        "mode": "inline" if args.inline else "pool",
+        "concurrency": args.concurrency,
+        "idle": percentiles(idle),
+        "duringLoginStorm": percentiles(loaded),
+        "idleLoopLag": percentiles(idle_lag),
+        "loginStormLoopLag": percentiles(loaded_lag),
+        "loginResponses": {str(code): count for code, count in sorted(logins.items())}
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+"""Measure the cost of the metrics middleware and Mongo command listener.
+
+Serves the same requests through the app with and without
+``MetricsMiddleware`` (and with the slow-request capture on), alternating
+variants in blocks so drift affects all of them alike, and reports the
+median latency and the overhead relative to the bare app. As those
+end-to-end numbers are noisy at sub-millisecond latencies, the middleware
+is also timed in isolation around a no-op ASGI app. The command listener is
+timed separately with synthetic monitoring events, since it runs on
+Motor's threads once per Mongo round trip.
+
+Usage (from the backend directory):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.metrics_overhead
+    python -m benchmarks.metrics_overhead --mongomock
+"""
+import os
+
+# The middleware under test is applied by this script, not by server.py
+os.environ["METRICS_ENABLED"] = "false"
+
+from benchmarks.common import load_app, percentiles
+from types import SimpleNamespace
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+async def seed(db, count: int):
+    from datetime import datetime, timedelta
+    from bson import ObjectId
+
+    now = datetime.utcnow()
+    organizer = ObjectId()
+    await db.tournaments.insert_many([
+        {
+            "_id": ObjectId(),
+            "name": f"Overhead {i}",
+            "game": "Chess",
+            "description": "Metrics overhead benchmark",
+            "organizer": organizer,
+            "organizerName": "bench",
+            "participants": [],
+            "participantCount": 0,
+            "maxParticipants": 16,
+            "status": "registration",
+            "startDate": now + timedelta(days=2),
+            "endDate": now + timedelta(days=3),
+            "registrationDeadline": now + timedelta(days=1),
+            "prize": "",
+            "createdAt": now - timedelta(seconds=i),
+            "updatedAt": now
+        }
+        for i in range(count)
+    ])
+
+async def time_requests(app, path: str, requests: int) -> list:
+    import httpx
+
+    samples = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(requests):
+            start = time.perf_counter()
+            response = await client.get(path)
+            samples.append((time.perf_counter() - start) * 1000)
+            response.raise_for_status()
+    return samples
+
+async def time_middleware(requests: int) -> float:
+    """Microseconds the middleware adds around an ASGI app that does nothing"""
+    from services.instrumentation import MetricsMiddleware
+
+    route = SimpleNamespace(path="/bench")
+
+    async def noop_app(scope, receive, send):
+        scope["route"] = route
+        await send({"type": "http.response.start", "status": 200})
+
+    async def discard(message):
+        pass
+
+    timings = []
+    for app in (noop_app, MetricsMiddleware(noop_app)):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app({"type": "http", "method": "GET", "path": "/bench"}, None, discard)
+        timings.append((time.perf_counter() - start) / requests * 1e6)
+    return timings[1] - timings[0]
+
+def time_listener(events: int) -> float:
+    """Microseconds per started+succeeded pair with a request in scope"""
+    from services.instrumentation import MongoCommandListener, RequestStats, _request_stats
+
+    listener = MongoCommandListener()
+    token = _request_stats.set(RequestStats(capture=False))
+    command = {"find": "tournaments", "filter": {"status": "registration"}, "sort": {"createdAt": -1}}
+    try:
+        start = time.perf_counter()
+        for request_id in range(events):
+            listener.started(SimpleNamespace(
+                command_name="find", command=command, connection_id=("bench", 1), request_id=request_id
+            ))
+            listener.succeeded(SimpleNamespace(
+                command_name="find", connection_id=("bench", 1), request_id=request_id, duration_micros=500
+            ))
+        return (time.perf_counter() - start) / events * 1e6
+    finally:
+        _request_stats.reset(token)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests per variant and path")
+    parser.add_argument("--blocks", type=int, default=10, help="alternating blocks per variant")
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    args = parser.parse_args()
+
+    app, db = load_app(args.mongomock)
+    from services.instrumentation import MetricsMiddleware
+
+    await seed(db, 50)
+
+    variants = {
+        "bare": app,
+        "metrics": MetricsMiddleware(app),
+        "metrics+slowlog": MetricsMiddleware(app, slow_request_seconds=3600)
+    }
+    paths = ["/api/", "/api/tournaments/?limit=20"]
+
+    report = {"paths": {}}
+    per_block = max(1, args.requests // args.blocks)
+    for path in paths:
+        samples = {name: [] for name in variants}
+        # Warm up caches and code paths
+        for variant in variants.values():
+            await time_requests(variant, path, 50)
+        for _ in range(args.blocks):
+            for name, variant in variants.items():
+                samples[name].extend(await time_requests(variant, path, per_block))
+
+        bare_median = statistics.median(samples["bare"])
+        report["paths"][path] = {
+            name: dict(
+                percentiles(values),
+                overhead_pct=round((statistics.median(values) / bare_median - 1) * 100, 2)
+            )
+            for name, values in samples.items()
+        }
+
+    report["middleware_us_per_request"] = round(await time_middleware(100000), 3)
+    report["listener_us_per_command"] = round(time_listener(100000), 3)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,60 @@
+"""Time the vectorized Elo replay used by ratings recomputation.
+
+Generates random results between ``--players`` players, checks on a prefix
+that the wave-batched replay matches applying results one by one, and
+reports how long replaying ``--results`` results takes both ways (the
+sequential replay is timed on ``--sequential`` results and extrapolated).
+No database is needed.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.ratings
+    python -m benchmarks.ratings --results 5000000 --players 200000
+"""
+from services.ratings import INITIAL_RATING, elo_delta, replay_elo
+import argparse
+import json
+import time
+import numpy as np
+
+def replay_sequential(winners: np.ndarray, losers: np.ndarray, player_count: int) -> list:
+    ratings = [INITIAL_RATING] * player_count
+    for winner, loser in zip(winners.tolist(), losers.tolist()):
+        delta = elo_delta(ratings[winner], ratings[loser])
+        ratings[winner] += delta
+        ratings[loser] -= delta
+    return ratings
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--results", type=int, default=2000000)
+    parser.add_argument("--players", type=int, default=50000)
+    parser.add_argument("--sequential", type=int, default=200000, help="results replayed one by one")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    winners = rng.integers(0, args.players, args.results)
+    losers = (winners + rng.integers(1, args.players, args.results)) % args.players
+
+    prefix = min(args.sequential, args.results)
+    start = time.perf_counter()
+    sequential = replay_sequential(winners[:prefix], losers[:prefix], args.players)
+    sequential_seconds = time.perf_counter() - start
+    batched = replay_elo(winners[:prefix], losers[:prefix], args.players)
+    max_difference = float(np.abs(batched - np.array(sequential)).max())
+
+    start = time.perf_counter()
+    replay_elo(winners, losers, args.players)
+    vectorized_seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        "results": args.results,
+        "players": args.players,
+        "vectorized_seconds": round(vectorized_seconds, 3),
+        "sequential_seconds_estimated": round(sequential_seconds * args.results / prefix, 3),
+        "max_rating_difference": max_difference
+    }, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""Compare regex search against the prefix search index.
+
+Seeds a scratch database with synthetic tournaments at each requested size
+and reports p50/p99 latency of the old case-insensitive ``$regex`` query and
+of ``services.search.search_tournaments`` for the same type-ahead inputs.
+
+Usage (from the backend directory):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.search_latency
+    python -m benchmarks.search_latency --sizes 1000 --mongomock
+
+``--mongomock`` only checks that the harness runs; mongomock has no real
+indexes, so its timings say nothing about production latency.
+"""
+from benchmarks.common import percentiles
+from datetime import datetime, timedelta
+from bson import ObjectId
+from services.search import (
+    SEARCH_COLLECTION,
+    build_postings,
+    ensure_search_indexes,
+    search_tournaments
+)
+import argparse
+import asyncio
+import os
+import random
+import time
+
+GAMES = ["Valorant", "League of Legends", "Counter Strike 2", "Rocket League",
+         "Fortnite", "Dota 2", "Street Fighter 6", "Chess", "Tekken 8", "Apex Legends"]
+WORDS = ["spring", "summer", "winter", "autumn", "open", "cup", "masters", "league",
+         "invitational", "championship", "showdown", "clash", "weekly", "monthly",
+         "series", "finals", "qualifier", "arena", "legends", "rising"]
+ORGANIZERS = [f"organizer{i}" for i in range(500)]
+QUERIES = ["va", "valo", "cup", "spring cup", "chess mas", "organizer12", "league of", "qualif"]
+
+def make_tournament(i: int, now: datetime) -> dict:
+    rnd = random.Random(i)
+    return {
+        "_id": ObjectId(),
+        "name": " ".join(rnd.sample(WORDS, 3)) + f" {i}",
+        "game": rnd.choice(GAMES),
+        "organizerName": rnd.choice(ORGANIZERS),
+        "description": "Synthetic benchmark tournament",
+        "status": rnd.choice(["registration", "active", "completed"]),
+        "participants": [],
+        "maxParticipants": 64,
+        "createdAt": now - timedelta(seconds=i)
+    }
+
+async def seed(db, size: int, batch: int = 5000):
+    await db.tournaments.drop()
+    await db[SEARCH_COLLECTION].drop()
+    await db.tournaments.create_index([("createdAt", -1), ("_id", -1)])
+    await ensure_search_indexes(db)
+
+    now = datetime.utcnow()
+    for start in range(0, size, batch):
+        docs = [make_tournament(i, now) for i in range(start, min(start + batch, size))]
+        await db.tournaments.insert_many(docs, ordered=False)
+        postings = [
+            {"term": term, "tournament": doc["_id"], "score": score, "createdAt": doc["createdAt"]}
+            for doc in docs
+            for term, score in build_postings(doc).items()
+        ]
+        await db[SEARCH_COLLECTION].insert_many(postings, ordered=False)
+
+async def regex_search(db, search: str, limit: int):
+    query = {"$or": [
+        {"name": {"$regex": search, "$options": "i"}},
+        {"game": {"$regex": search, "$options": "i"}},
+        {"organizerName": {"$regex": search, "$options": "i"}}
+    ]}
+    return await db.tournaments.find(query).sort("createdAt", -1).to_list(limit)
+
+async def indexed_search(db, search: str, limit: int):
+    docs, _ = await search_tournaments(db, search, {}, None, limit)
+    return docs
+
+async def measure(fn, db, iterations: int, limit: int) -> dict:
+    samples = []
+    for i in range(iterations):
+        search = QUERIES[i % len(QUERIES)]
+        start = time.perf_counter()
+        await fn(db, search, limit)
+        samples.append((time.perf_counter() - start) * 1000)
+    return percentiles(samples)
+
+def get_database(use_mongomock: bool):
+    if use_mongomock:
+        from mongomock_motor import AsyncMongoMockClient
+        return AsyncMongoMockClient()["search_benchmark"]
+
+    from motor.motor_asyncio import AsyncIOMotorClient
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL", "mongodb://localhost:27017"))
+    return client[os.environ.get("BENCH_DB_NAME", "search_benchmark")]
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    args = parser.parse_args()
+
+    db = get_database(args.mongomock)
+    print(f"{'size':>10} {'path':>8} {'p50 ms':>10} {'p99 ms':>10}")
+    for size in args.sizes:
+        await seed(db, size)
+        for label, fn in (("regex", regex_search), ("index", indexed_search)):
+            result = await measure(fn, db, args.iterations, args.limit)
+            print(f"{size:>10} {label:>8} {result['p50_ms']:>10} {result['p99_ms']:>10}")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,135 @@
+"""Measure the cost of turning one page of tournament documents into JSON.
+
+Compares the old path, which converted every ObjectId to str in Python
+before encoding with the stdlib json module, with the current one, which
+hands raw Mongo documents to services.serialization.dumps. Also times the
+Pydantic round trip (TournamentResponse validation plus dump) that the
+join endpoint used to pay for a single full document.
+
+No database is needed.
+
+Usage (from the backend directory):
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --page-size 100 --participants 128
+"""
+from datetime import datetime, timedelta
+from bson import ObjectId
+import argparse
+import copy
+import json
+import statistics
+import time
+
+def make_page(page_size: int, participants: int) -> list:
+    now = datetime.utcnow()
+    return [
+        {
+            "_id": ObjectId(),
+            "name": f"Serialization Cup {i}",
+            "game": "Chess",
+            "description": "Serialization benchmark tournament",
+            "rules": "Standard rules",
+            "organizer": ObjectId(),
+            "organizerName": "bench",
+            "participants": [ObjectId() for _ in range(participants)],
+            "participantCount": participants,
+            "maxParticipants": 128,
+            "status": "registration",
+            "startDate": now + timedelta(days=2),
+            "endDate": now + timedelta(days=3),
+            "registrationDeadline": now + timedelta(days=1),
+            "prize": "$500",
+            "prizeAmount": 500.0,
+            "judges": [],
+            "createdAt": now - timedelta(seconds=i),
+            "updatedAt": now
+        }
+        for i in range(page_size)
+    ]
+
+def stringify_then_json(page: list) -> bytes:
+    """The per-document conversion loop followed by the stdlib encoder"""
+    from services.serialization import bson_default
+
+    formatted = []
+    for tournament in page:
+        tournament["_id"] = str(tournament["_id"])
+        tournament["organizer"] = str(tournament["organizer"])
+        if "participants" in tournament:
+            tournament["participants"] = [str(p) for p in tournament["participants"]]
+        formatted.append(tournament)
+    return json.dumps({"tournaments": formatted, "nextCursor": None}, default=bson_default, separators=(",", ":")).encode()
+
+def raw_dumps(page: list) -> bytes:
+    from services.serialization import dumps
+
+    return dumps({"tournaments": page, "nextCursor": None})
+
+def pydantic_round_trip(page: list) -> bytes:
+    from models.Tournament import TournamentResponse
+
+    tournament = page[0]
+    tournament["_id"] = str(tournament["_id"])
+    tournament["organizer"] = str(tournament["organizer"])
+    tournament["participants"] = [str(p) for p in tournament["participants"]]
+    return TournamentResponse(**tournament).model_dump_json(by_alias=True).encode()
+
+def raw_dumps_single(page: list) -> bytes:
+    from services.serialization import dumps
+
+    return dumps({"tournament": page[0]})
+
+def time_variant(fn, page: list, repeats: int) -> list:
+    # Copies are made outside the timed region since the old path mutates
+    copies = [copy.deepcopy(page) for _ in range(repeats)]
+    samples = []
+    for data in copies:
+        start = time.perf_counter()
+        fn(data)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--participants", type=int, default=128)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    from services.serialization import orjson
+
+    page = make_page(args.page_size, args.participants)
+
+    # The optimized path must produce the same bytes, modulo whitespace
+    assert json.loads(stringify_then_json(copy.deepcopy(page))) == json.loads(raw_dumps(copy.deepcopy(page)))
+
+    variants = {
+        "list_page_before": stringify_then_json,
+        "list_page_after": raw_dumps,
+        "single_pydantic_before": pydantic_round_trip,
+        "single_after": raw_dumps_single
+    }
+
+    report = {
+        "pageSize": args.page_size,
+        "participants": args.participants,
+        "encoder": "orjson" if orjson is not None else "json",
+        "bytes": len(raw_dumps(copy.deepcopy(page))),
+        "us": {}
+    }
+    for name, fn in variants.items():
+        time_variant(fn, page, 3)  # warm up
+        samples = time_variant(fn, page, args.repeats)
+        report["us"][name] = {
+            "median": round(statistics.median(samples), 1),
+            "min": round(min(samples), 1)
+        }
+
+    us = report["us"]
+    report["list_page_speedup"] = round(us["list_page_before"]["median"] / us["list_page_after"]["median"], 2)
+    report["single_speedup"] = round(us["single_pydantic_before"]["median"] / us["single_after"]["median"], 2)
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Measure the Mongo reads saved by coalescing a thundering herd.
+
+Sends ``--clients`` simultaneous requests for the same tournament detail,
+then for the platform stats, ``--rounds`` times each. The response cache is
+invalidated before every round, as a write to a live tournament would, so
+every round starts cold. Runs once with read coalescing off and once with it
+on, and reports for both how many Mongo queries the routes issued, the
+resulting queries per second and the request latency.
+
+mongomock answers without yielding to the event loop, so there concurrent
+cache misses never overlap: the uncoalesced detail herd is served from the
+cache after its first request. The stats route has no cache and shows the
+difference either way; use a real server for representative numbers.
+
+Usage (from the backend directory):
+
+    MONGO_URL=mongodb://localhost:27017 python -m benchmarks.thundering_herd
+    python -m benchmarks.thundering_herd --mongomock --clients 2000
+"""
+from benchmarks.common import load_app, percentiles
+from datetime import datetime, timedelta
+from bson import ObjectId
+import argparse
+import asyncio
+import json
+import time
+
+async def seed(db) -> ObjectId:
+    now = datetime.utcnow()
+    organizer = ObjectId()
+    tournament = {
+        "_id": ObjectId(),
+        "name": "Herd Finals",
+        "game": "Chess",
+        "description": "Thundering herd benchmark",
+        "rules": "",
+        "organizer": organizer,
+        "organizerName": "herd-organizer",
+        "participants": [ObjectId() for _ in range(64)],
+        "participantCount": 64,
+        "maxParticipants": 64,
+        "status": "active",
+        "startDate": now - timedelta(hours=1),
+        "endDate": now + timedelta(days=1),
+        "registrationDeadline": now - timedelta(days=1),
+        "prize": "$1,000",
+        "prizeAmount": 1000,
+        "judges": [],
+        "createdAt": now,
+        "updatedAt": now
+    }
+    await db.tournaments.insert_one(tournament)
+    return tournament["_id"]
+
+def build_app(db, coalesce_reads: bool):
+    from fastapi import FastAPI
+    from routes.tournaments import create_tournaments_router
+    from routes.stats import create_stats_router
+    from services.cache import InProcessCacheBackend
+    from services.response_cache import TournamentResponseCache
+    from services.serialization import BSONJSONResponse
+
+    response_cache = TournamentResponseCache(InProcessCacheBackend(5000, 30))
+    app = FastAPI(default_response_class=BSONJSONResponse)
+    app.include_router(create_tournaments_router(
+        db, response_cache, coalesce_reads=coalesce_reads
+    ), prefix="/api")
+    app.include_router(create_stats_router(db, coalesce_reads), prefix="/api")
+    return app, response_cache
+
+async def herd(client, path: str, clients: int) -> list:
+    async def fetch():
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        return (time.perf_counter() - start) * 1000
+
+    return await asyncio.gather(*(fetch() for _ in range(clients)))
+
+async def run_mode(db, tournament_id: ObjectId, coalesce_reads: bool, clients: int, rounds: int) -> dict:
+    from services.coalesce import SINGLE_FLIGHT_CALLS
+    import httpx
+
+    app, response_cache = build_app(db, coalesce_reads)
+    report = {}
+    targets = (
+        ("tournament_detail", f"/api/tournaments/{tournament_id}"),
+        ("platform_stats", "/api/stats/")
+    )
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        for name, path in targets:
+            executed = SINGLE_FLIGHT_CALLS.value(name, "executed")
+            coalesced = SINGLE_FLIGHT_CALLS.value(name, "coalesced")
+            samples = []
+            elapsed = 0.0
+            for _ in range(rounds):
+                await response_cache.invalidate([tournament_id])
+                start = time.perf_counter()
+                samples.extend(await herd(client, path, clients))
+                elapsed += time.perf_counter() - start
+
+            # Each executed call issues exactly one Mongo query
+            queries = SINGLE_FLIGHT_CALLS.value(name, "executed") - executed
+            report[name] = {
+                "requests": clients * rounds,
+                "mongoQueries": int(queries),
+                "coalescedCallers": int(SINGLE_FLIGHT_CALLS.value(name, "coalesced") - coalesced),
+                "mongoQueriesPerSecond": round(queries / elapsed, 1),
+                "latency": percentiles(samples)
+            }
+    return report
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--clients", type=int, default=1000, help="simultaneous requests per round")
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--mongomock", action="store_true", help="use mongomock-motor instead of MONGO_URL")
+    args = parser.parse_args()
+
+    _, db = load_app(args.mongomock)
+    tournament_id = await seed(db)
+
+    report = {"clients": args.clients, "rounds": args.rounds}
+    try:
+        report["uncoalesced"] = await run_mode(db, tournament_id, False, args.clients, args.rounds)
+        report["coalesced"] = await run_mode(db, tournament_id, True, args.clients, args.rounds)
+    finally:
+        await db.tournaments.delete_one({"_id": tournament_id})
+    print(json.dumps(report, indent=2))
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""Apply and inspect database migrations.
+
+    python migrate.py status   # applied and pending versions
+    python migrate.py apply    # apply pending migrations under the lock
+    python migrate.py check    # explain every route query; exit 1 on a COLLSCAN
+
+Reads MONGO_URL, DB_NAME and the MONGO_* connection settings from the
+environment or backend/.env, like the server. Deployments that set
+MIGRATIONS_MODE=verify run `apply` (and `check`) as a release step before
+starting workers.
+"""
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+from pathlib import Path
+from services.database import client_options
+from services.migrations import (
+    MIGRATIONS,
+    MigrationError,
+    applied_versions,
+    pending_migrations,
+    apply_migrations,
+    check_query_plans
+)
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+async def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("command", choices=["status", "apply", "check"])
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], **client_options(os.environ))
+    db = client[os.environ['DB_NAME']]
+    try:
+        if args.command == "status":
+            applied = await applied_versions(db)
+            pending = await pending_migrations(db)
+            print(json.dumps({
+                "applied": applied,
+                "pending": [
+                    {"version": migration.version, "description": migration.description}
+                    for migration in pending
+                ],
+                "latest": max(migration.version for migration in MIGRATIONS)
+            }, indent=2))
+            return 0
+
+        if args.command == "apply":
+            try:
+                applied = await apply_migrations(db)
+            except MigrationError as e:
+                print(e, file=sys.stderr)
+                return 1
+            print(json.dumps({"applied": applied}))
+            return 0
+
+        results = await check_query_plans(db)
+        print(json.dumps(results, indent=2))
+        scans = [result["name"] for result in results if result["collectionScan"]]
+        if scans:
+            print(f"Queries fall back to a collection scan: {scans}", file=sys.stderr)
+            return 1
+        return 0
+    finally:
+        client.close()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,18 @@
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+
+class BatchItem(BaseModel):
+    id: str = Field(..., min_length=1, max_length=64)
+    # Path with an optional query string, e.g. /api/tournaments?status=registration
+    path: str = Field(..., min_length=1, max_length=2048)
+
+class BatchRequest(BaseModel):
+    requests: List[BatchItem] = Field(..., min_length=1)
+
+class BatchItemResult(BaseModel):
+    id: str
+    status: int
+    body: Optional[Any] = None
+
+class BatchResponse(BaseModel):
+    results: List[BatchItemResult]
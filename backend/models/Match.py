@@ -0,0 +1,22 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from enum import Enum
+
+class BracketFormat(str, Enum):
+    SINGLE_ELIMINATION = "single_elimination"
+    DOUBLE_ELIMINATION = "double_elimination"
+    SWISS = "swiss"
+    ROUND_ROBIN = "round_robin"
+
+class MatchStatus(str, Enum):
+    PENDING = "pending"
+    COMPLETED = "completed"
+
+class BracketCreate(BaseModel):
+    format: BracketFormat
+    rounds: Optional[int] = Field(None, ge=1, le=20)  # Swiss only, default log2(players)
+    seeds: Optional[List[str]] = None  # participant IDs, best first; default join order
+
+class MatchResult(BaseModel):
+    winner: str  # user ID of one of the two players
+    score: Optional[str] = Field(None, max_length=50)
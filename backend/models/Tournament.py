@@ -38,6 +38,43 @@ class TournamentResponse(TournamentBase):
             datetime: lambda v: v.isoformat()
         }
 
+class TournamentSummary(BaseModel):
+    """List item in the default summary view (see TOURNAMENT_SUMMARY_PROJECTION)"""
+    id: str = Field(alias="_id")
+    name: str
+    game: str
+    description: str
+    organizer: str
+    organizerName: str
+    maxParticipants: int
+    participantCount: int = 0
+    status: TournamentStatus
+    startDate: datetime
+    endDate: datetime
+    registrationDeadline: datetime
+    prize: str = ""
+    winner: Optional[str] = None
+    createdAt: datetime
+    updatedAt: datetime
+
+class TournamentPage(BaseModel):
+    # Items are TournamentResponse documents with view=full
+    tournaments: List[TournamentSummary]
+    nextCursor: Optional[str] = None
+
+class FacetCount(BaseModel):
+    value: str
+    count: int
+
+class TournamentFacets(BaseModel):
+    # Each list ignores its own filter, see services.search.tournament_facets
+    total: int
+    game: List[FacetCount]
+    status: List[FacetCount]
+
+class TournamentDetail(BaseModel):
+    tournament: TournamentResponse
+
 class TournamentUpdate(BaseModel):
     name: Optional[str] = None
     description: Optional[str] = None
@@ -46,4 +83,22 @@ class TournamentUpdate(BaseModel):
 
 class TournamentJoinResponse(BaseModel):
     message: str
-    tournament: TournamentResponse
\ No newline at end of file
+    tournament: TournamentResponse
+
+class BulkRegistrationRequest(BaseModel):
+    users: List[str] = Field(..., min_length=1, max_length=128)  # user IDs or usernames
+
+class BulkRegistrationStatus(str, Enum):
+    ADDED = "added"
+    ALREADY_REGISTERED = "already_registered"
+    UNKNOWN_USER = "unknown_user"
+    OVER_CAPACITY = "over_capacity"
+
+class BulkRegistrationResult(BaseModel):
+    entry: str
+    status: BulkRegistrationStatus
+    userId: Optional[str] = None
+
+class BulkRegistrationResponse(BaseModel):
+    results: List[BulkRegistrationResult]
+    tournament: TournamentResponse
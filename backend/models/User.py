@@ -29,6 +29,10 @@ class UserProfile(UserResponse):
     stats: Optional[dict] = None
     tournaments: Optional[list] = None
 
+class ProfileUpdate(BaseModel):
+    username: Optional[str] = Field(None, min_length=3, max_length=50)
+    avatar: Optional[str] = Field(None, max_length=500, pattern=r"^https?://")
+
 class TokenResponse(BaseModel):
     user: UserResponse
     token: str
\ No newline at end of file
@@ -1,17 +1,26 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from models.User import UserCreate, UserLogin, UserResponse, TokenResponse
-from auth import get_password_hash, verify_password, create_access_token, get_current_user
+from auth import (
+    hash_password,
+    verify_and_update_password,
+    create_access_token,
+    get_current_user,
+    token_data_for
+)
+from services.stats import record_user_registered
+from services.ratelimit import RateLimiter, admission
 from bson import ObjectId
 from datetime import datetime
+from typing import Optional
 import logging
 
 logger = logging.getLogger(__name__)
 
-def create_auth_router(db: AsyncIOMotorDatabase) -> APIRouter:
+def create_auth_router(db: AsyncIOMotorDatabase, rate_limiter: Optional[RateLimiter] = None) -> APIRouter:
     router = APIRouter(prefix="/auth", tags=["authentication"])
 
-    @router.post("/register", response_model=TokenResponse)
+    @router.post("/register", response_model=TokenResponse, dependencies=admission(rate_limiter, "register"))
     async def register(user_data: UserCreate):
         """Register a new user"""
         try:
@@ -30,7 +39,7 @@ def create_auth_router(db: AsyncIOMotorDatabase) -> APIRouter:
                 )
             
             # Hash password
-            hashed_password = get_password_hash(user_data.password)
+            hashed_password = await hash_password(user_data.password)
             
             # Create user document
             user_doc = {
@@ -45,9 +54,10 @@ def create_auth_router(db: AsyncIOMotorDatabase) -> APIRouter:
             
             # Insert user
             result = await db.users.insert_one(user_doc)
+            await record_user_registered(db)
             
             # Create access token
-            access_token = create_access_token(data={"sub": str(result.inserted_id)})
+            access_token = create_access_token(data=token_data_for(user_doc))
             
             # Prepare response
             user_response = UserResponse(
@@ -60,6 +70,8 @@ def create_auth_router(db: AsyncIOMotorDatabase) -> APIRouter:
             
             return TokenResponse(user=user_response, token=access_token)
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Registration error: {e}")
             raise HTTPException(
@@ -67,21 +79,34 @@ def create_auth_router(db: AsyncIOMotorDatabase) -> APIRouter:
                 detail="Error creating user account"
             )
 
-    @router.post("/login", response_model=TokenResponse)
+    @router.post("/login", response_model=TokenResponse, dependencies=admission(rate_limiter, "login"))
     async def login(user_credentials: UserLogin):
         """Login user"""
         try:
             # Find user by email
             user = await db.users.find_one({"email": user_credentials.email})
             
-            if not user or not verify_password(user_credentials.password, user["password"]):
+            verified = False
+            if user:
+                verified, new_hash = await verify_and_update_password(
+                    user_credentials.password, user["password"]
+                )
+
+            if not verified:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
                     detail="Incorrect email or password"
                 )
+
+            # Transparently upgrade hashes stored with outdated parameters
+            if new_hash:
+                await db.users.update_one(
+                    {"_id": user["_id"]},
+                    {"$set": {"password": new_hash, "updatedAt": datetime.utcnow()}}
+                )
             
             # Create access token
-            access_token = create_access_token(data={"sub": str(user["_id"])})
+            access_token = create_access_token(data=token_data_for(user))
             
             # Prepare response
             user_response = UserResponse(
@@ -0,0 +1,150 @@
+from fastapi import APIRouter, HTTPException, Request, Response, status
+from auth import resolve_user
+from models.Batch import BatchRequest, BatchResponse
+from services.ratelimit import RateLimiter, admission
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Sub-requests per batch; a dashboard page load needs four or five
+MAX_BATCH_ITEMS = 10
+
+# Read routes a batch may call, by path without a trailing slash, mapped to
+# the path they are routed under
+BATCH_ROUTES: Dict[str, str] = {
+    "/api/auth/me": "/api/auth/me",
+    "/api/users/profile": "/api/users/profile",
+    "/api/stats": "/api/stats/",
+    "/api/tournaments": "/api/tournaments/",
+    "/api/tournaments/facets": "/api/tournaments/facets"
+}
+
+# Headers describing the batch body or made conditional by the client; the
+# sub-requests are bodiless GETs answered in full
+_DROPPED_HEADERS = {b"content-length", b"content-type", b"if-none-match", b"transfer-encoding"}
+
+_NOT_BATCHABLE = b'{"detail":"Path cannot be batched"}'
+_ITEM_ERROR = b'{"detail":"Error processing request"}'
+
+async def _dispatch(request: Request, path: str, query_string: bytes, headers: list, user: Optional[dict]) -> Tuple[int, bytes]:
+    """Run one GET through the app in process; returns its status and JSON body
+
+    The sub-request passes through the same middleware, dependencies and
+    admission control as a request from the network would.
+    """
+    root_path = request.scope.get("root_path", "")
+    state = dict(request.scope.get("state") or {})
+    if user is not None:
+        state["user"] = user
+
+    full_path = root_path + path
+    scope = {
+        "type": "http",
+        "asgi": request.scope.get("asgi", {"version": "3.0"}),
+        "http_version": request.scope.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": request.scope.get("scheme", "http"),
+        "server": request.scope.get("server"),
+        "client": request.scope.get("client"),
+        "root_path": root_path,
+        "path": full_path,
+        "raw_path": full_path.encode(),
+        "query_string": query_string,
+        "headers": headers,
+        "state": state
+    }
+
+    received = False
+
+    async def receive():
+        nonlocal received
+        if received:
+            return {"type": "http.disconnect"}
+        received = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    response = {"status": 500, "json": False}
+    chunks: List[bytes] = []
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["json"] = any(
+                name.lower() == b"content-type" and value.startswith(b"application/json")
+                for name, value in message.get("headers", [])
+            )
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception as e:
+        logger.error(f"Error in batched request to {path}: {e}")
+        return status.HTTP_500_INTERNAL_SERVER_ERROR, _ITEM_ERROR
+
+    body = b"".join(chunks)
+    if not body:
+        return response["status"], b"null"
+    if not response["json"]:
+        return response["status"], json.dumps(body.decode("utf-8", "replace")).encode()
+    return response["status"], body
+
+def create_batch_router(rate_limiter: Optional[RateLimiter] = None) -> APIRouter:
+    router = APIRouter(prefix="/batch", tags=["batch"])
+
+    @router.post("/", response_model=BatchResponse, dependencies=admission(rate_limiter, "batch"))
+    async def run_batch(batch: BatchRequest, request: Request):
+        """Run several read requests concurrently and answer them together
+
+        The bearer token is resolved once and the user handed to every
+        sub-request. Each result carries its own status, so one failing
+        item does not fail the batch; items needing a user answer 401 when
+        the token is missing or invalid.
+        """
+        if len(batch.requests) > MAX_BATCH_ITEMS:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"A batch holds at most {MAX_BATCH_ITEMS} requests"
+            )
+        ids = [item.id for item in batch.requests]
+        if len(set(ids)) != len(ids):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Request IDs must be unique within a batch"
+            )
+
+        user = None
+        authorization = request.headers.get("authorization", "")
+        if authorization.lower().startswith("bearer "):
+            try:
+                user = await resolve_user(authorization[7:])
+            except HTTPException:
+                # Left to the items that need a user, which reject the token
+                pass
+
+        headers = [
+            (name, value) for name, value in request.scope["headers"]
+            if name not in _DROPPED_HEADERS
+        ]
+
+        async def run_item(path: str) -> Tuple[int, bytes]:
+            parts = urlsplit(path)
+            route_path = BATCH_ROUTES.get(parts.path.rstrip("/"))
+            if route_path is None:
+                return status.HTTP_404_NOT_FOUND, _NOT_BATCHABLE
+            return await _dispatch(request, route_path, parts.query.encode(), headers, user)
+
+        results = await asyncio.gather(*(run_item(item.path) for item in batch.requests))
+
+        # Item bodies are already JSON, so they are spliced in as they are
+        items = b",".join(
+            b'{"id":%s,"status":%d,"body":%s}' % (json.dumps(item.id).encode(), item_status, body)
+            for item, (item_status, body) in zip(batch.requests, results)
+        )
+        return Response(content=b'{"results":[' + items + b"]}", media_type="application/json")
+
+    return router
@@ -0,0 +1,374 @@
+from fastapi import APIRouter, HTTPException, status, Depends, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.Match import BracketCreate, BracketFormat, MatchResult, MatchStatus
+from models.Tournament import TournamentStatus
+from auth import get_current_user
+from services.brackets import (
+    MATCHES_COLLECTION,
+    default_swiss_rounds,
+    generate_matches,
+    insert_matches,
+    report_result,
+    tournament_standings
+)
+from services.stats import record_status_change
+from services.ratings import record_rating_result
+from services.archive import find_tournament
+from services.cache import InProcessCacheBackend
+from services.events import EventBus
+from services.response_cache import TournamentResponseCache
+from services.serialization import BSONJSONResponse
+from routes.tournaments import DEFAULT_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_TTL_SECONDS
+from pymongo import ReturnDocument, ASCENDING
+from bson import ObjectId
+from datetime import datetime
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _format_match(match: dict) -> dict:
+    match["_id"] = str(match["_id"])
+    match["tournament"] = str(match["tournament"])
+    match["players"] = [str(p) if p else None for p in match["players"]]
+    match["winner"] = str(match["winner"]) if match.get("winner") else None
+    for link in ("next", "loserNext"):
+        if match.get(link):
+            match[link] = {"match": str(match[link]["match"]), "slot": match[link]["slot"]}
+    return match
+
+def create_matches_router(
+    db: AsyncIOMotorDatabase,
+    response_cache: Optional[TournamentResponseCache] = None,
+    event_bus: Optional[EventBus] = None
+) -> APIRouter:
+    router = APIRouter(prefix="/tournaments", tags=["matches"])
+
+    if response_cache is None:
+        response_cache = TournamentResponseCache(InProcessCacheBackend(
+            DEFAULT_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_TTL_SECONDS
+        ))
+
+    if event_bus is None:
+        event_bus = EventBus()
+
+    async def load_organized_tournament(tournament_id: str, current_user: dict) -> dict:
+        if not ObjectId.is_valid(tournament_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid tournament ID"
+            )
+
+        tournament = await db.tournaments.find_one(
+            {"_id": ObjectId(tournament_id)},
+            {"organizer": 1, "status": 1, "participants": 1, "bracket": 1, "game": 1}
+        )
+
+        if not tournament:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tournament not found"
+            )
+
+        if str(tournament["organizer"]) != current_user["_id"]:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only the organizer can manage matches"
+            )
+
+        return tournament
+
+    @router.post("/{tournament_id}/bracket", response_model=dict)
+    async def create_bracket(
+        tournament_id: str,
+        request: BracketCreate,
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Generate the bracket and start the tournament (organizer only)"""
+        try:
+            tournament = await load_organized_tournament(tournament_id, current_user)
+
+            if tournament.get("bracket"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Bracket has already been generated"
+                )
+
+            if tournament["status"] == TournamentStatus.COMPLETED:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Tournament is already completed"
+                )
+
+            participants = tournament.get("participants", [])
+            if len(participants) < 2:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="At least 2 participants are needed to generate a bracket"
+                )
+
+            # Seed order defaults to registration order
+            players = participants
+            if request.seeds:
+                if not all(ObjectId.is_valid(seed) for seed in request.seeds):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Invalid participant ID in seeds"
+                    )
+                players = [ObjectId(seed) for seed in request.seeds]
+                if len(set(players)) != len(players) or set(players) != set(participants):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Seeds must list every participant exactly once"
+                    )
+
+            bracket = {
+                "format": request.format,
+                "players": players,
+                "generatedAt": datetime.utcnow()
+            }
+            if request.format == BracketFormat.SWISS:
+                rounds = request.rounds or default_swiss_rounds(len(players))
+                if rounds > len(players) - 1:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"At most {len(players) - 1} Swiss rounds can be played"
+                    )
+                bracket["rounds"] = rounds
+
+            # Claim the tournament first so concurrent requests cannot both
+            # generate a bracket; this also closes registration
+            previous = await db.tournaments.find_one_and_update(
+                {
+                    "_id": tournament["_id"],
+                    "bracket": {"$exists": False},
+                    "status": {"$in": [TournamentStatus.REGISTRATION, TournamentStatus.ACTIVE]},
+                    "participants": {"$size": len(participants)}
+                },
+                {"$set": {
+                    "bracket": bracket,
+                    "status": TournamentStatus.ACTIVE,
+                    "nextTransitionAt": None,
+                    "updatedAt": datetime.utcnow()
+                }},
+                projection={"status": 1, "nextTransitionAt": 1},
+                return_document=ReturnDocument.BEFORE
+            )
+            if not previous:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Tournament changed while generating the bracket, please retry"
+                )
+
+            matches = generate_matches(request.format, players)
+            if not await insert_matches(db, tournament["_id"], matches):
+                await db.tournaments.update_one(
+                    {"_id": tournament["_id"]},
+                    {"$unset": {"bracket": ""}, "$set": {
+                        "status": previous["status"],
+                        "nextTransitionAt": previous["nextTransitionAt"]
+                    }}
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Matches already exist for this tournament"
+                )
+
+            if previous["status"] != TournamentStatus.ACTIVE:
+                await record_status_change(db, previous["status"], TournamentStatus.ACTIVE)
+            await response_cache.invalidate([tournament_id])
+            event_bus.publish(tournament_id, "bracket", {"format": request.format.value})
+
+            return {
+                "format": request.format,
+                "rounds": bracket.get("rounds"),
+                "matches": len(matches)
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error generating bracket: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error generating bracket"
+            )
+
+    @router.get("/{tournament_id}/matches", response_model=dict)
+    async def get_matches(
+        tournament_id: str,
+        bracket: Optional[str] = Query(None),
+        round_number: Optional[int] = Query(None, alias="round", ge=1)
+    ):
+        """Get the matches of a tournament, optionally one bracket or round"""
+        try:
+            if not ObjectId.is_valid(tournament_id):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid tournament ID"
+                )
+
+            query = {"tournament": ObjectId(tournament_id)}
+            if bracket:
+                query["bracket"] = bracket
+            if round_number:
+                query["round"] = round_number
+
+            matches = await db[MATCHES_COLLECTION].find(query).sort([
+                ("bracket", ASCENDING), ("round", ASCENDING), ("position", ASCENDING)
+            ]).to_list(None)
+
+            # Serialized as stored; ObjectIds are converted by the encoder
+            return BSONJSONResponse({"matches": matches})
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching matches: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error fetching matches"
+            )
+
+    @router.get("/{tournament_id}/standings", response_model=dict)
+    async def get_standings(tournament_id: str):
+        """Get the standings of a Swiss or round-robin tournament"""
+        try:
+            if not ObjectId.is_valid(tournament_id):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid tournament ID"
+                )
+
+            tournament = await find_tournament(
+                db,
+                {"_id": ObjectId(tournament_id)},
+                {"bracket": 1}
+            )
+
+            if not tournament:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Tournament not found"
+                )
+
+            bracket = tournament.get("bracket")
+            if not bracket or bracket["format"] not in (BracketFormat.SWISS, BracketFormat.ROUND_ROBIN):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Standings are only kept for Swiss and round-robin tournaments"
+                )
+
+            rows = await tournament_standings(db, tournament)
+            for row in rows:
+                row["player"] = str(row["player"])
+
+            return {"standings": rows}
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching standings: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error fetching standings"
+            )
+
+    @router.post("/{tournament_id}/matches/{match_id}/result", response_model=dict)
+    async def report_match_result(
+        tournament_id: str,
+        match_id: str,
+        request: MatchResult,
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Report the winner of a match (organizer only)"""
+        try:
+            tournament = await load_organized_tournament(tournament_id, current_user)
+
+            if not ObjectId.is_valid(match_id) or not ObjectId.is_valid(request.winner):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid match or winner ID"
+                )
+
+            if not tournament.get("bracket"):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Bracket has not been generated"
+                )
+
+            if tournament["status"] != TournamentStatus.ACTIVE:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Tournament is not active"
+                )
+
+            match = await db[MATCHES_COLLECTION].find_one(
+                {"_id": ObjectId(match_id), "tournament": tournament["_id"]}
+            )
+
+            if not match:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Match not found"
+                )
+
+            if match["status"] == MatchStatus.COMPLETED:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Result has already been reported"
+                )
+
+            if None in match["players"]:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Match is still waiting for its players"
+                )
+
+            winner_id = ObjectId(request.winner)
+            if winner_id not in match["players"]:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Winner must be one of the match players"
+                )
+
+            outcome = await report_result(db, tournament, match, winner_id, request.score)
+            if outcome is None:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Result was reported concurrently"
+                )
+
+            loser_id = next(player for player in match["players"] if player != winner_id)
+            try:
+                await record_rating_result(db, tournament["game"], winner_id, loser_id)
+            except Exception as e:
+                # The result stands; a recomputation restores the ratings
+                logger.error(f"Error updating ratings: {e}")
+
+            event_bus.publish(tournament_id, "matches", {
+                "updated": [str(updated_id) for updated_id in outcome["updated"]]
+            })
+            champion = str(outcome["champion"]) if outcome["champion"] else None
+            # The completed status reaches event streams through the status relay
+            if champion:
+                await response_cache.invalidate([tournament_id])
+
+            match.update({"status": MatchStatus.COMPLETED, "winner": winner_id, "score": request.score})
+
+            return {
+                "match": _format_match(match),
+                "updated": [str(updated_id) for updated_id in outcome["updated"]],
+                "champion": champion
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error reporting match result: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error reporting match result"
+            )
+
+    return router
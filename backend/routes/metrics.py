@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException, status, Header
+from fastapi.responses import PlainTextResponse
+from services.metrics import MetricsRegistry
+from typing import Optional
+import hmac
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def create_metrics_router(registry: MetricsRegistry, token: Optional[str] = None) -> APIRouter:
+    router = APIRouter(tags=["metrics"])
+
+    @router.get("/metrics", response_class=PlainTextResponse)
+    async def get_metrics(authorization: Optional[str] = Header(None)):
+        """Expose request, Mongo and pool metrics in Prometheus text format"""
+        if token and not hmac.compare_digest(authorization or "", f"Bearer {token}"):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Invalid metrics token"
+            )
+
+        return PlainTextResponse(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+    return router
@@ -0,0 +1,86 @@
+from fastapi import APIRouter, HTTPException, status, Query
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.ratings import leaderboard, player_standing
+from services.profiles import user_summaries
+from bson import ObjectId
+from typing import List
+import logging
+
+logger = logging.getLogger(__name__)
+
+async def _format_rows(db: AsyncIOMotorDatabase, rows: List[dict]) -> List[dict]:
+    summaries = await user_summaries(db, [row["player"] for row in rows])
+    return [
+        {
+            "rank": row["rank"],
+            "player": summary["id"],
+            "username": summary["username"],
+            "avatar": summary["avatar"],
+            "rating": round(row["rating"], 1),
+            "matches": row["matches"],
+            "wins": row["wins"],
+            "losses": row["losses"]
+        }
+        for row, summary in zip(rows, summaries)
+    ]
+
+def create_ratings_router(db: AsyncIOMotorDatabase) -> APIRouter:
+    router = APIRouter(prefix="/ratings", tags=["ratings"])
+
+    @router.get("/leaderboard", response_model=dict)
+    async def get_leaderboard(
+        game: str = Query(..., min_length=1),
+        limit: int = Query(20, ge=1, le=100)
+    ):
+        """Get the highest rated players of a game"""
+        try:
+            rows = await leaderboard(db, game, limit)
+            return {"game": game, "players": await _format_rows(db, rows)}
+
+        except Exception as e:
+            logger.error(f"Error fetching leaderboard: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error fetching leaderboard"
+            )
+
+    @router.get("/players/{user_id}", response_model=dict)
+    async def get_player_rating(
+        user_id: str,
+        game: str = Query(..., min_length=1),
+        neighbours: int = Query(3, ge=0, le=10)
+    ):
+        """Get a player's rating and rank in a game with the players around them"""
+        try:
+            if not ObjectId.is_valid(user_id):
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Invalid user ID"
+                )
+
+            standing = await player_standing(db, game, ObjectId(user_id), neighbours)
+            if standing is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Player has no rated matches in this game"
+                )
+
+            rows = await _format_rows(db, standing["above"] + [standing["player"]] + standing["below"])
+            above = len(standing["above"])
+            return {
+                "game": game,
+                "player": rows[above],
+                "above": rows[:above],
+                "below": rows[above + 1:]
+            }
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching player rating: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error fetching player rating"
+            )
+
+    return router
@@ -1,63 +1,175 @@
-from fastapi import APIRouter, HTTPException, status, Depends, Query
+from fastapi import APIRouter, HTTPException, status, Depends, Query, Header
+from fastapi.responses import StreamingResponse
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from models.Tournament import (
     TournamentCreate, 
     TournamentResponse, 
+    TournamentPage,
+    TournamentFacets,
+    TournamentDetail,
     TournamentStatus,
-    TournamentJoinResponse
+    TournamentJoinResponse,
+    BulkRegistrationRequest,
+    BulkRegistrationResponse,
+    BulkRegistrationStatus
 )
 from auth import get_current_user
+from services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    KEYSET_SORT,
+    keyset_filter,
+    build_page
+)
+from services.projections import TOURNAMENT_SUMMARY_PROJECTION as SUMMARY_PROJECTION
+from services.search import search_tournaments, index_tournament, query_terms
+from services.stats import parse_prize_amount, record_tournament_created
+from services.user_stats import record_tournament_organized, record_participations
+from services.participants import (
+    join_filter,
+    join_update,
+    bulk_join_filter,
+    bulk_join_update,
+    resolve_users
+)
+from services.scheduler import next_transition_at
+from services.profiles import user_summaries
+from services.serialization import ndjson_line, BSONJSONResponse
+from services.cache import InProcessCacheBackend
+from services.events import EventBus
+from services.ratelimit import RateLimiter, admission
+from services.coalesce import coalesced
+from services.archive import ARCHIVE_COLLECTION, wants_history, find_tournament, find_page_with_archive, stream_tournaments, facets_with_archive
+from services.response_cache import (
+    TournamentResponseCache,
+    make_etag,
+    serialize,
+    cached_response
+)
+from pymongo import ReturnDocument, ASCENDING
 from bson import ObjectId
 from datetime import datetime
 from typing import Optional, List
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
-def create_tournaments_router(db: AsyncIOMotorDatabase) -> APIRouter:
+# Attempts at the optimistic bulk registration update before giving up
+BULK_JOIN_ATTEMPTS = 3
+
+# Defaults for the response cache when the caller does not provide one
+DEFAULT_RESPONSE_CACHE_SIZE = 5000
+DEFAULT_RESPONSE_CACHE_TTL_SECONDS = 30
+
+# Facet counts are not invalidated by writes and may be this many seconds old
+DEFAULT_FACETS_TTL_SECONDS = 10
+
+# Seconds between keep-alive comments on idle event streams
+EVENT_STREAM_KEEPALIVE_SECONDS = 15
+
+# Default and maximum Motor cursor batch size for exports
+DEFAULT_EXPORT_BATCH_SIZE = 500
+MAX_EXPORT_BATCH_SIZE = 5000
+
+def create_tournaments_router(
+    db: AsyncIOMotorDatabase,
+    response_cache: Optional[TournamentResponseCache] = None,
+    event_bus: Optional[EventBus] = None,
+    read_db: Optional[AsyncIOMotorDatabase] = None,
+    rate_limiter: Optional[RateLimiter] = None,
+    facets_ttl_seconds: float = DEFAULT_FACETS_TTL_SECONDS,
+    coalesce_reads: bool = True
+) -> APIRouter:
     router = APIRouter(prefix="/tournaments", tags=["tournaments"])
 
-    @router.get("/", response_model=dict)
+    # List pages may come from a secondary; a page read there just after a
+    # write can be a moment stale until its cache entry expires
+    if read_db is None:
+        read_db = db
+
+    if response_cache is None:
+        response_cache = TournamentResponseCache(InProcessCacheBackend(
+            DEFAULT_RESPONSE_CACHE_SIZE, DEFAULT_RESPONSE_CACHE_TTL_SECONDS
+        ))
+
+    if event_bus is None:
+        event_bus = EventBus()
+
+    # Routes below return raw Mongo documents through the BSON-aware encoder;
+    # their response models document the payload but are not used to build it
+    # Plain list pages are cheap and cached; only searches are admitted
+    @router.get("/", response_model=TournamentPage, dependencies=admission(
+        rate_limiter, "search", lambda request: bool(request.query_params.get("search"))
+    ))
     async def get_tournaments(
         game: Optional[str] = Query(None),
-        status: Optional[str] = Query(None),
-        search: Optional[str] = Query(None)
+        status_filter: Optional[str] = Query(None, alias="status"),
+        search: Optional[str] = Query(None),
+        after: Optional[str] = Query(None),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        view: str = Query("summary", pattern="^(summary|full)$"),
+        if_none_match: Optional[str] = Header(None)
     ):
-        """Get all tournaments with optional filtering"""
+        """Get a page of tournaments with optional filtering"""
         try:
+            # Serve from the response cache when possible
+            cache_key = await response_cache.list_key({
+                "game": game,
+                "status": status_filter,
+                "search": search,
+                "after": after,
+                "limit": limit,
+                "view": view
+            })
+            entry = await response_cache.get(cache_key)
+            if entry:
+                return cached_response(entry, if_none_match)
+
             # Build query
             query = {}
             
             if game and game != "all":
                 query["game"] = game
                 
-            if status and status != "all":
-                query["status"] = status
+            if status_filter and status_filter != "all":
+                query["status"] = status_filter
+
+            projection = SUMMARY_PROJECTION if view == "summary" else None
                 
             if search:
-                query["$or"] = [
-                    {"name": {"$regex": search, "$options": "i"}},
-                    {"game": {"$regex": search, "$options": "i"}},
-                    {"organizerName": {"$regex": search, "$options": "i"}}
-                ]
+                # Relevance-ranked lookup through the prefix search index
+                tournaments, next_cursor = await search_tournaments(
+                    read_db, search, query, after, limit, projection,
+                    ARCHIVE_COLLECTION if wants_history(status_filter) else None
+                )
+            else:
+                # Resume after the last document of the previous page
+                page_filter = keyset_filter(after)
+                if page_filter:
+                    query.update(page_filter)
+
+                # Fetch one extra row to know whether another page exists
+                if wants_history(status_filter):
+                    tournaments = await find_page_with_archive(read_db, query, projection, limit)
+                else:
+                    cursor = read_db.tournaments.find(query, projection).sort(KEYSET_SORT).limit(limit + 1)
+                    tournaments = await cursor.to_list(limit + 1)
+                tournaments, next_cursor = build_page(tournaments, limit)
             
-            # Get tournaments
-            cursor = db.tournaments.find(query).sort("createdAt", -1)
-            tournaments = await cursor.to_list(100)
+            # The ETag changes whenever any row on the page is updated, and
+            # differs between representations of the same rows: the view
+            # picks the fields and the search sets their scores
+            etag = make_etag(view, search or "", next_cursor, *(
+                f"{t['_id']}:{t.get('updatedAt')}" for t in tournaments
+            ))
+            entry = (etag, serialize({"tournaments": tournaments, "nextCursor": next_cursor}))
+            await response_cache.set(cache_key, entry)
             
-            # Convert ObjectIds and format response
-            formatted_tournaments = []
-            for tournament in tournaments:
-                tournament["_id"] = str(tournament["_id"])
-                tournament["organizer"] = str(tournament["organizer"])
-                
-                # Convert participant ObjectIds to strings
-                tournament["participants"] = [str(p) for p in tournament.get("participants", [])]
-                
-                formatted_tournaments.append(tournament)
-            
-            return {"tournaments": formatted_tournaments}
+            return cached_response(entry, if_none_match)
             
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error fetching tournaments: {e}")
             raise HTTPException(
@@ -65,7 +177,7 @@ def create_tournaments_router(db: AsyncIOMotorDatabase) -> APIRouter:
                 detail="Error fetching tournaments"
             )
 
-    @router.post("/", response_model=dict)
+    @router.post("/", response_model=TournamentDetail)
     async def create_tournament(
         tournament_data: TournamentCreate,
         current_user: dict = Depends(get_current_user)
@@ -95,25 +207,29 @@ def create_tournaments_router(db: AsyncIOMotorDatabase) -> APIRouter:
                 "organizer": ObjectId(current_user["_id"]),
                 "organizerName": current_user["username"],
                 "participants": [],
+                "participantCount": 0,
                 "maxParticipants": tournament_data.maxParticipants,
                 "status": TournamentStatus.REGISTRATION,
                 "startDate": tournament_data.startDate,
                 "endDate": tournament_data.endDate,
                 "registrationDeadline": tournament_data.registrationDeadline,
                 "prize": tournament_data.prize,
+                "prizeAmount": parse_prize_amount(tournament_data.prize),
                 "judges": tournament_data.judges,
                 "createdAt": datetime.utcnow(),
                 "updatedAt": datetime.utcnow()
             }
             
-            # Insert tournament
-            result = await db.tournaments.insert_one(tournament_doc)
+            tournament_doc["nextTransitionAt"] = next_transition_at(tournament_doc)
             
-            # Prepare response
-            tournament_doc["_id"] = str(result.inserted_id)
-            tournament_doc["organizer"] = str(tournament_doc["organizer"])
+            # Insert tournament
+            await db.tournaments.insert_one(tournament_doc)
+            await index_tournament(db, tournament_doc)
+            await record_tournament_created(db, tournament_doc)
+            await record_tournament_organized(db, tournament_doc["organizer"])
+            await response_cache.invalidate([tournament_doc["_id"]])
             
-            return {"tournament": tournament_doc}
+            return BSONJSONResponse({"tournament": tournament_doc})
             
         except HTTPException:
             raise
@@ -124,8 +240,118 @@ def create_tournaments_router(db: AsyncIOMotorDatabase) -> APIRouter:
                 detail="Error creating tournament"
             )
 
-    @router.get("/{tournament_id}", response_model=dict)
-    async def get_tournament(tournament_id: str):
+    @router.get("/facets", response_model=TournamentFacets, dependencies=admission(
+        rate_limiter, "search", lambda request: bool(request.query_params.get("search"))
+    ))
+    async def get_tournament_facets(
+        game: Optional[str] = Query(None),
+        status_filter: Optional[str] = Query(None, alias="status"),
+        search: Optional[str] = Query(None),
+        if_none_match: Optional[str] = Header(None)
+    ):
+        """Count tournaments per game and per status for the browse filters"""
+        try:
+            filters = {}
+            
+            if game and game != "all":
+                filters["game"] = game
+                
+            if status_filter and status_filter != "all":
+                filters["status"] = status_filter
+
+            # Searches differing only in case, accents or spacing share an entry
+            terms = query_terms(search) if search else None
+            cache_key = response_cache.facets_key({"filters": filters, "terms": terms})
+            entry = await response_cache.get(cache_key)
+            if entry:
+                return cached_response(entry, if_none_match)
+
+            counts = await facets_with_archive(read_db, search, filters)
+            body = serialize(counts)
+            entry = (make_etag(body.decode()), body)
+            await response_cache.set(cache_key, entry, facets_ttl_seconds)
+
+            return cached_response(entry, if_none_match)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error counting tournament facets: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error counting tournament facets"
+            )
+
+    @router.get("/export", dependencies=admission(rate_limiter, "export"))
+    async def export_tournaments(
+        game: Optional[str] = Query(None),
+        status_filter: Optional[str] = Query(None, alias="status"),
+        updatedSince: Optional[datetime] = Query(None),
+        batch_size: int = Query(DEFAULT_EXPORT_BATCH_SIZE, ge=1, le=MAX_EXPORT_BATCH_SIZE)
+    ):
+        """Stream every matching tournament as newline-delimited JSON
+
+        Rows are ordered by (updatedAt, _id) ascending. Incremental pulls pass
+        the last updatedAt they received as updatedSince; the bound is
+        inclusive, so consumers should upsert by _id.
+        """
+        query = {}
+        
+        if game and game != "all":
+            query["game"] = game
+            
+        if status_filter and status_filter != "all":
+            query["status"] = status_filter
+            
+        if updatedSince:
+            query["updatedAt"] = {"$gte": updatedSince}
+        
+        # Long full scans belong on a secondary; consumers re-pull from
+        # their watermark, so replication lag only delays rows. Archived
+        # tournaments are merged in wherever the filter can match them.
+        rows = stream_tournaments(
+            read_db,
+            query,
+            [("updatedAt", ASCENDING), ("_id", ASCENDING)],
+            batch_size,
+            include_archive=not query.get("status") or wants_history(query["status"])
+        )
+        
+        async def stream_rows():
+            # Convert and emit one document at a time so memory stays flat
+            try:
+                async for tournament in rows:
+                    yield ndjson_line(tournament)
+            except Exception as e:
+                # Headers are already sent; aborting the chunked body is the
+                # only way to tell the consumer the file is incomplete
+                logger.error(f"Error exporting tournaments: {e}")
+                raise
+            finally:
+                await rows.aclose()
+        
+        return StreamingResponse(stream_rows(), media_type="application/x-ndjson")
+
+    # The key embeds the write generation, so a read shared by callers never
+    # predates a write any of them could have observed
+    @coalesced("tournament_detail", lambda cache_key, tournament_id: cache_key, enabled=coalesce_reads)
+    async def load_detail(cache_key: str, tournament_id: str) -> Optional[tuple]:
+        tournament = await find_tournament(db, {"_id": ObjectId(tournament_id)})
+        if not tournament:
+            return None
+        
+        entry = (
+            make_etag(tournament["_id"], tournament["updatedAt"]),
+            serialize({"tournament": tournament})
+        )
+        await response_cache.set(cache_key, entry)
+        return entry
+
+    @router.get("/{tournament_id}", response_model=TournamentDetail)
+    async def get_tournament(
+        tournament_id: str,
+        if_none_match: Optional[str] = Header(None)
+    ):
         """Get tournament by ID"""
         try:
             if not ObjectId.is_valid(tournament_id):
@@ -134,20 +360,22 @@ def create_tournaments_router(db: AsyncIOMotorDatabase) -> APIRouter:
                     detail="Invalid tournament ID"
                 )
             
-            tournament = await db.tournaments.find_one({"_id": ObjectId(tournament_id)})
+            # Serve from the response cache when possible
+            cache_key = await response_cache.detail_key(tournament_id)
+            entry = await response_cache.get(cache_key)
+            if entry:
+                return cached_response(entry, if_none_match)
             
-            if not tournament:
+            # Concurrent misses for the same key share a single read
+            entry = await load_detail(cache_key, tournament_id)
+            
+            if entry is None:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Tournament not found"
                 )
             
-            # Format response
-            tournament["_id"] = str(tournament["_id"])
-            tournament["organizer"] = str(tournament["organizer"])
-            tournament["participants"] = [str(p) for p in tournament.get("participants", [])]
-            
-            return {"tournament": tournament}
+            return cached_response(entry, if_none_match)
             
         except HTTPException:
             raise
@@ -158,79 +386,317 @@ def create_tournaments_router(db: AsyncIOMotorDatabase) -> APIRouter:
                 detail="Error fetching tournament"
             )
 
-    @router.post("/{tournament_id}/join", response_model=TournamentJoinResponse)
-    async def join_tournament(
+    @router.get("/{tournament_id}/events")
+    async def tournament_events(tournament_id: str):
+        """Stream live updates of a tournament as Server-Sent Events"""
+        if not ObjectId.is_valid(tournament_id):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid tournament ID"
+            )
+        
+        if not await db.tournaments.count_documents({"_id": ObjectId(tournament_id)}, limit=1):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Tournament not found"
+            )
+        
+        subscriber = event_bus.subscribe(tournament_id)
+        
+        async def stream_events():
+            try:
+                yield b"retry: 3000\n\n"
+                while True:
+                    try:
+                        frame = await asyncio.wait_for(
+                            subscriber.queue.get(), timeout=EVENT_STREAM_KEEPALIVE_SECONDS
+                        )
+                    except asyncio.TimeoutError:
+                        frame = b": keepalive\n\n"
+                    yield frame
+            finally:
+                event_bus.unsubscribe(tournament_id, subscriber)
+        
+        return StreamingResponse(
+            stream_events(),
+            media_type="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+
+    @router.get("/{tournament_id}/participants", response_model=dict)
+    async def get_participants(
         tournament_id: str,
-        current_user: dict = Depends(get_current_user)
+        if_none_match: Optional[str] = Header(None)
     ):
-        """Join a tournament"""
+        """Get the organizer and every participant as {id, username, avatar}"""
         try:
             if not ObjectId.is_valid(tournament_id):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Invalid tournament ID"
                 )
-            
-            tournament = await db.tournaments.find_one({"_id": ObjectId(tournament_id)})
-            
+
+            # Renames invalidate the cache, so names are never stale for long
+            cache_key = await response_cache.participants_key(tournament_id)
+            entry = await response_cache.get(cache_key)
+            if entry:
+                return cached_response(entry, if_none_match)
+
+            tournament = await find_tournament(
+                db,
+                {"_id": ObjectId(tournament_id)},
+                {"organizer": 1, "participants": 1}
+            )
             if not tournament:
                 raise HTTPException(
                     status_code=status.HTTP_404_NOT_FOUND,
                     detail="Tournament not found"
                 )
-            
-            # Check if tournament is open for registration
-            if tournament["status"] != TournamentStatus.REGISTRATION:
+
+            # The organizer rides along in the same batched lookup
+            participants = tournament.get("participants", [])
+            summaries = await user_summaries(db, [tournament["organizer"]] + participants)
+
+            body = serialize({
+                "organizer": summaries[0],
+                "participants": summaries[1:],
+                "participantCount": len(participants)
+            })
+            entry = (make_etag(body.decode()), body)
+            await response_cache.set(cache_key, entry)
+
+            return cached_response(entry, if_none_match)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching participants: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error fetching participants"
+            )
+
+    @router.get("/{tournament_id}/subscribers")
+    async def tournament_subscribers(tournament_id: str):
+        """Get the number of clients watching a tournament's event stream"""
+        return {"subscribers": event_bus.subscriber_count(tournament_id)}
+
+    @router.post("/{tournament_id}/join", response_model=TournamentJoinResponse, dependencies=admission(rate_limiter, "join"))
+    async def join_tournament(
+        tournament_id: str,
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Join a tournament"""
+        try:
+            if not ObjectId.is_valid(tournament_id):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Tournament is not open for registration"
+                    detail="Invalid tournament ID"
                 )
             
+            tournament_oid = ObjectId(tournament_id)
             user_id = ObjectId(current_user["_id"])
             
-            # Check if user is already registered
-            if user_id in tournament.get("participants", []):
+            # Check and apply the join in a single conditional update
+            updated_tournament = await db.tournaments.find_one_and_update(
+                join_filter(tournament_oid, user_id),
+                join_update(user_id),
+                return_document=ReturnDocument.AFTER
+            )
+            
+            if not updated_tournament:
+                # Work out which precondition failed to report it
+                tournament = await db.tournaments.find_one(
+                    {"_id": tournament_oid},
+                    {"status": 1, "participants": 1, "participantCount": 1, "maxParticipants": 1, "registrationDeadline": 1}
+                )
+                
+                if not tournament:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Tournament not found"
+                    )
+                
+                # Check if tournament is open for registration
+                if tournament["status"] != TournamentStatus.REGISTRATION:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Tournament is not open for registration"
+                    )
+                
+                # Check if the registration deadline has passed
+                if tournament["registrationDeadline"] <= datetime.utcnow():
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Registration deadline has passed"
+                    )
+                
+                # Check if user is already registered
+                if user_id in tournament.get("participants", []):
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="You are already registered for this tournament"
+                    )
+                
+                # Check if tournament is full
+                if tournament.get("participantCount", 0) >= tournament["maxParticipants"]:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Tournament is full"
+                    )
+                
                 raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="You are already registered for this tournament"
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Tournament changed while joining, please retry"
                 )
             
-            # Check if tournament is full
-            if len(tournament.get("participants", [])) >= tournament["maxParticipants"]:
+            await record_participations(db, [user_id])
+            await response_cache.invalidate([tournament_oid])
+            event_bus.publish(tournament_id, "participants", {
+                "participantCount": updated_tournament["participantCount"],
+                "joined": [current_user["_id"]]
+            })
+            
+            return BSONJSONResponse({
+                "message": "Successfully joined tournament!",
+                "tournament": updated_tournament
+            })
+            
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error joining tournament: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error joining tournament"
+            )
+
+    @router.post(
+        "/{tournament_id}/participants/bulk",
+        response_model=BulkRegistrationResponse,
+        dependencies=admission(rate_limiter, "bulk_join")
+    )
+    async def bulk_register_participants(
+        tournament_id: str,
+        request: BulkRegistrationRequest,
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Register several users at once (organizer only)"""
+        try:
+            if not ObjectId.is_valid(tournament_id):
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
-                    detail="Tournament is full"
+                    detail="Invalid tournament ID"
                 )
             
-            # Add user to participants
-            await db.tournaments.update_one(
-                {"_id": ObjectId(tournament_id)},
-                {
-                    "$push": {"participants": user_id},
-                    "$set": {"updatedAt": datetime.utcnow()}
-                }
-            )
+            tournament_oid = ObjectId(tournament_id)
             
-            # Get updated tournament
-            updated_tournament = await db.tournaments.find_one({"_id": ObjectId(tournament_id)})
+            # Resolve every entry in one query, ignoring repeated entries
+            entries = list(dict.fromkeys(request.users))
+            resolved = await resolve_users(db, entries)
             
-            # Format response
-            updated_tournament["_id"] = str(updated_tournament["_id"])
-            updated_tournament["organizer"] = str(updated_tournament["organizer"])
-            updated_tournament["participants"] = [str(p) for p in updated_tournament.get("participants", [])]
+            for attempt in range(BULK_JOIN_ATTEMPTS):
+                tournament = await db.tournaments.find_one(
+                    {"_id": tournament_oid},
+                    {
+                        "organizer": 1, "status": 1, "participants": 1, "participantCount": 1,
+                        "maxParticipants": 1, "registrationDeadline": 1
+                    }
+                )
+                
+                if not tournament:
+                    raise HTTPException(
+                        status_code=status.HTTP_404_NOT_FOUND,
+                        detail="Tournament not found"
+                    )
+                
+                if str(tournament["organizer"]) != current_user["_id"]:
+                    raise HTTPException(
+                        status_code=status.HTTP_403_FORBIDDEN,
+                        detail="Only the organizer can register participants"
+                    )
+                
+                if tournament["status"] != TournamentStatus.REGISTRATION:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Tournament is not open for registration"
+                    )
+                
+                if tournament["registrationDeadline"] <= datetime.utcnow():
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail="Registration deadline has passed"
+                    )
+                
+                if len(entries) > tournament["maxParticipants"]:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"At most {tournament['maxParticipants']} users can be registered"
+                    )
+                
+                # Classify every entry against a single snapshot
+                registered = set(tournament.get("participants", []))
+                free_slots = tournament["maxParticipants"] - tournament["participantCount"]
+                results = []
+                to_add = []
+                
+                for entry in entries:
+                    user_id = resolved.get(entry)
+                    if user_id is None:
+                        entry_status = BulkRegistrationStatus.UNKNOWN_USER
+                    elif user_id in registered:
+                        entry_status = BulkRegistrationStatus.ALREADY_REGISTERED
+                    elif len(to_add) >= free_slots:
+                        entry_status = BulkRegistrationStatus.OVER_CAPACITY
+                    else:
+                        entry_status = BulkRegistrationStatus.ADDED
+                        registered.add(user_id)
+                        to_add.append(user_id)
+                    
+                    results.append({"entry": entry, "status": entry_status, "userId": user_id})
+                
+                if not to_add:
+                    updated_tournament = await db.tournaments.find_one({"_id": tournament_oid})
+                    if not updated_tournament:
+                        # Deleted or archived since the snapshot was read
+                        raise HTTPException(
+                            status_code=status.HTTP_404_NOT_FOUND,
+                            detail="Tournament not found"
+                        )
+                    break
+                
+                # Apply all additions at once, unless someone joined meanwhile
+                updated_tournament = await db.tournaments.find_one_and_update(
+                    bulk_join_filter(tournament_oid, tournament["participantCount"]),
+                    bulk_join_update(to_add),
+                    return_document=ReturnDocument.AFTER
+                )
+                if updated_tournament:
+                    await record_participations(db, to_add)
+                    await response_cache.invalidate([tournament_oid])
+                    event_bus.publish(tournament_id, "participants", {
+                        "participantCount": updated_tournament["participantCount"],
+                        "joined": [str(user_id) for user_id in to_add]
+                    })
+                    break
+            else:
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="Tournament changed while registering, please retry"
+                )
             
-            return TournamentJoinResponse(
-                message="Successfully joined tournament!",
-                tournament=updated_tournament
-            )
+            return BSONJSONResponse({
+                "results": results,
+                "tournament": updated_tournament
+            })
             
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error joining tournament: {e}")
+            logger.error(f"Error bulk registering participants: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Error joining tournament"
+                detail="Error registering participants"
             )
 
-    return router
\ No newline at end of file
+    return router
@@ -1,48 +1,110 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Query
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from models.User import UserProfile
-from auth import get_current_user
+from models.User import UserProfile, ProfileUpdate
+from models.Tournament import TournamentStatus
+from auth import get_current_user, invalidate_user
+from services.pagination import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    KEYSET_SORT,
+    keyset_filter,
+    build_page
+)
+from services.projections import TOURNAMENT_SUMMARY_PROJECTION
+from services.user_stats import get_user_stats
+from services.serialization import BSONJSONResponse
+from services.profiles import ProfileFanout
+from services.response_cache import TournamentResponseCache
+from services.archive import ARCHIVE_COLLECTION, find_page_with_archive
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime
 from bson import ObjectId
+from typing import Optional
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
-def create_users_router(db: AsyncIOMotorDatabase) -> APIRouter:
+def _page_pipeline(match: dict, after: Optional[str], limit: int) -> list:
+    """Facet branch returning one keyset page of summary tournaments"""
+    page_match = dict(match)
+    page_match.update(keyset_filter(after))
+    return [
+        {"$match": page_match},
+        {"$sort": dict(KEYSET_SORT)},
+        {"$limit": limit + 1},
+        {"$project": TOURNAMENT_SUMMARY_PROJECTION}
+    ]
+
+def create_users_router(
+    db: AsyncIOMotorDatabase,
+    materialized_stats: bool = False,
+    profile_fanout: Optional[ProfileFanout] = None,
+    response_cache: Optional[TournamentResponseCache] = None
+) -> APIRouter:
     router = APIRouter(prefix="/users", tags=["users"])
 
+    if profile_fanout is None:
+        profile_fanout = ProfileFanout(db)
+
     @router.get("/profile", response_model=dict)
-    async def get_user_profile(current_user: dict = Depends(get_current_user)):
+    async def get_user_profile(
+        organizedAfter: Optional[str] = Query(None),
+        joinedAfter: Optional[str] = Query(None),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        current_user: dict = Depends(get_current_user)
+    ):
         """Get user profile with statistics and tournaments"""
         try:
             user_id = ObjectId(current_user["_id"])
-            
-            # Get user's tournaments
-            user_tournaments = await db.tournaments.find({"organizer": user_id}).to_list(100)
-            
-            # Format tournaments
-            formatted_tournaments = []
-            for tournament in user_tournaments:
-                tournament["_id"] = str(tournament["_id"])
-                tournament["organizer"] = str(tournament["organizer"])
-                tournament["participants"] = [str(p) for p in tournament.get("participants", [])]
-                formatted_tournaments.append(tournament)
-            
-            # Calculate user statistics
-            tournaments_created = len(user_tournaments)
-            tournaments_participated = await db.tournaments.count_documents({
-                "participants": user_id
-            })
-            
-            # Mock tournaments won for now (would need match results system)  
-            tournaments_won = min(3, tournaments_participated // 4)  # Mock: ~25% win rate
-            
-            stats = {
-                "tournamentsCreated": tournaments_created,
-                "tournamentsParticipated": tournaments_participated,
-                "tournamentsWon": tournaments_won
+            organized = {"organizer": user_id}
+            joined = {"participants": user_id}
+
+            # Both pages (and the counts, unless materialized) in one round trip.
+            # The leading $match uses the organizer and participants indexes.
+            facets = {
+                "organized": _page_pipeline(organized, organizedAfter, limit),
+                "joined": _page_pipeline(joined, joinedAfter, limit)
             }
-            
-            return {
+            if not materialized_stats:
+                facets["counts"] = [
+                    {"$group": {
+                        "_id": None,
+                        "tournamentsCreated": {
+                            "$sum": {"$cond": [{"$eq": ["$organizer", user_id]}, 1, 0]}
+                        },
+                        "tournamentsParticipated": {
+                            "$sum": {"$cond": [{"$in": [user_id, "$participants"]}, 1, 0]}
+                        }
+                    }}
+                ]
+
+            pipeline = [
+                {"$match": {"$or": [organized, joined]}},
+                {"$facet": facets}
+            ]
+
+            reads = [
+                db.tournaments.aggregate(pipeline).to_list(1),
+                get_user_stats(db, user_id)
+            ]
+            if not materialized_stats:
+                # Archived tournaments count too; both are index counts
+                reads.append(db[ARCHIVE_COLLECTION].count_documents(organized))
+                reads.append(db[ARCHIVE_COLLECTION].count_documents(joined))
+            results, stats, *archived = await asyncio.gather(*reads)
+            result = results[0] if results else {}
+
+            organized_page, organized_cursor = build_page(result.get("organized", []), limit)
+            joined_page, joined_cursor = build_page(result.get("joined", []), limit)
+
+            if not materialized_stats:
+                counts = (result.get("counts") or [{}])[0]
+                stats["tournamentsCreated"] = counts.get("tournamentsCreated", 0) + archived[0]
+                stats["tournamentsParticipated"] = counts.get("tournamentsParticipated", 0) + archived[1]
+
+            return BSONJSONResponse({
                 "user": {
                     "id": current_user["_id"],
                     "username": current_user["username"],
@@ -51,9 +113,14 @@ def create_users_router(db: AsyncIOMotorDatabase) -> APIRouter:
                     "createdAt": current_user["createdAt"]
                 },
                 "stats": stats,
-                "tournaments": formatted_tournaments
-            }
-            
+                "tournaments": organized_page,
+                "tournamentsNextCursor": organized_cursor,
+                "joined": joined_page,
+                "joinedNextCursor": joined_cursor
+            })
+
+        except HTTPException:
+            raise
         except Exception as e:
             logger.error(f"Error fetching user profile: {e}")
             raise HTTPException(
@@ -61,4 +128,100 @@ def create_users_router(db: AsyncIOMotorDatabase) -> APIRouter:
                 detail="Error fetching user profile"
             )
 
-    return router
\ No newline at end of file
+    @router.get("/profile/history", response_model=dict)
+    async def get_profile_history(
+        after: Optional[str] = Query(None),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Get the completed tournaments the user organized or joined, archived ones included"""
+        try:
+            user_id = ObjectId(current_user["_id"])
+            query = {
+                "status": TournamentStatus.COMPLETED,
+                "$or": [{"organizer": user_id}, {"participants": user_id}]
+            }
+            # The cursor filter is an $or of its own
+            page_filter = keyset_filter(after)
+            if page_filter:
+                query = {"$and": [query, page_filter]}
+
+            tournaments = await find_page_with_archive(db, query, TOURNAMENT_SUMMARY_PROJECTION, limit)
+            tournaments, next_cursor = build_page(tournaments, limit)
+
+            return BSONJSONResponse({"tournaments": tournaments, "nextCursor": next_cursor})
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error fetching profile history: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error fetching profile history"
+            )
+
+    @router.patch("/profile", response_model=dict)
+    async def update_user_profile(
+        update: ProfileUpdate,
+        current_user: dict = Depends(get_current_user)
+    ):
+        """Change the username or avatar
+
+        Participant lists resolve names at read time; the organizerName
+        copies on tournaments are updated by a background job shortly after.
+        """
+        try:
+            changes = update.model_dump(exclude_none=True)
+            if not changes:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Nothing to update"
+                )
+
+            user_id = ObjectId(current_user["_id"])
+            changes["updatedAt"] = datetime.utcnow()
+            try:
+                user = await db.users.find_one_and_update(
+                    {"_id": user_id},
+                    {"$set": changes},
+                    projection={"password": 0},
+                    return_document=ReturnDocument.AFTER
+                )
+            except DuplicateKeyError:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Username already taken"
+                )
+
+            if not user:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="User not found"
+                )
+
+            invalidate_user(current_user["_id"])
+            if response_cache is not None:
+                await response_cache.invalidate()
+            if "username" in changes and changes["username"] != current_user["username"]:
+                await profile_fanout.enqueue(user_id, user["username"])
+
+            return BSONJSONResponse({
+                "user": {
+                    "id": str(user["_id"]),
+                    "username": user["username"],
+                    "email": user["email"],
+                    "avatar": user["avatar"],
+                    "createdAt": user["createdAt"]
+                }
+            })
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error updating user profile: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Error updating user profile"
+            )
+
+    return router
@@ -3,6 +3,8 @@ from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
+import asyncio
+from datetime import timedelta
 import logging
 from pathlib import Path
 
@@ -10,18 +12,146 @@ from pathlib import Path
 from routes.auth import create_auth_router
 from routes.tournaments import create_tournaments_router
 from routes.users import create_users_router
+from routes.matches import create_matches_router
 from routes.stats import create_stats_router
+from routes.metrics import create_metrics_router
+from routes.ratings import create_ratings_router
+from routes.batch import create_batch_router
+from auth import init_auth, password_executor, user_cache, SECRET_KEY, ALGORITHM, PASSWORD_HASH_WORKERS
+from services.brackets import MATCHES_COLLECTION
+from models.Match import MatchStatus
+from services.stats import ensure_stats, run_reconciliation
+from services.scheduler import run_scheduler
+from services.cache import InProcessCacheBackend
+from services.response_cache import TournamentResponseCache
+from services.events import EventBus
+from services.status_relay import StatusRelay
+from services.profiles import ProfileFanout
+from services.ratings import RATINGS_COLLECTION, recompute_ratings
+from services.migrations import apply_migrations, verify_migrations
+from services.archive import run_archiver
+from services.metrics import REGISTRY
+from services.instrumentation import MetricsMiddleware, MongoCommandListener, MongoPoolListener
+from services.database import client_options, read_database, maintenance_timeout
+from services.serialization import BSONJSONResponse
+from services.ratelimit import RateLimiter, InProcessRateLimitBackend, BucketPolicy, RouteLimit
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
+# Request metrics, Mongo command monitoring and the slow-request log
+# (SLOW_REQUEST_MS=0 disables the log)
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN') or None
+SLOW_REQUEST_SECONDS = float(os.environ.get('SLOW_REQUEST_MS', 0)) / 1000
+
+# MongoDB connection; pool size and timeouts come from MONGO_* settings
+# (see services/database.py)
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+pool_listener = MongoPoolListener()
+client = AsyncIOMotorClient(
+    mongo_url,
+    event_listeners=[MongoCommandListener(), pool_listener] if METRICS_ENABLED else [],
+    **client_options(os.environ)
+)
 db = client[os.environ['DB_NAME']]
+init_auth(db)
+
+# Tournament lists, exports and platform stats may be served by secondaries;
+# joins, writes, details (whose cache entries follow writes) and profiles
+# read from the primary
+MONGO_READ_PREFERENCE = os.environ.get('MONGO_READ_PREFERENCE', 'secondaryPreferred')
+MONGO_READ_CONCERN = os.environ.get('MONGO_READ_CONCERN', 'local')
+read_db = read_database(client, os.environ['DB_NAME'], MONGO_READ_PREFERENCE, MONGO_READ_CONCERN)
+
+# Startup migrations: "apply" runs pending ones under a lock, "verify" only
+# refuses to start while any is pending (run `python migrate.py apply` as a
+# release step), "off" skips both
+MIGRATIONS_MODE = os.environ.get('MIGRATIONS_MODE', 'apply').lower()
+
+# Seconds between full rebuilds of the platform stats counters (0 disables);
+# the lease lets a single replica run them
+STATS_RECONCILE_INTERVAL = float(os.environ.get('STATS_RECONCILE_INTERVAL_SECONDS', 3600))
+STATS_RECONCILE_LEASE = float(os.environ.get('STATS_RECONCILE_LEASE_SECONDS', STATS_RECONCILE_INTERVAL * 3))
+
+# Seconds between scheduled status transition passes (0 disables); the lease
+# lets a single replica run them and must outlive a pass
+SCHEDULER_INTERVAL = float(os.environ.get('SCHEDULER_INTERVAL_SECONDS', 30))
+SCHEDULER_LEASE = float(os.environ.get('SCHEDULER_LEASE_SECONDS', SCHEDULER_INTERVAL * 3))
+
+# Completed tournaments unchanged for ARCHIVE_AFTER_DAYS move to the archive
+# collection; passes run every ARCHIVE_INTERVAL_SECONDS (0 disables) on the
+# replica holding the archival lease
+ARCHIVE_AFTER = timedelta(days=float(os.environ.get('ARCHIVE_AFTER_DAYS', 90)))
+ARCHIVE_INTERVAL = float(os.environ.get('ARCHIVE_INTERVAL_SECONDS', 3600))
+ARCHIVE_LEASE = float(os.environ.get('ARCHIVE_LEASE_SECONDS', ARCHIVE_INTERVAL * 3))
+
+# Tournament response cache (in-process; swap the backend for a shared store)
+RESPONSE_CACHE_SIZE = int(os.environ.get('RESPONSE_CACHE_SIZE', 5000))
+RESPONSE_CACHE_TTL = float(os.environ.get('RESPONSE_CACHE_TTL_SECONDS', 30))
+tournament_cache = TournamentResponseCache(
+    InProcessCacheBackend(RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL)
+)
+# Facet counts skip write invalidation and expire after this many seconds
+FACETS_CACHE_TTL = float(os.environ.get('FACETS_CACHE_TTL_SECONDS', 10))
+# Concurrent identical detail and stats reads share one Mongo query
+READ_COALESCING_ENABLED = os.environ.get('READ_COALESCING_ENABLED', 'true').lower() == 'true'
+
+# Live tournament update fan-out
+EVENTS_COALESCE_SECONDS = float(os.environ.get('EVENTS_COALESCE_MS', 100)) / 1000
+EVENTS_QUEUE_SIZE = int(os.environ.get('EVENTS_QUEUE_SIZE', 32))
+event_bus = EventBus(EVENTS_COALESCE_SECONDS, EVENTS_QUEUE_SIZE)
+# Status changes follow a change stream; without one (standalone mongod) the
+# watched tournaments are polled this often
+STATUS_POLL_SECONDS = float(os.environ.get('STATUS_POLL_SECONDS', 2))
+status_relay = StatusRelay(db, event_bus)
+
+# Seconds between polls for queued username propagations; renames on this
+# worker wake the job immediately
+PROFILE_FANOUT_INTERVAL = float(os.environ.get('PROFILE_FANOUT_INTERVAL_SECONDS', 60))
+profile_fanout = ProfileFanout(db)
+
+# Serve profile counters from the user_stats documents instead of counting
+MATERIALIZED_USER_STATS = os.environ.get('MATERIALIZED_USER_STATS', 'false').lower() == 'true'
+
+# Admission control for expensive routes: token buckets per client IP and
+# per authenticated user (tokens per second and capacity), route costs in
+# tokens, and per-worker concurrency caps beyond which requests get 503
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() == 'true'
+RATE_LIMIT_IP_RATE = float(os.environ.get('RATE_LIMIT_IP_RATE', 10))
+RATE_LIMIT_IP_BURST = float(os.environ.get('RATE_LIMIT_IP_BURST', 50))
+RATE_LIMIT_USER_RATE = float(os.environ.get('RATE_LIMIT_USER_RATE', 5))
+RATE_LIMIT_USER_BURST = float(os.environ.get('RATE_LIMIT_USER_BURST', 25))
+# Only behind a proxy that sets X-Forwarded-For; clients can forge it otherwise
+RATE_LIMIT_TRUST_FORWARDED = os.environ.get('RATE_LIMIT_TRUST_FORWARDED', 'false').lower() == 'true'
+AUTH_CONCURRENCY = int(os.environ.get('AUTH_CONCURRENCY', PASSWORD_HASH_WORKERS * 4))
+SEARCH_CONCURRENCY = int(os.environ.get('SEARCH_CONCURRENCY', 16))
+rate_limiter = RateLimiter(
+    InProcessRateLimitBackend(),
+    per_ip=BucketPolicy(RATE_LIMIT_IP_RATE, RATE_LIMIT_IP_BURST),
+    per_user=BucketPolicy(RATE_LIMIT_USER_RATE, RATE_LIMIT_USER_BURST),
+    routes={
+        "login": RouteLimit(cost=5, concurrency=AUTH_CONCURRENCY),
+        "register": RouteLimit(cost=10, concurrency=AUTH_CONCURRENCY),
+        "search": RouteLimit(cost=2, concurrency=SEARCH_CONCURRENCY),
+        # Streams outlive the dependency, so exports are only rate limited
+        "export": RouteLimit(cost=20),
+        "join": RouteLimit(cost=1),
+        "bulk_join": RouteLimit(cost=5),
+        # Items pay their own route's cost on top
+        "batch": RouteLimit(cost=2)
+    },
+    secret_key=SECRET_KEY,
+    algorithm=ALGORITHM,
+    trust_forwarded=RATE_LIMIT_TRUST_FORWARDED,
+    enabled=RATE_LIMIT_ENABLED
+)
+
+# Background tasks started on startup and cancelled on shutdown
+background_tasks = []
 
 # Create the main app
-app = FastAPI(title="TourneyHub API", version="1.0.0")
+app = FastAPI(title="TourneyHub API", version="1.0.0", default_response_class=BSONJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -32,10 +162,17 @@ async def root():
     return {"message": "TourneyHub API is running"}
 
 # Include all route modules
-api_router.include_router(create_auth_router(db))
-api_router.include_router(create_tournaments_router(db))
-api_router.include_router(create_users_router(db))
-api_router.include_router(create_stats_router(db))
+api_router.include_router(create_auth_router(db, rate_limiter))
+api_router.include_router(create_tournaments_router(
+    db, tournament_cache, event_bus, read_db, rate_limiter, FACETS_CACHE_TTL, READ_COALESCING_ENABLED
+))
+api_router.include_router(create_matches_router(db, tournament_cache, event_bus))
+api_router.include_router(create_users_router(db, MATERIALIZED_USER_STATS, profile_fanout, tournament_cache))
+api_router.include_router(create_stats_router(read_db, READ_COALESCING_ENABLED))
+api_router.include_router(create_ratings_router(read_db))
+api_router.include_router(create_batch_router(rate_limiter))
+if METRICS_ENABLED:
+    api_router.include_router(create_metrics_router(REGISTRY, METRICS_TOKEN))
 
 # Include the main API router
 app.include_router(api_router)
@@ -49,6 +186,57 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, slow_request_seconds=SLOW_REQUEST_SECONDS)
+
+    # Pool and cache occupancy, read at scrape time
+    REGISTRY.gauge(
+        "offload_pool_calls",
+        "Calls running or queued on the blocking-call pools",
+        lambda: {
+            ("bcrypt", "running"): password_executor.stats()["inFlight"],
+            ("bcrypt", "queued"): password_executor.stats()["queued"],
+            ("bcrypt", "rejected"): password_executor.stats()["rejected"]
+        },
+        ("pool", "state")
+    )
+    REGISTRY.gauge(
+        "cache_stats",
+        "Hits, misses, evictions and size of the in-process caches",
+        lambda: {
+            (name, key): value
+            for name, stats in (
+                ("tournament_responses", tournament_cache.backend.stats()),
+                ("users", user_cache.stats())
+            )
+            for key, value in stats.items()
+        },
+        ("cache", "stat")
+    )
+    REGISTRY.gauge(
+        "event_stream_subscribers",
+        "Clients connected to tournament event streams",
+        lambda: sum(channel["subscribers"] for channel in event_bus.stats()["channels"].values())
+    )
+    REGISTRY.gauge(
+        "rate_limited_in_flight",
+        "Requests in flight on routes with a concurrency cap",
+        lambda: {(route,): count for route, count in rate_limiter.stats().items()},
+        ("route",)
+    )
+    REGISTRY.gauge(
+        "mongo_pool_connections",
+        "Mongo connections per server that are open, checked out or waited for",
+        pool_listener.connections,
+        ("address", "state")
+    )
+    REGISTRY.gauge(
+        "mongo_pool_utilization",
+        "Share of each Mongo connection pool's maxPoolSize checked out",
+        pool_listener.utilization,
+        ("address",)
+    )
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -58,22 +246,56 @@ logger = logging.getLogger(__name__)
 
 @app.on_event("startup")
 async def startup_event():
-    """Create database indexes on startup"""
+    """Apply or verify migrations and start the background jobs"""
+    # Failures propagate so a worker never serves without its indexes
+    if MIGRATIONS_MODE == "apply":
+        applied = await apply_migrations(db)
+        if applied:
+            logger.info(f"Applied migrations {applied}")
+    elif MIGRATIONS_MODE == "verify":
+        await verify_migrations(db)
+
     try:
-        # Create indexes for better performance
-        await db.users.create_index("email", unique=True)
-        await db.users.create_index("username", unique=True)
-        await db.tournaments.create_index("status")
-        await db.tournaments.create_index("game")
-        await db.tournaments.create_index("organizer")
-        await db.tournaments.create_index("createdAt")
-        
-        logger.info("Database indexes created successfully")
+        with maintenance_timeout():
+            await ensure_stats(db)
     except Exception as e:
-        logger.warning(f"Error creating indexes: {e}")
+        logger.warning(f"Error initializing platform stats: {e}")
+
+    try:
+        # Ratings are maintained per result; rebuild them once if missing
+        if (not await db[RATINGS_COLLECTION].count_documents({}, limit=1)
+                and await db[MATCHES_COLLECTION].count_documents({"status": MatchStatus.COMPLETED}, limit=1)):
+            with maintenance_timeout():
+                await recompute_ratings(db)
+    except Exception as e:
+        logger.warning(f"Error initializing ratings: {e}")
+
+    if STATS_RECONCILE_INTERVAL > 0:
+        background_tasks.append(
+            asyncio.create_task(run_reconciliation(db, STATS_RECONCILE_INTERVAL, STATS_RECONCILE_LEASE))
+        )
+
+    background_tasks.append(asyncio.create_task(
+        profile_fanout.run(PROFILE_FANOUT_INTERVAL, tournament_cache)
+    ))
+
+    background_tasks.append(asyncio.create_task(status_relay.run(STATUS_POLL_SECONDS)))
+
+    if SCHEDULER_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(run_scheduler(
+            db, SCHEDULER_INTERVAL, SCHEDULER_LEASE, tournament_cache
+        )))
+
+    if ARCHIVE_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(run_archiver(
+            db, ARCHIVE_INTERVAL, ARCHIVE_AFTER, ARCHIVE_LEASE, tournament_cache
+        )))
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
     """Close database connection on shutdown"""
+    for task in background_tasks:
+        task.cancel()
+    password_executor.shutdown()
     client.close()
     logger.info("Database connection closed")
\ No newline at end of file
@@ -0,0 +1,253 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReplaceOne, DeleteOne, ASCENDING
+from bson import ObjectId
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from models.Tournament import TournamentStatus
+from services.pagination import KEYSET_SORT
+from services.search import SEARCH_COLLECTION, FACET_FIELDS, tournament_facets, index_tournament
+from services.leases import INSTANCE_ID, acquire_lease, release_lease
+from services.database import maintenance_timeout
+from services.response_cache import TournamentResponseCache
+import asyncio
+import heapq
+import itertools
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Completed tournaments are moved here once nothing has changed them for a
+# while; documents keep their shape and _id
+ARCHIVE_COLLECTION = "tournaments_archive"
+
+# Tournaments moved per batch; a full batch triggers another one at once
+ARCHIVE_BATCH_SIZE = 500
+
+# Lease letting a single replica run the archival passes
+ARCHIVE_LOCK = "tournament-archival"
+
+def wants_history(status_filter: Optional[str]) -> bool:
+    """Whether a list filter can match archived tournaments"""
+    return status_filter == TournamentStatus.COMPLETED.value
+
+async def find_tournament(db: AsyncIOMotorDatabase, query: dict, projection: Optional[dict] = None) -> Optional[dict]:
+    """Find one tournament in the hot collection, then in the archive
+
+    Lookups by ID are a request for that tournament's history, so they
+    fall back to the archive; the second query only runs on a miss.
+    """
+    tournament = await db.tournaments.find_one(query, projection)
+    if tournament is None:
+        tournament = await db[ARCHIVE_COLLECTION].find_one(query, projection)
+    return tournament
+
+async def find_page_with_archive(
+    db: AsyncIOMotorDatabase,
+    query: dict,
+    projection: Optional[dict],
+    limit: int
+) -> List[dict]:
+    """Up to limit + 1 tournaments in keyset order across both collections
+
+    Each collection returns its own first limit + 1 rows from its keyset
+    index and the two sorted runs are merged. A tournament caught between
+    being copied and being deleted by an archival pass appears once.
+    """
+    hot, cold = await asyncio.gather(
+        db.tournaments.find(query, projection).sort(KEYSET_SORT).limit(limit + 1).to_list(limit + 1),
+        db[ARCHIVE_COLLECTION].find(query, projection).sort(KEYSET_SORT).limit(limit + 1).to_list(limit + 1)
+    )
+    merged = heapq.merge(hot, cold, key=lambda t: (t["createdAt"], t["_id"]), reverse=True)
+
+    seen = set()
+    unique = (t for t in merged if not (t["_id"] in seen or seen.add(t["_id"])))
+    return list(itertools.islice(unique, limit + 1))
+
+def _merge_counts(*lists: List[dict]) -> List[dict]:
+    totals: Dict[str, int] = {}
+    for rows in lists:
+        for row in rows:
+            totals[row["value"]] = totals.get(row["value"], 0) + row["count"]
+    return [
+        {"value": value, "count": count}
+        for value, count in sorted(totals.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+async def facets_with_archive(db: AsyncIOMotorDatabase, search: Optional[str], filters: dict) -> Dict[str, list]:
+    """Facet counts agreeing with what the lists and searches return
+
+    Archived tournaments are all completed and completed lists and searches
+    include them, so they count toward the completed status and, while
+    that status is selected, toward the games and the total.
+    """
+    hot, cold = await asyncio.gather(
+        tournament_facets(db, search, filters),
+        tournament_facets(db, search, filters, ARCHIVE_COLLECTION)
+    )
+    history = wants_history(filters.get("status"))
+    counts = {"total": hot["total"] + cold["total"] if history else hot["total"]}
+    for field in FACET_FIELDS:
+        counts[field] = _merge_counts(hot[field], cold[field]) if history or field == "status" else hot[field]
+    return counts
+
+async def _next_or_none(cursor) -> Optional[dict]:
+    try:
+        return await cursor.__anext__()
+    except StopAsyncIteration:
+        return None
+
+async def stream_tournaments(
+    db: AsyncIOMotorDatabase,
+    query: dict,
+    sort: List[Tuple[str, int]],
+    batch_size: int,
+    include_archive: bool = True
+) -> AsyncIterator[dict]:
+    """Stream tournaments in ascending `sort` order, optionally with the archive
+
+    Both cursors are read in `sort` order and merged as they stream, so
+    memory stays at one batch per collection. As in find_page_with_archive,
+    a tournament caught in both collections with the same sort key is
+    yielded once.
+    """
+    fields = [field for field, _ in sort]
+    cursors = [db.tournaments.find(query).sort(sort).batch_size(batch_size)]
+    if include_archive:
+        cursors.append(db[ARCHIVE_COLLECTION].find(query).sort(sort).batch_size(batch_size))
+
+    try:
+        heads = [await _next_or_none(cursor) for cursor in cursors]
+        last_key = None
+        while True:
+            live = [i for i, head in enumerate(heads) if head is not None]
+            if not live:
+                return
+            i = min(live, key=lambda i: [heads[i][field] for field in fields])
+            tournament = heads[i]
+            heads[i] = await _next_or_none(cursors[i])
+
+            key = [tournament[field] for field in fields]
+            if key == last_key:
+                continue
+            last_key = key
+            yield tournament
+    finally:
+        for cursor in cursors:
+            await cursor.close()
+
+async def ensure_archive_indexes(db: AsyncIOMotorDatabase):
+    """Index the archival scan on the hot collection and the history reads"""
+    await db.tournaments.create_index([("status", ASCENDING), ("updatedAt", ASCENDING)])
+
+    archive = db[ARCHIVE_COLLECTION]
+    await archive.create_index([("createdAt", -1), ("_id", -1)])
+    await archive.create_index([("game", 1), ("createdAt", -1), ("_id", -1)])
+    await archive.create_index([("organizer", 1), ("createdAt", -1), ("_id", -1)])
+    await archive.create_index([("participants", 1), ("createdAt", -1), ("_id", -1)])
+
+async def ensure_archive_export_index(db: AsyncIOMotorDatabase):
+    """Index the export order on the archive"""
+    await db[ARCHIVE_COLLECTION].create_index([("updatedAt", ASCENDING), ("_id", ASCENDING)])
+
+async def archive_completed(
+    db: AsyncIOMotorDatabase,
+    older_than: timedelta,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    now: Optional[datetime] = None
+) -> List[ObjectId]:
+    """Move one batch of completed tournaments unchanged for `older_than`
+
+    Tournaments are copied first and then deleted only if unchanged since
+    they were read; the copies of changed ones are dropped again and picked
+    up by a later pass. A crash between the steps leaves a tournament in
+    both collections, which readers tolerate and the next pass finishes.
+    Their search postings are kept and marked archived, so searches of
+    completed tournaments still find them. Returns the archived IDs.
+    """
+    now = now or datetime.utcnow()
+    batch = await db.tournaments.find({
+        "status": TournamentStatus.COMPLETED,
+        "updatedAt": {"$lt": now - older_than}
+    }).limit(batch_size).to_list(batch_size)
+    if not batch:
+        return []
+
+    ids = [tournament["_id"] for tournament in batch]
+    await db[ARCHIVE_COLLECTION].bulk_write([
+        ReplaceOne({"_id": tournament["_id"]}, tournament, upsert=True)
+        for tournament in batch
+    ], ordered=False)
+
+    result = await db.tournaments.bulk_write([
+        DeleteOne({"_id": tournament["_id"], "updatedAt": tournament["updatedAt"]})
+        for tournament in batch
+    ], ordered=False)
+
+    archived = ids
+    if result.deleted_count < len(batch):
+        changed = set(await db.tournaments.distinct("_id", {"_id": {"$in": ids}}))
+        await db[ARCHIVE_COLLECTION].delete_many({"_id": {"$in": list(changed)}})
+        archived = [tournament_id for tournament_id in ids if tournament_id not in changed]
+
+    if archived:
+        await db[SEARCH_COLLECTION].update_many(
+            {"tournament": {"$in": archived}},
+            {"$set": {"archived": True}}
+        )
+    return archived
+
+async def run_archiver(
+    db: AsyncIOMotorDatabase,
+    interval_seconds: float,
+    older_than: timedelta,
+    lease_seconds: float,
+    response_cache: Optional[TournamentResponseCache] = None
+):
+    """Archive old completed tournaments while holding the archival lease
+
+    Every replica runs this loop; only the lease holder does any work. A
+    pass drains every eligible tournament batch by batch, renewing the
+    lease after each.
+    """
+    try:
+        while True:
+            try:
+                archived = []
+                while await acquire_lease(db, ARCHIVE_LOCK, INSTANCE_ID, lease_seconds):
+                    with maintenance_timeout():
+                        batch = await archive_completed(db, older_than)
+                    archived.extend(batch)
+                    if len(batch) < ARCHIVE_BATCH_SIZE:
+                        break
+
+                if archived:
+                    logger.info(f"Archived {len(archived)} completed tournaments")
+                    if response_cache:
+                        await response_cache.invalidate(archived)
+            except Exception as e:
+                logger.error(f"Error archiving tournaments: {e}")
+
+            await asyncio.sleep(interval_seconds)
+    finally:
+        try:
+            await release_lease(db, ARCHIVE_LOCK, INSTANCE_ID)
+        except Exception:
+            pass
+
+async def index_archived_tournaments(db: AsyncIOMotorDatabase, batch_size: int = 500) -> int:
+    """Rebuild the search postings of every archived tournament
+
+    Archival passes used to drop them; this restores them, marked archived.
+    """
+    indexed = 0
+    cursor = db[ARCHIVE_COLLECTION].find(
+        {},
+        {"name": 1, "game": 1, "organizerName": 1, "createdAt": 1}
+    ).batch_size(batch_size)
+
+    async for tournament in cursor:
+        await index_tournament(db, tournament, archived=True)
+        indexed += 1
+
+    logger.info(f"Rebuilt search index for {indexed} archived tournaments")
+    return indexed
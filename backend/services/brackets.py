@@ -0,0 +1,400 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne, ASCENDING
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from datetime import datetime
+from typing import Dict, Hashable, List, Optional, Set, Tuple
+from models.Match import BracketFormat, MatchStatus
+from models.Tournament import TournamentStatus
+from services.stats import record_status_change
+from services.user_stats import record_wins
+import math
+import logging
+
+logger = logging.getLogger(__name__)
+
+# One document per match, linked to the match its winner (and, in double
+# elimination, its loser) moves on to
+MATCHES_COLLECTION = "matches"
+
+# Bracket names stored on each match
+WINNERS = "winners"
+LOSERS = "losers"
+FINAL = "final"
+SWISS = "swiss"
+ROUND_ROBIN = "round_robin"
+
+ELIMINATION_FORMATS = (BracketFormat.SINGLE_ELIMINATION, BracketFormat.DOUBLE_ELIMINATION)
+
+# Depth-first steps spent looking for a rematch-free Swiss round before
+# settling for the closest-ranked pairing
+SWISS_PAIRING_BUDGET = 20000
+
+# Slot sources used while laying out elimination brackets:
+# ("player", id), ("winner", match_id), ("loser", match_id) or None for a bye
+Source = Optional[Tuple[str, Hashable]]
+
+def _new_match(bracket: str, round_number: int, position: int, players=(None, None)) -> dict:
+    return {
+        "_id": ObjectId(),
+        "bracket": bracket,
+        "round": round_number,
+        "position": position,
+        "players": list(players),
+        "winner": None,
+        "score": None,
+        "status": MatchStatus.PENDING,
+        "next": None,
+        "loserNext": None
+    }
+
+def bracket_size(count: int) -> int:
+    """Smallest power of two that fits `count` players (at least 2)"""
+    return 1 << max(1, (count - 1).bit_length())
+
+def seed_positions(size: int) -> List[int]:
+    """Seed indexes in bracket order for a power-of-two bracket
+
+    Seeds 0 and 1 can only meet in the final, seeds 0-3 in the semifinals
+    at the earliest, and so on. Missing seeds become byes for the top seeds.
+    """
+    order = [0]
+    while len(order) < size:
+        mirror = len(order) * 2 - 1
+        order = [seed for s in order for seed in (s, mirror - s)]
+    return order
+
+class _EliminationBuilder:
+    """Lay out elimination matches, collapsing byes at generation time
+
+    Byes depend only on the seeding, so a match with a single real source is
+    never stored: that source goes straight to where the match's winner
+    would have gone. Every stored match is one two players actually play.
+    """
+
+    def __init__(self):
+        self.matches: Dict[ObjectId, dict] = {}
+
+    def play(self, bracket: str, round_number: int, position: int, first: Source, second: Source) -> Tuple[Source, Source]:
+        """Return the (winner, loser) sources of a match between two sources"""
+        if first is None or second is None:
+            return (second if first is None else first), None
+
+        match = _new_match(bracket, round_number, position)
+        for slot, (kind, value) in enumerate((first, second)):
+            if kind == "player":
+                match["players"][slot] = value
+            else:
+                feeder = self.matches[value]
+                feeder["next" if kind == "winner" else "loserNext"] = {"match": match["_id"], "slot": slot}
+
+        self.matches[match["_id"]] = match
+        return ("winner", match["_id"]), ("loser", match["_id"])
+
+    def play_round(self, bracket: str, round_number: int, sources: List[Source]) -> Tuple[List[Source], List[Source]]:
+        """Pair consecutive sources; return the winner and loser sources"""
+        winners, losers = [], []
+        for position in range(len(sources) // 2):
+            winner, loser = self.play(
+                bracket, round_number, position, sources[2 * position], sources[2 * position + 1]
+            )
+            winners.append(winner)
+            losers.append(loser)
+        return winners, losers
+
+def _seeded_sources(players: list) -> List[Source]:
+    return [
+        ("player", players[seed]) if seed < len(players) else None
+        for seed in seed_positions(bracket_size(len(players)))
+    ]
+
+def single_elimination(players: list) -> List[dict]:
+    """Seeded knockout bracket; `players` is ordered best seed first"""
+    builder = _EliminationBuilder()
+    sources = _seeded_sources(players)
+    round_number = 1
+    while len(sources) > 1:
+        sources, _ = builder.play_round(WINNERS, round_number, sources)
+        round_number += 1
+    return list(builder.matches.values())
+
+def double_elimination(players: list) -> List[dict]:
+    """Seeded double knockout bracket ending in a single grand final
+
+    Losers of winners round r drop into the losers bracket, alternating
+    with rounds where the losers bracket halves itself. The grand final is
+    one match between the two bracket winners (no reset match).
+    """
+    builder = _EliminationBuilder()
+    winners, dropped = builder.play_round(WINNERS, 1, _seeded_sources(players))
+
+    if len(dropped) > 1:
+        survivors, _ = builder.play_round(LOSERS, 1, dropped)
+    else:
+        survivors = dropped
+
+    winners_round, losers_round = 2, 2
+    while len(winners) > 1:
+        winners, dropped = builder.play_round(WINNERS, winners_round, winners)
+
+        # Flip every other drop-in round so players do not meet the
+        # opponents they just met on the other side of the bracket
+        if winners_round % 2 == 0:
+            dropped = dropped[::-1]
+        paired = [source for pair in zip(survivors, dropped) for source in pair]
+        survivors, _ = builder.play_round(LOSERS, losers_round, paired)
+        losers_round += 1
+
+        if len(survivors) > 1:
+            survivors, _ = builder.play_round(LOSERS, losers_round, survivors)
+            losers_round += 1
+        winners_round += 1
+
+    builder.play(FINAL, 1, 0, winners[0], survivors[0])
+    return list(builder.matches.values())
+
+def round_robin(players: list) -> List[dict]:
+    """Every player meets every other once, scheduled by the circle method"""
+    rotation = list(players)
+    if len(rotation) % 2:
+        rotation.append(None)
+
+    count = len(rotation)
+    matches = []
+    for round_index in range(count - 1):
+        position = 0
+        for i in range(count // 2):
+            first, second = rotation[i], rotation[count - 1 - i]
+            if first is not None and second is not None:
+                matches.append(_new_match(ROUND_ROBIN, round_index + 1, position, (first, second)))
+                position += 1
+        rotation = [rotation[0], rotation[-1]] + rotation[1:-1]
+    return matches
+
+def default_swiss_rounds(count: int) -> int:
+    """Rounds needed for a single undefeated player to remain"""
+    return max(1, math.ceil(math.log2(count)))
+
+def standings(players: list, matches: List[dict]) -> List[dict]:
+    """Rank players by wins, then Buchholz (sum of opponents' wins), then seed"""
+    points = {player: 0 for player in players}
+    opponents = {player: [] for player in players}
+
+    for match in matches:
+        if match["status"] != MatchStatus.COMPLETED:
+            continue
+        points[match["winner"]] = points.get(match["winner"], 0) + 1
+        first, second = match["players"]
+        if second is not None:
+            opponents.setdefault(first, []).append(second)
+            opponents.setdefault(second, []).append(first)
+
+    seed = {player: index for index, player in enumerate(players)}
+    rows = [
+        {
+            "player": player,
+            "wins": points[player],
+            "buchholz": sum(points.get(opponent, 0) for opponent in opponents[player])
+        }
+        for player in players
+    ]
+    rows.sort(key=lambda row: (-row["wins"], -row["buchholz"], seed[row["player"]]))
+    return rows
+
+def swiss_pairings(ranked: list, played: Set[frozenset], had_bye: set) -> Tuple[List[tuple], Optional[Hashable]]:
+    """Pair players of similar standing who have not met yet
+
+    `ranked` is ordered best first. With an odd count the lowest ranked
+    player without a bye sits out. Opponents are tried closest-ranked first.
+    """
+    pool = list(ranked)
+    bye = None
+    if len(pool) % 2:
+        bye = next((player for player in reversed(pool) if player not in had_bye), pool[-1])
+        pool.remove(bye)
+
+    budget = [SWISS_PAIRING_BUDGET]
+
+    def search(remaining: list) -> Optional[List[tuple]]:
+        if not remaining:
+            return []
+        first, rest = remaining[0], remaining[1:]
+        for index, opponent in enumerate(rest):
+            if frozenset((first, opponent)) in played:
+                continue
+            budget[0] -= 1
+            if budget[0] < 0:
+                return None
+            tail = search(rest[:index] + rest[index + 1:])
+            if tail is not None:
+                return [(first, opponent)] + tail
+        return None
+
+    pairs = search(pool)
+    if pairs is None:
+        # No rematch-free round found in budget: pair neighbours in the ranking
+        pairs = [(pool[i], pool[i + 1]) for i in range(0, len(pool), 2)]
+    return pairs, bye
+
+def swiss_round(players: list, matches: List[dict], round_number: int) -> List[dict]:
+    """Matches of the next Swiss round given every match played so far"""
+    ranked = [row["player"] for row in standings(players, matches)]
+    played = {frozenset(match["players"]) for match in matches if match["players"][1] is not None}
+    had_bye = {match["players"][0] for match in matches if match["players"][1] is None}
+
+    pairs, bye = swiss_pairings(ranked, played, had_bye)
+    round_matches = [
+        _new_match(SWISS, round_number, position, pair)
+        for position, pair in enumerate(pairs)
+    ]
+    if bye is not None:
+        # A bye is stored as a completed single-player match worth one win
+        match = _new_match(SWISS, round_number, len(pairs), (bye, None))
+        match["winner"] = bye
+        match["status"] = MatchStatus.COMPLETED
+        round_matches.append(match)
+    return round_matches
+
+def generate_matches(bracket_format: BracketFormat, players: list) -> List[dict]:
+    """Opening matches for a bracket; Swiss rounds are paired one at a time"""
+    if bracket_format == BracketFormat.SINGLE_ELIMINATION:
+        return single_elimination(players)
+    if bracket_format == BracketFormat.DOUBLE_ELIMINATION:
+        return double_elimination(players)
+    if bracket_format == BracketFormat.ROUND_ROBIN:
+        return round_robin(players)
+    return swiss_round(players, [], 1)
+
+async def ensure_match_indexes(db: AsyncIOMotorDatabase):
+    """Create the index used to list matches and to serialize round creation"""
+    await db[MATCHES_COLLECTION].create_index(
+        [("tournament", ASCENDING), ("bracket", ASCENDING), ("round", ASCENDING), ("position", ASCENDING)],
+        unique=True
+    )
+
+async def insert_matches(db: AsyncIOMotorDatabase, tournament_id: ObjectId, matches: List[dict]) -> bool:
+    """Store matches of a tournament; False if they were already created"""
+    now = datetime.utcnow()
+    for match in matches:
+        match["tournament"] = tournament_id
+        match["createdAt"] = now
+        match["updatedAt"] = now
+
+    try:
+        await db[MATCHES_COLLECTION].insert_many(matches, ordered=True)
+    except BulkWriteError:
+        # Another request created the same round first
+        return False
+    return True
+
+async def finish_tournament(db: AsyncIOMotorDatabase, tournament_id: ObjectId, champion: ObjectId) -> bool:
+    """Mark an active tournament completed and credit the win"""
+    result = await db.tournaments.update_one(
+        {"_id": tournament_id, "status": TournamentStatus.ACTIVE},
+        {"$set": {
+            "status": TournamentStatus.COMPLETED,
+            "winner": champion,
+            "nextTransitionAt": None,
+            "updatedAt": datetime.utcnow()
+        }}
+    )
+    if not result.modified_count:
+        return False
+
+    await record_status_change(db, TournamentStatus.ACTIVE, TournamentStatus.COMPLETED)
+    await record_wins(db, [champion])
+    return True
+
+async def _played_matches(db: AsyncIOMotorDatabase, tournament_id: ObjectId, bracket: str) -> List[dict]:
+    return await db[MATCHES_COLLECTION].find(
+        {"tournament": tournament_id, "bracket": bracket},
+        {"players": 1, "winner": 1, "status": 1}
+    ).to_list(None)
+
+async def tournament_standings(db: AsyncIOMotorDatabase, tournament: dict) -> List[dict]:
+    """Current standings of a Swiss or round-robin tournament"""
+    bracket = tournament["bracket"]
+    name = SWISS if bracket["format"] == BracketFormat.SWISS else ROUND_ROBIN
+    matches = await _played_matches(db, tournament["_id"], name)
+    return standings(bracket["players"], matches)
+
+async def report_result(
+    db: AsyncIOMotorDatabase,
+    tournament: dict,
+    match: dict,
+    winner_id: ObjectId,
+    score: Optional[str] = None
+) -> Optional[dict]:
+    """Record the result of a ready match and move its players on
+
+    Advancing is one write per destination match (winner, and loser in
+    double elimination), whatever the bracket size. Returns the IDs of the
+    matches that changed and the champion if this result decided the
+    tournament, or None if the match was reported concurrently.
+    """
+    now = datetime.utcnow()
+    first, second = match["players"]
+    loser_id = second if first == winner_id else first
+
+    result = await db[MATCHES_COLLECTION].update_one(
+        {"_id": match["_id"], "status": MatchStatus.PENDING},
+        {"$set": {
+            "status": MatchStatus.COMPLETED,
+            "winner": winner_id,
+            "score": score,
+            "updatedAt": now
+        }}
+    )
+    if not result.modified_count:
+        return None
+
+    updated = [match["_id"]]
+    moves = []
+    for link, player in (("next", winner_id), ("loserNext", loser_id)):
+        destination = match.get(link)
+        if destination:
+            moves.append(UpdateOne(
+                {"_id": destination["match"]},
+                {"$set": {f"players.{destination['slot']}": player, "updatedAt": now}}
+            ))
+            updated.append(destination["match"])
+    if moves:
+        await db[MATCHES_COLLECTION].bulk_write(moves, ordered=False)
+
+    bracket = tournament["bracket"]
+    tournament_id = tournament["_id"]
+    champion = None
+
+    if bracket["format"] in ELIMINATION_FORMATS:
+        # Only the final has nowhere to send its winner
+        if not match.get("next"):
+            champion = winner_id
+
+    elif bracket["format"] == BracketFormat.SWISS:
+        round_open = await db[MATCHES_COLLECTION].count_documents(
+            {"tournament": tournament_id, "bracket": SWISS, "round": match["round"], "status": MatchStatus.PENDING},
+            limit=1
+        )
+        if not round_open:
+            played = await _played_matches(db, tournament_id, SWISS)
+            if match["round"] < bracket["rounds"]:
+                next_round = swiss_round(bracket["players"], played, match["round"] + 1)
+                if await insert_matches(db, tournament_id, next_round):
+                    updated.extend(m["_id"] for m in next_round)
+            else:
+                champion = standings(bracket["players"], played)[0]["player"]
+
+    else:
+        tournament_open = await db[MATCHES_COLLECTION].count_documents(
+            {"tournament": tournament_id, "bracket": ROUND_ROBIN, "status": MatchStatus.PENDING},
+            limit=1
+        )
+        if not tournament_open:
+            played = await _played_matches(db, tournament_id, ROUND_ROBIN)
+            champion = standings(bracket["players"], played)[0]["player"]
+
+    finished = False
+    if champion is not None:
+        finished = await finish_tournament(db, tournament_id, champion)
+
+    return {"updated": updated, "champion": champion if finished else None}
@@ -0,0 +1,130 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+import time
+
+class TTLCache:
+    """Bounded in-process LRU cache whose entries expire after a fixed TTL"""
+
+    def __init__(
+        self,
+        max_size: int,
+        ttl_seconds: float,
+        clock: Callable[[], float] = time.monotonic
+    ):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return a live entry and mark it most recently used"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= self._clock():
+            del self._entries[key]
+            self.misses += 1
+            return default
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None):
+        """Store an entry, evicting the least recently used one when full"""
+        if self.max_size <= 0:
+            return
+
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._entries[key] = (self._clock() + ttl, value)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable):
+        """Drop a single entry if present"""
+        self._entries.pop(key, None)
+
+    def clear(self):
+        """Drop every entry"""
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return size and hit/miss/eviction counters"""
+        return {
+            "size": len(self._entries),
+            "maxSize": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+class CacheBackend(ABC):
+    """Async key/value store used by the response caches
+
+    The default implementation lives in process. A shared store (Redis,
+    memcached, ...) can be plugged in by implementing the same methods.
+    """
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[Any]:
+        """Return the stored value or None"""
+
+    @abstractmethod
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        """Store a value, optionally with its own TTL"""
+
+    @abstractmethod
+    async def delete(self, key: str):
+        """Remove a key if present"""
+
+    @abstractmethod
+    async def incr(self, key: str) -> int:
+        """Atomically increment an integer counter and return its new value"""
+
+    @abstractmethod
+    async def get_counter(self, key: str) -> int:
+        """Return the current value of a counter, 0 if never incremented"""
+
+    def stats(self) -> dict:
+        """Return backend specific counters"""
+        return {}
+
+class InProcessCacheBackend(CacheBackend):
+    """CacheBackend backed by a TTLCache in this worker's memory"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self._cache = TTLCache(max_size, ttl_seconds)
+        self._counters = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self._cache.get(key)
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        self._cache.set(key, value, ttl_seconds)
+
+    async def delete(self, key: str):
+        self._cache.invalidate(key)
+
+    async def incr(self, key: str) -> int:
+        # Counters are never evicted, otherwise a generation could repeat
+        self._counters[key] = self._counters.get(key, 0) + 1
+        return self._counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self._counters.get(key, 0)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
@@ -0,0 +1,77 @@
+from services.metrics import REGISTRY
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+import asyncio
+import functools
+import logging
+
+logger = logging.getLogger(__name__)
+
+SINGLE_FLIGHT_CALLS = REGISTRY.counter(
+    "single_flight_calls",
+    "Coalesced reads by whether the caller ran the read or shared one in flight",
+    ("name", "outcome")
+)
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers asking for the same key
+
+    The first caller for a key starts the call as a task; callers arriving
+    before it finishes await the same task and get its result or exception.
+    Nothing is kept once it finishes, so this is not a cache: a caller can
+    only get a result read shortly before it arrived. Where a write must be
+    visible right away, key the call on the write generation, as the
+    response cache keys are.
+
+    Waiting callers are shielded, so a disconnecting caller does not cancel
+    the call for the others.
+    """
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        if not self.enabled:
+            SINGLE_FLIGHT_CALLS.inc(self.name, "executed")
+            return await fn()
+
+        call = self._calls.get(key)
+        if call is None:
+            SINGLE_FLIGHT_CALLS.inc(self.name, "executed")
+            call = self._calls[key] = asyncio.ensure_future(fn())
+            call.add_done_callback(functools.partial(self._finished, key))
+        else:
+            SINGLE_FLIGHT_CALLS.inc(self.name, "coalesced")
+        return await asyncio.shield(call)
+
+    def _finished(self, key: Hashable, call: asyncio.Future):
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        # Retrieve the outcome so a failure nobody awaited is not reported
+        # as never retrieved; the callers that did await it handle it
+        if not call.cancelled():
+            call.exception()
+
+    def stats(self) -> dict:
+        return {"inFlight": len(self._calls)}
+
+def coalesced(name: str, key: Optional[Callable[..., Hashable]] = None, enabled: bool = True):
+    """Decorator coalescing concurrent calls of an async function
+
+    Calls share a flight when `key` (called with the same arguments)
+    returns equal values; by default every argument is part of the key.
+    The SingleFlight is exposed as the wrapper's `flight` attribute.
+    """
+    def decorate(fn: Callable[..., Awaitable[Any]]):
+        flight = SingleFlight(name, enabled)
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            call_key = key(*args, **kwargs) if key else (args, tuple(sorted(kwargs.items())))
+            return await flight.do(call_key, lambda: fn(*args, **kwargs))
+
+        wrapper.flight = flight
+        return wrapper
+
+    return decorate
@@ -0,0 +1,61 @@
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo.read_concern import ReadConcern
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+from typing import Mapping
+import pymongo
+
+# Operation budget for migrations and periodic rebuilds, which scan
+# whole collections and would trip the per-request MONGO_TIMEOUT_MS
+MAINTENANCE_TIMEOUT_SECONDS = 3600
+
+def client_options(env: Mapping[str, str]) -> dict:
+    """Build AsyncIOMotorClient keyword options from MONGO_* settings
+
+    MONGO_TIMEOUT_MS bounds every operation, including the wait for a pooled
+    connection, and is sent to the server as maxTimeMS. When it is 0,
+    MONGO_WAIT_QUEUE_TIMEOUT_MS bounds only the wait for a connection.
+    """
+    options = {
+        "maxPoolSize": int(env.get("MONGO_MAX_POOL_SIZE", 100)),
+        "minPoolSize": int(env.get("MONGO_MIN_POOL_SIZE", 0)),
+        "waitQueueTimeoutMS": int(env.get("MONGO_WAIT_QUEUE_TIMEOUT_MS", 2000)),
+        "serverSelectionTimeoutMS": int(env.get("MONGO_SERVER_SELECTION_TIMEOUT_MS", 5000)),
+        "connectTimeoutMS": int(env.get("MONGO_CONNECT_TIMEOUT_MS", 5000))
+    }
+
+    timeout_ms = int(env.get("MONGO_TIMEOUT_MS", 10000))
+    if timeout_ms > 0:
+        options["timeoutMS"] = timeout_ms
+
+    # e.g. "zstd,snappy,zlib"; the server picks the first one it supports
+    compressors = env.get("MONGO_COMPRESSORS", "")
+    if compressors:
+        options["compressors"] = compressors
+
+    return options
+
+def read_database(
+    client: AsyncIOMotorClient,
+    name: str,
+    read_preference: str = "secondaryPreferred",
+    read_concern: str = "local"
+) -> AsyncIOMotorDatabase:
+    """Handle for read-mostly endpoints that tolerate replication lag
+
+    Writes made through it still go to the primary. On a standalone server
+    every read preference resolves to the primary.
+    """
+    mode = read_pref_mode_from_name(read_preference)
+    return client.get_database(
+        name,
+        read_preference=make_read_preference(mode, None),
+        read_concern=ReadConcern(read_concern)
+    )
+
+def maintenance_timeout():
+    """Context manager giving background jobs a longer operation budget
+
+    Enter it around each pass rather than around code that starts tasks, as
+    tasks inherit the deadline it sets.
+    """
+    return pymongo.timeout(MAINTENANCE_TIMEOUT_SECONDS)
@@ -0,0 +1,150 @@
+from typing import Dict, List, Optional
+import asyncio
+import json
+import logging
+
+logger = logging.getLogger(__name__)
+
+def _merge(pending: dict, data: dict) -> dict:
+    """Coalesce two payloads of the same event type
+
+    List values are concatenated (e.g. participants joined during the window),
+    everything else keeps the latest value.
+    """
+    merged = dict(pending)
+    for key, value in data.items():
+        if isinstance(value, list) and isinstance(merged.get(key), list):
+            merged[key] = merged[key] + value
+        else:
+            merged[key] = value
+    return merged
+
+def sse_frame(event_type: str, data: dict) -> bytes:
+    """Encode one Server-Sent Events frame"""
+    payload = json.dumps(data, separators=(",", ":"), default=str)
+    return f"event: {event_type}\ndata: {payload}\n\n".encode()
+
+# Sent to a subscriber whose queue overflowed: its view is stale, refetch
+RESYNC_FRAME = sse_frame("resync", {})
+
+class Subscriber:
+    """One connected client with a bounded queue of encoded frames"""
+
+    def __init__(self, max_queue: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue)
+        self.resyncs = 0
+
+    def deliver(self, frame: bytes) -> bool:
+        """Queue a frame without blocking; returns False if the client lagged"""
+        try:
+            self.queue.put_nowait(frame)
+            return True
+        except asyncio.QueueFull:
+            # Never buffer without bound for a slow reader: replace its backlog
+            # with a single resync marker so it refetches the full document
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_FRAME)
+            self.resyncs += 1
+            return False
+
+class Channel:
+    """Subscribers of one tournament plus the events waiting to be flushed"""
+
+    def __init__(self):
+        self.subscribers = set()
+        self.pending: Dict[str, dict] = {}
+        self.flush_handle: Optional[asyncio.TimerHandle] = None
+        self.published = 0
+        self.flushed = 0
+
+class EventBus:
+    """In-process publish/subscribe hub for per-tournament update events
+
+    Publishes within `coalesce_seconds` of each other are merged per event
+    type and fanned out once: each frame is encoded a single time and the
+    same bytes are queued for every subscriber, so N viewers cost one
+    serialization rather than N queries. Only events published by this
+    worker are seen by its subscribers; status changes reach every worker
+    through its StatusRelay.
+    """
+
+    def __init__(self, coalesce_seconds: float = 0.1, max_queue: int = 32):
+        self.coalesce_seconds = coalesce_seconds
+        self.max_queue = max_queue
+        self._channels: Dict[str, Channel] = {}
+        self.lagged = 0
+
+    def subscribe(self, channel_name: str) -> Subscriber:
+        """Register a new subscriber on a channel"""
+        channel = self._channels.setdefault(channel_name, Channel())
+        subscriber = Subscriber(self.max_queue)
+        channel.subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, channel_name: str, subscriber: Subscriber):
+        """Remove a subscriber, dropping the channel once it is empty"""
+        channel = self._channels.get(channel_name)
+        if channel is None:
+            return
+
+        channel.subscribers.discard(subscriber)
+        if not channel.subscribers:
+            if channel.flush_handle:
+                channel.flush_handle.cancel()
+            del self._channels[channel_name]
+
+    def publish(self, channel_name: str, event_type: str, data: dict):
+        """Queue an event for the channel's next coalesced flush"""
+        channel = self._channels.get(channel_name)
+        if channel is None:
+            # Nobody is listening; nothing to do
+            return
+
+        channel.published += 1
+        pending = channel.pending.get(event_type)
+        channel.pending[event_type] = _merge(pending, data) if pending else dict(data)
+
+        if channel.flush_handle is None:
+            loop = asyncio.get_running_loop()
+            channel.flush_handle = loop.call_later(
+                self.coalesce_seconds, self._flush, channel_name
+            )
+
+    def _flush(self, channel_name: str):
+        channel = self._channels.get(channel_name)
+        if channel is None:
+            return
+
+        channel.flush_handle = None
+        events, channel.pending = channel.pending, {}
+        channel.flushed += 1
+
+        for event_type, data in events.items():
+            frame = sse_frame(event_type, data)
+            for subscriber in channel.subscribers:
+                if not subscriber.deliver(frame):
+                    self.lagged += 1
+
+    def channel_names(self) -> List[str]:
+        """Channels with at least one subscriber"""
+        return list(self._channels)
+
+    def subscriber_count(self, channel_name: str) -> int:
+        """Number of clients currently subscribed to a channel"""
+        channel = self._channels.get(channel_name)
+        return len(channel.subscribers) if channel else 0
+
+    def stats(self) -> dict:
+        """Return per-channel subscriber counts and fan-out counters"""
+        return {
+            "channels": {
+                name: {
+                    "subscribers": len(channel.subscribers),
+                    "published": channel.published,
+                    "flushed": channel.flushed
+                }
+                for name, channel in self._channels.items()
+            },
+            "laggedDeliveries": self.lagged
+        }
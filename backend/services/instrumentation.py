@@ -0,0 +1,326 @@
+from pymongo import monitoring
+from pymongo.common import MAX_POOL_SIZE
+from services.metrics import REGISTRY, COUNT_BUCKETS
+from typing import Any, Optional
+import contextvars
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+REQUEST_DURATION = REGISTRY.histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template and status code",
+    ("method", "route", "status")
+)
+REQUEST_MONGO_CALLS = REGISTRY.histogram(
+    "http_request_mongo_calls",
+    "Mongo round trips made while serving one request",
+    ("route",),
+    buckets=COUNT_BUCKETS
+)
+REQUEST_MONGO_SECONDS = REGISTRY.histogram(
+    "http_request_mongo_seconds",
+    "Total Mongo command time spent while serving one request",
+    ("route",)
+)
+MONGO_COMMAND_SECONDS = REGISTRY.histogram(
+    "mongo_command_duration_seconds",
+    "Mongo command latency as reported by command monitoring",
+    ("command", "collection")
+)
+MONGO_COMMAND_FAILURES = REGISTRY.counter(
+    "mongo_command_failures",
+    "Mongo commands that returned an error",
+    ("command", "collection")
+)
+
+MONGO_POOL_CHECKOUT_FAILURES = REGISTRY.counter(
+    "mongo_pool_checkout_failures",
+    "Connection checkouts that failed, e.g. on a wait queue timeout",
+    ("address", "reason")
+)
+
+_in_flight = [0]
+REGISTRY.gauge(
+    "http_requests_in_flight",
+    "Requests currently being served",
+    lambda: _in_flight[0]
+)
+
+# Commands shown in slow-request logs per request, beyond which they are counted only
+MAX_LOGGED_COMMANDS = 50
+
+class RequestStats:
+    """Mongo and offload time attributed to the request being served
+
+    Motor reports commands from its executor threads, several at once when
+    a request gathers queries, so updates go through the methods below.
+    """
+
+    __slots__ = ("capture", "db_calls", "db_seconds", "offload_seconds", "commands", "pending", "_lock")
+
+    def __init__(self, capture: bool = False):
+        self.capture = capture
+        self.db_calls = 0
+        self.db_seconds = 0.0
+        self.offload_seconds = 0.0
+        self.commands = []
+        self.pending = {}
+        self._lock = threading.Lock()
+
+    def has_room(self) -> bool:
+        """Whether another command would be kept for the slow-request log"""
+        return self.capture and len(self.commands) + len(self.pending) < MAX_LOGGED_COMMANDS
+
+    def command_started(self, request_id: int, command: tuple):
+        with self._lock:
+            if self.has_room():
+                self.pending[request_id] = command
+
+    def command_finished(self, request_id: int, seconds: float):
+        with self._lock:
+            self.db_calls += 1
+            self.db_seconds += seconds
+            started = self.pending.pop(request_id, None)
+            if started:
+                self.commands.append(started + (round(seconds * 1000, 3),))
+
+    def add_offload(self, seconds: float):
+        with self._lock:
+            self.offload_seconds += seconds
+
+_request_stats: contextvars.ContextVar = contextvars.ContextVar("request_stats", default=None)
+
+def current_request_stats() -> Optional[RequestStats]:
+    """Stats of the request served by the current task, if any
+
+    Motor copies the context into its executor threads, so this also works
+    inside the command listener.
+    """
+    return _request_stats.get()
+
+def _shape(value: Any, depth: int = 0) -> Any:
+    """Replace literal values with '?' keeping field names and operators"""
+    if isinstance(value, dict):
+        if depth > 4:
+            return "{...}"
+        return {key: _shape(item, depth + 1) for key, item in value.items()}
+    if isinstance(value, list):
+        # $in / $or lists collapse to the shape of their first element
+        return [_shape(value[0], depth + 1)] if value else []
+    return "?"
+
+def query_shape(command_name: str, command: dict) -> Any:
+    """Literal-free summary of what a command asked Mongo for"""
+    if command_name == "find":
+        return {"filter": _shape(command.get("filter", {})), "sort": list(command.get("sort", {}))}
+    if command_name == "aggregate":
+        return [
+            {stage: _shape(body) if stage == "$match" else "..."}
+            for step in command.get("pipeline", [])
+            for stage, body in step.items()
+        ]
+    if command_name in ("update", "delete"):
+        statements = command.get("updates" if command_name == "update" else "deletes", [])
+        return {"q": _shape(statements[0].get("q", {})) if statements else {}, "n": len(statements)}
+    if command_name == "findAndModify":
+        return {"query": _shape(command.get("query", {}))}
+    if command_name in ("count", "distinct"):
+        return {"query": _shape(command.get("query", {}))}
+    if command_name == "insert":
+        return {"n": len(command.get("documents", []))}
+    return None
+
+def _collection(command_name: str, command: dict) -> str:
+    if command_name == "getMore":
+        return str(command.get("collection", ""))
+    target = command.get(command_name)
+    return target if isinstance(target, str) else ""
+
+class MongoCommandListener(monitoring.CommandListener):
+    """Time every Mongo command globally and against the current request"""
+
+    def __init__(self):
+        # (connection, request id) -> (command, collection) until the reply
+        self._started = {}
+
+    def started(self, event):
+        collection = _collection(event.command_name, event.command)
+        self._started[(event.connection_id, event.request_id)] = (event.command_name, collection)
+
+        stats = _request_stats.get()
+        # Checked again under the lock; this only skips shaping commands
+        # that would not be kept
+        if stats is not None and stats.has_room():
+            stats.command_started(event.request_id, (
+                event.command_name, collection, query_shape(event.command_name, event.command)
+            ))
+
+    def _finished(self, event, failed: bool):
+        command_name, collection = self._started.pop(
+            (event.connection_id, event.request_id), (event.command_name, "")
+        )
+        seconds = event.duration_micros / 1e6
+        MONGO_COMMAND_SECONDS.observe(seconds, command_name, collection)
+        if failed:
+            MONGO_COMMAND_FAILURES.inc(command_name, collection)
+
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.command_finished(event.request_id, seconds)
+
+    def succeeded(self, event):
+        self._finished(event, failed=False)
+
+    def failed(self, event):
+        self._finished(event, failed=True)
+
+class PoolStats:
+    """Connection counts of one server's pool"""
+
+    __slots__ = ("max_size", "open", "in_use", "waiting")
+
+    def __init__(self, max_size: int = 0):
+        self.max_size = max_size
+        self.open = 0
+        self.in_use = 0
+        self.waiting = 0
+
+class MongoPoolListener(monitoring.ConnectionPoolListener):
+    """Track connection pool occupancy per server from CMAP events
+
+    A pool whose connections are all in use with checkouts waiting is about
+    to start failing requests with wait queue timeouts.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.pools = {}
+
+    def _pool(self, address) -> PoolStats:
+        key = f"{address[0]}:{address[1]}"
+        pool = self.pools.get(key)
+        if pool is None:
+            pool = self.pools[key] = PoolStats()
+        return pool
+
+    def pool_created(self, event):
+        with self._lock:
+            # Options only list values that differ from the driver defaults
+            self._pool(event.address).max_size = event.options.get("maxPoolSize", MAX_POOL_SIZE)
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        with self._lock:
+            self.pools.pop(f"{event.address[0]}:{event.address[1]}", None)
+
+    def connection_created(self, event):
+        with self._lock:
+            self._pool(event.address).open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._pool(event.address).open -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._pool(event.address).waiting += 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._pool(event.address).waiting -= 1
+        MONGO_POOL_CHECKOUT_FAILURES.inc(f"{event.address[0]}:{event.address[1]}", event.reason)
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            pool = self._pool(event.address)
+            pool.waiting -= 1
+            pool.in_use += 1
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._pool(event.address).in_use -= 1
+
+    def connections(self) -> dict:
+        """Gauge values keyed by (address, state)"""
+        with self._lock:
+            return {
+                (address, state): value
+                for address, pool in self.pools.items()
+                for state, value in (("open", pool.open), ("in_use", pool.in_use), ("waiting", pool.waiting))
+            }
+
+    def utilization(self) -> dict:
+        """Share of each pool's maximum size checked out, keyed by (address,)"""
+        with self._lock:
+            return {
+                (address,): pool.in_use / pool.max_size
+                for address, pool in self.pools.items()
+                if pool.max_size
+            }
+
+class MetricsMiddleware:
+    """ASGI middleware recording latency and Mongo usage per route
+
+    Routes are labelled by their template (e.g. /api/tournaments/{tournament_id})
+    so label cardinality stays bounded. With `slow_request_seconds` set,
+    requests slower than it are logged with the shapes of the Mongo
+    commands they ran.
+    """
+
+    def __init__(self, app, slow_request_seconds: float = 0):
+        self.app = app
+        self.slow_request_seconds = slow_request_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(capture=self.slow_request_seconds > 0)
+        token = _request_stats.set(stats)
+        status_code = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status_code[0] = message["status"]
+            await send(message)
+
+        _in_flight[0] += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            _in_flight[0] -= 1
+            _request_stats.reset(token)
+
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUEST_DURATION.observe(elapsed, scope["method"], path, str(status_code[0]))
+            REQUEST_MONGO_CALLS.observe(stats.db_calls, path)
+            REQUEST_MONGO_SECONDS.observe(stats.db_seconds, path)
+
+            if self.slow_request_seconds and elapsed >= self.slow_request_seconds:
+                logger.warning("Slow request " + json.dumps({
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": path,
+                    "status": status_code[0],
+                    "ms": round(elapsed * 1000, 3),
+                    "mongoCalls": stats.db_calls,
+                    "mongoMs": round(stats.db_seconds * 1000, 3),
+                    "offloadMs": round(stats.offload_seconds * 1000, 3),
+                    "commands": [
+                        {"command": name, "collection": collection, "shape": shape, "ms": ms}
+                        for name, collection, shape, ms in stats.commands
+                    ]
+                }, default=str))
@@ -0,0 +1,39 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta
+from typing import Optional
+import os
+import socket
+import uuid
+
+# Lease documents, one per singleton background job
+LOCKS_COLLECTION = "scheduler_locks"
+
+# Identifies this process as a lease owner
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+async def acquire_lease(
+    db: AsyncIOMotorDatabase,
+    name: str,
+    owner: str,
+    lease_seconds: float,
+    now: Optional[datetime] = None
+) -> bool:
+    """Take or renew a named lease; False while another owner holds it"""
+    now = now or datetime.utcnow()
+    try:
+        lease = await db[LOCKS_COLLECTION].find_one_and_update(
+            {"_id": name, "$or": [{"owner": owner}, {"expiresAt": {"$lte": now}}]},
+            {"$set": {"owner": owner, "expiresAt": now + timedelta(seconds=lease_seconds)}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+    except DuplicateKeyError:
+        # The lease exists and is held by someone else: the upsert collided
+        return False
+    return lease is not None
+
+async def release_lease(db: AsyncIOMotorDatabase, name: str, owner: str):
+    """Give a lease up early so another replica can take over immediately"""
+    await db[LOCKS_COLLECTION].delete_one({"_id": name, "owner": owner})
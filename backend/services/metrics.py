@@ -0,0 +1,209 @@
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple, Union
+import math
+import threading
+
+# Latency buckets in seconds, from sub-millisecond DB calls to slow pages
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+    0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# Buckets for small per-request counts such as Mongo round trips
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _number(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+class Metric:
+    """Base class of the metrics rendered by a MetricsRegistry"""
+
+    kind = "untyped"
+    # Appended to the name in HELP and TYPE, for families whose samples
+    # all carry a suffix
+    family_suffix = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def samples(self) -> List[Tuple[str, str, float]]:
+        """Return (suffix, rendered labels, value) triples"""
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        family = self.name + self.family_suffix
+        lines = [
+            f"# HELP {family} {self.documentation}",
+            f"# TYPE {family} {self.kind}"
+        ]
+        for suffix, labels, value in self.samples():
+            lines.append(f"{self.name}{suffix}{labels} {_number(value)}")
+        return lines
+
+class Counter(Metric):
+    """Monotonically increasing count per label set
+
+    Samples are named `<name>_total`, and so are their HELP and TYPE lines,
+    as the 0.0.4 text format requires.
+    """
+
+    kind = "counter"
+    family_suffix = "_total"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[tuple, float] = {}
+
+    def inc(self, *labels: str, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, *labels: str) -> float:
+        """Current count of one label set"""
+        with self._lock:
+            return self._values.get(labels, 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [("_total", _labels(self.labelnames, labels), value) for labels, value in items]
+
+class Histogram(Metric):
+    """Bucketed distribution of observed values per label set"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [count per bucket (+Inf last), sum, count]
+        self._series: Dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels: str):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def samples(self):
+        with self._lock:
+            snapshot = [(labels, list(series[0]), series[1], series[2]) for labels, series in self._series.items()]
+
+        samples = []
+        for labels, counts, total, count in snapshot:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (math.inf,), counts):
+                cumulative += bucket_count
+                samples.append((
+                    "_bucket",
+                    _labels(self.labelnames, labels, f'le="{_number(bound)}"'),
+                    cumulative
+                ))
+            samples.append(("_sum", _labels(self.labelnames, labels), total))
+            samples.append(("_count", _labels(self.labelnames, labels), count))
+        return samples
+
+GaugeValue = Union[float, Dict[tuple, float]]
+
+class Gauge(Metric):
+    """Current value read from a callback at scrape time
+
+    The callback returns a number, or a {label values: number} dict when
+    the gauge has labels.
+    """
+
+    kind = "gauge"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], GaugeValue],
+        labelnames: Sequence[str] = ()
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.callback = callback
+
+    def samples(self):
+        value = self.callback()
+        if isinstance(value, dict):
+            return [("", _labels(self.labelnames, labels), v) for labels, v in value.items()]
+        return [("", "", value)]
+
+class MetricsRegistry:
+    """Collection of metrics rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        """Add a metric; registering the same name twice returns the first one"""
+        return self._metrics.setdefault(metric.name, metric)
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(
+        self,
+        name: str,
+        documentation: str,
+        callback: Callable[[], GaugeValue],
+        labelnames: Sequence[str] = ()
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, callback, labelnames))
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+# Process-wide registry shared by the middleware, the Mongo listener and
+# the services that export their own counters
+REGISTRY = MetricsRegistry()
+
+OFFLOAD_WAIT_SECONDS = REGISTRY.histogram(
+    "offload_wait_seconds",
+    "Time blocking calls waited for a worker thread",
+    ("pool",)
+)
+OFFLOAD_RUN_SECONDS = REGISTRY.histogram(
+    "offload_run_seconds",
+    "Time blocking calls (e.g. bcrypt) ran on a worker thread",
+    ("pool",)
+)
@@ -0,0 +1,282 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+from bson import ObjectId
+from datetime import datetime
+from typing import Awaitable, Callable, List, Optional
+from models.Tournament import TournamentStatus
+from models.Match import MatchStatus
+from services.database import maintenance_timeout
+from services.leases import INSTANCE_ID, acquire_lease, release_lease
+from services.scheduler import ensure_scheduler_indexes, backfill_transition_times
+from services.search import SEARCH_COLLECTION, ensure_search_indexes, rebuild_search_index, query_terms
+from services.brackets import MATCHES_COLLECTION, ensure_match_indexes
+from services.profiles import PROFILE_FANOUT_COLLECTION, ensure_profile_indexes
+from services.ratings import RATINGS_COLLECTION, LEADERBOARD_SORT, REPLAY_SORT, ensure_rating_indexes, ensure_match_replay_index
+from services.participants import join_filter, backfill_participant_counts
+from services.archive import ARCHIVE_COLLECTION, ensure_archive_indexes, ensure_archive_export_index, index_archived_tournaments
+from services.user_stats import rebuild_user_stats
+from services.pagination import KEYSET_SORT, keyset_filter, encode_cursor
+import asyncio
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# One document per applied migration, keyed by version
+MIGRATIONS_COLLECTION = "migrations"
+
+# Lease held while migrations run
+MIGRATIONS_LOCK = "schema-migrations"
+
+# Renewed after every migration, so it must outlive the slowest single one;
+# a worker taking over an expired lease re-runs at most that migration,
+# and index builds and backfills are idempotent
+MIGRATION_LEASE_SECONDS = 900
+
+# How long a worker waits for another one to finish migrating
+MIGRATION_WAIT_SECONDS = 600
+MIGRATION_POLL_SECONDS = 2
+
+class MigrationError(Exception):
+    """A migration failed or is still pending"""
+
+class Migration:
+    """One schema change, applied once and recorded by version
+
+    A released migration must never change: a new index or backfill gets
+    a new, higher version, since databases that already recorded a version
+    will not run it again. The ensure_* helpers called below define the
+    indexes of their collection as of the migration calling them.
+    """
+
+    __slots__ = ("version", "description", "apply")
+
+    def __init__(self, version: int, description: str, apply: Callable[[AsyncIOMotorDatabase], Awaitable]):
+        self.version = version
+        self.description = description
+        self.apply = apply
+
+async def _core_indexes(db: AsyncIOMotorDatabase):
+    await db.users.create_index("email", unique=True)
+    await db.users.create_index("username", unique=True)
+    await db.tournaments.create_index("status")
+    await db.tournaments.create_index("game")
+    # Profile pages: organized and joined tournaments, newest first. The
+    # participants index is multikey, one entry per participant.
+    await db.tournaments.create_index([("organizer", 1), ("createdAt", -1), ("_id", -1)])
+    await db.tournaments.create_index([("participants", 1), ("createdAt", -1), ("_id", -1)])
+    await db.tournaments.create_index("createdAt")
+
+    # Keyset pagination indexes for the tournament list, with and
+    # without the equality filters the browser offers
+    await db.tournaments.create_index([("createdAt", -1), ("_id", -1)])
+    await db.tournaments.create_index([("status", 1), ("createdAt", -1), ("_id", -1)])
+    await db.tournaments.create_index([("game", 1), ("createdAt", -1), ("_id", -1)])
+
+    # Export order
+    await db.tournaments.create_index([("updatedAt", 1), ("_id", 1)])
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "User and tournament indexes for login, lists, exports and profiles", _core_indexes),
+    Migration(2, "Search postings indexes", ensure_search_indexes),
+    Migration(3, "Bracket match indexes", ensure_match_indexes),
+    Migration(4, "Scheduler due time index", ensure_scheduler_indexes),
+    Migration(5, "Profile fan-out queue index", ensure_profile_indexes),
+    Migration(6, "Rating indexes", ensure_rating_indexes),
+    Migration(7, "Backfill participantCount", backfill_participant_counts),
+    Migration(8, "Backfill nextTransitionAt", backfill_transition_times),
+    Migration(9, "Archival scan and tournament archive indexes", ensure_archive_indexes),
+    Migration(10, "Backfill search postings", rebuild_search_index),
+    Migration(11, "Archive export index", ensure_archive_export_index),
+    Migration(12, "Completed match replay index", ensure_match_replay_index),
+    Migration(13, "Backfill user stats", rebuild_user_stats),
+    Migration(14, "Search postings for archived tournaments", index_archived_tournaments)
+]
+
+async def applied_versions(db: AsyncIOMotorDatabase) -> List[int]:
+    return sorted(await db[MIGRATIONS_COLLECTION].distinct("_id"))
+
+async def pending_migrations(db: AsyncIOMotorDatabase, migrations: List[Migration] = MIGRATIONS) -> List[Migration]:
+    """Migrations not recorded yet, in version order
+
+    Versions recorded but unknown here were applied by a newer release and
+    are left alone.
+    """
+    applied = set(await applied_versions(db))
+    unknown = applied - {migration.version for migration in migrations}
+    if unknown:
+        logger.warning(f"Database has migrations this release does not know: {sorted(unknown)}")
+    return sorted(
+        (migration for migration in migrations if migration.version not in applied),
+        key=lambda migration: migration.version
+    )
+
+async def apply_migrations(
+    db: AsyncIOMotorDatabase,
+    migrations: List[Migration] = MIGRATIONS,
+    wait_seconds: float = MIGRATION_WAIT_SECONDS,
+    lease_seconds: float = MIGRATION_LEASE_SECONDS
+) -> List[int]:
+    """Apply pending migrations once across all workers
+
+    The worker holding the migrations lease applies them in order; the
+    others wait until they are recorded. With nothing pending this costs a
+    single query. Raises MigrationError on the first failure, leaving the
+    failed migration and everything after it pending, and when the lease
+    expired during a migration and another worker took it over. Returns
+    the versions this worker applied.
+    """
+    pending = await pending_migrations(db, migrations)
+    if not pending:
+        return []
+
+    deadline = time.monotonic() + wait_seconds
+    while not await acquire_lease(db, MIGRATIONS_LOCK, INSTANCE_ID, lease_seconds):
+        if time.monotonic() >= deadline:
+            raise MigrationError("Timed out waiting for another worker to apply migrations")
+        await asyncio.sleep(MIGRATION_POLL_SECONDS)
+        if not await pending_migrations(db, migrations):
+            return []
+
+    applied = []
+    try:
+        # Another worker may have finished some while the lease was held
+        for migration in await pending_migrations(db, migrations):
+            logger.info(f"Applying migration {migration.version}: {migration.description}")
+            start = time.perf_counter()
+            try:
+                with maintenance_timeout():
+                    await migration.apply(db)
+            except Exception as e:
+                raise MigrationError(f"Migration {migration.version} ({migration.description}) failed: {e}") from e
+
+            try:
+                await db[MIGRATIONS_COLLECTION].insert_one({
+                    "_id": migration.version,
+                    "description": migration.description,
+                    "appliedAt": datetime.utcnow(),
+                    "durationMs": round((time.perf_counter() - start) * 1000),
+                    "appliedBy": INSTANCE_ID
+                })
+            except DuplicateKeyError:
+                # Our lease expired mid-migration and a worker that took it
+                # over recorded the same version
+                logger.warning(f"Migration {migration.version} was also applied by another worker")
+            applied.append(migration.version)
+            if not await acquire_lease(db, MIGRATIONS_LOCK, INSTANCE_ID, lease_seconds):
+                # Another worker took the lease over after it expired and is
+                # applying the rest; running them here too would race it
+                raise MigrationError(
+                    f"Lost the migrations lease after migration {migration.version}; "
+                    f"the remaining ones are left to the worker holding it"
+                )
+    finally:
+        await release_lease(db, MIGRATIONS_LOCK, INSTANCE_ID)
+
+    return applied
+
+async def verify_migrations(db: AsyncIOMotorDatabase, migrations: List[Migration] = MIGRATIONS):
+    """Raise MigrationError if any migration is still pending"""
+    pending = await pending_migrations(db, migrations)
+    if pending:
+        raise MigrationError(f"Pending migrations: {[migration.version for migration in pending]}")
+
+class QueryShape:
+    """A route's query, with sample values, whose plan must use an index"""
+
+    __slots__ = ("name", "collection", "filter", "sort")
+
+    def __init__(self, name: str, collection: str, filter: dict, sort: Optional[list] = None):
+        self.name = name
+        self.collection = collection
+        self.filter = filter
+        self.sort = sort
+
+def query_shapes() -> List[QueryShape]:
+    """The query shapes of the request paths
+
+    Aggregations are checked through the find equivalent of their leading
+    $match. Facet counts without filters and maintenance rebuilds read
+    whole collections by design and are not listed.
+    """
+    now = datetime.utcnow()
+    some_id = ObjectId()
+    cursor = keyset_filter(encode_cursor({"createdAt": now, "_id": some_id}))
+    registration = TournamentStatus.REGISTRATION
+
+    return [
+        QueryShape("login", "users", {"email": "player@example.com"}),
+        QueryShape("register duplicate check", "users", {"$or": [{"email": "player@example.com"}, {"username": "player"}]}),
+        QueryShape("bulk registration users", "users", {"$or": [{"_id": {"$in": [some_id]}}, {"username": {"$in": ["player"]}}]}),
+        QueryShape("tournament list", "tournaments", {}, KEYSET_SORT),
+        QueryShape("tournament list next page", "tournaments", cursor, KEYSET_SORT),
+        QueryShape("tournament list by status", "tournaments", {"status": registration, **cursor}, KEYSET_SORT),
+        QueryShape("tournament list by game", "tournaments", {"game": "Chess"}, KEYSET_SORT),
+        QueryShape("tournament list by game and status", "tournaments", {"game": "Chess", "status": registration}, KEYSET_SORT),
+        QueryShape("tournament search", SEARCH_COLLECTION, {"term": {"$in": query_terms("chess open")}, "archived": {"$ne": True}}),
+        QueryShape("tournament history search", SEARCH_COLLECTION, {"term": {"$in": query_terms("chess open")}}),
+        QueryShape("tournament facets", "tournaments", {"$or": [{"game": "Chess"}, {"status": registration}]}),
+        QueryShape("tournament export", "tournaments", {"updatedAt": {"$gte": now}}, [("updatedAt", ASCENDING), ("_id", ASCENDING)]),
+        QueryShape("archived tournament export", ARCHIVE_COLLECTION, {"updatedAt": {"$gte": now}}, [("updatedAt", ASCENDING), ("_id", ASCENDING)]),
+        QueryShape("tournament detail", "tournaments", {"_id": some_id}),
+        QueryShape("join", "tournaments", join_filter(some_id, some_id)),
+        QueryShape("profile tournaments", "tournaments", {"$or": [{"organizer": some_id}, {"participants": some_id}]}),
+        QueryShape("profile history", ARCHIVE_COLLECTION, {"$and": [
+            {"status": TournamentStatus.COMPLETED, "$or": [{"organizer": some_id}, {"participants": some_id}]},
+            cursor
+        ]}, KEYSET_SORT),
+        QueryShape("completed tournaments", ARCHIVE_COLLECTION, {"status": TournamentStatus.COMPLETED}, KEYSET_SORT),
+        QueryShape("archived tournament detail", ARCHIVE_COLLECTION, {"_id": some_id}),
+        QueryShape("archival scan", "tournaments", {
+            "status": TournamentStatus.COMPLETED,
+            "updatedAt": {"$lt": now}
+        }),
+        QueryShape("profile fan-out", "tournaments", {"organizer": some_id, "organizerName": {"$ne": "player"}}),
+        QueryShape("profile fan-out queue", PROFILE_FANOUT_COLLECTION, {}, [("queuedAt", ASCENDING)]),
+        QueryShape("due transitions", "tournaments", {"nextTransitionAt": {"$lte": now}}, [("nextTransitionAt", ASCENDING)]),
+        QueryShape("tournament matches", MATCHES_COLLECTION, {"tournament": some_id}, [
+            ("bracket", ASCENDING), ("round", ASCENDING), ("position", ASCENDING)
+        ]),
+        QueryShape("rating replay", MATCHES_COLLECTION, {"status": MatchStatus.COMPLETED}, REPLAY_SORT),
+        QueryShape("leaderboard", RATINGS_COLLECTION, {"game": "Chess"}, LEADERBOARD_SORT),
+        QueryShape("player rating", RATINGS_COLLECTION, {"game": "Chess", "player": some_id}),
+        QueryShape("player rank", RATINGS_COLLECTION, {"game": "Chess", "$or": [
+            {"rating": {"$gt": 1500.0}},
+            {"rating": 1500.0, "player": {"$lt": some_id}}
+        ]}, [("rating", ASCENDING), ("player", DESCENDING)])
+    ]
+
+def _plan_stages(plan) -> List[str]:
+    """Every stage name in an explain plan, whichever engine produced it"""
+    stages = []
+    if isinstance(plan, dict):
+        if isinstance(plan.get("stage"), str):
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for value in plan:
+            stages.extend(_plan_stages(value))
+    return stages
+
+async def check_query_plans(db: AsyncIOMotorDatabase, shapes: Optional[List[QueryShape]] = None) -> List[dict]:
+    """Explain every query shape and report the stages of its winning plan
+
+    `collectionScan` is set on shapes whose plan reads the whole
+    collection. Run it after migrations, e.g. in CI or a deploy step.
+    """
+    results = []
+    for shape in shapes or query_shapes():
+        command = {"find": shape.collection, "filter": shape.filter}
+        if shape.sort:
+            command["sort"] = dict(shape.sort)
+        explained = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        stages = _plan_stages(explained["queryPlanner"]["winningPlan"])
+        results.append({
+            "name": shape.name,
+            "collection": shape.collection,
+            "stages": stages,
+            "collectionScan": "COLLSCAN" in stages
+        })
+    return results
@@ -0,0 +1,95 @@
+from fastapi import HTTPException, status
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+from services.metrics import OFFLOAD_WAIT_SECONDS, OFFLOAD_RUN_SECONDS
+from services.instrumentation import current_request_stats
+import asyncio
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class BoundedExecutor:
+    """Run blocking calls on a thread pool with a bounded wait queue
+
+    At most `max_workers` calls run at once and at most `max_queue` more wait
+    for a worker. Further calls are rejected with 503 instead of piling up
+    behind the pool and holding their requests open. A call holds its slot
+    until it finishes on the pool, even if its caller was cancelled.
+    """
+
+    def __init__(self, name: str, max_workers: int, max_queue: int):
+        self.name = name
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=name)
+        # Released from worker threads, so updated under the lock
+        self._lock = threading.Lock()
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) on the pool without blocking the event loop"""
+        with self._lock:
+            saturated = self._pending >= self.max_workers + self.max_queue
+            if not saturated:
+                self._pending += 1
+        if saturated:
+            self.rejected += 1
+            logger.warning(f"{self.name} pool saturated, rejecting call")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"}
+            )
+
+        submitted = time.perf_counter()
+        timings = []
+
+        def timed():
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                timings.append((started - submitted, time.perf_counter() - started))
+
+        try:
+            future = self._pool.submit(timed)
+        except BaseException:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wrap_future(future)
+        finally:
+            if timings:
+                waited, ran = timings[0]
+                OFFLOAD_WAIT_SECONDS.observe(waited, self.name)
+                OFFLOAD_RUN_SECONDS.observe(ran, self.name)
+                stats = current_request_stats()
+                if stats is not None:
+                    stats.add_offload(ran)
+
+    def _release(self, future):
+        with self._lock:
+            self._pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        """Return pool occupancy and call counters"""
+        return {
+            "workers": self.max_workers,
+            "maxQueue": self.max_queue,
+            "inFlight": min(self._pending, self.max_workers),
+            "queued": max(self._pending - self.max_workers, 0),
+            "completed": self.completed,
+            "rejected": self.rejected
+        }
+
+    def shutdown(self):
+        """Stop accepting work and release the worker threads"""
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,102 @@
+from fastapi import HTTPException, status
+from bson import ObjectId
+from bson.errors import InvalidId
+from datetime import datetime
+from typing import Optional, Tuple
+import base64
+import json
+
+# Default and maximum page sizes for list endpoints
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Sort order shared by every keyset-paginated query. Must match the
+# compound (createdAt, _id) indexes created by the first migration.
+KEYSET_SORT = [("createdAt", -1), ("_id", -1)]
+
+def _encode(payload: dict) -> str:
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def _decode(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(payload, dict):
+            raise ValueError("cursor payload must be an object")
+        return payload
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def _sort_key(payload: dict) -> Tuple[datetime, ObjectId]:
+    try:
+        return datetime.fromisoformat(payload["c"]), ObjectId(payload["i"])
+    except (ValueError, KeyError, TypeError, InvalidId):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+def encode_cursor(doc: dict) -> str:
+    """Encode the sort key of the last document of a page as an opaque cursor"""
+    return _encode({"c": doc["createdAt"].isoformat(), "i": str(doc["_id"])})
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Decode an opaque cursor back into its (createdAt, _id) sort key"""
+    return _sort_key(_decode(cursor))
+
+def keyset_filter(cursor: Optional[str]) -> dict:
+    """Build the filter selecting documents strictly after the cursor"""
+    if not cursor:
+        return {}
+
+    created_at, last_id = decode_cursor(cursor)
+    return {
+        "$or": [
+            {"createdAt": {"$lt": created_at}},
+            {"createdAt": created_at, "_id": {"$lt": last_id}}
+        ]
+    }
+
+def encode_ranked_cursor(doc: dict, score_field: str) -> str:
+    """Encode a (score, createdAt, _id) sort key for relevance-ranked pages"""
+    return _encode({
+        "s": doc[score_field],
+        "c": doc["createdAt"].isoformat(),
+        "i": str(doc["_id"])
+    })
+
+def ranked_keyset_filter(cursor: Optional[str], score_field: str) -> dict:
+    """Build the filter selecting ranked documents strictly after the cursor"""
+    if not cursor:
+        return {}
+
+    payload = _decode(cursor)
+    score = payload.get("s")
+    if not isinstance(score, (int, float)):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid pagination cursor"
+        )
+
+    created_at, last_id = _sort_key(payload)
+    return {
+        "$or": [
+            {score_field: {"$lt": score}},
+            {score_field: score, "createdAt": {"$lt": created_at}},
+            {score_field: score, "createdAt": created_at, "_id": {"$lt": last_id}}
+        ]
+    }
+
+def build_page(docs: list, limit: int, score_field: Optional[str] = None) -> Tuple[list, Optional[str]]:
+    """Trim a page fetched with limit + 1 rows and compute the next cursor"""
+    if len(docs) <= limit:
+        return docs, None
+
+    page = docs[:limit]
+    if score_field:
+        return page, encode_ranked_cursor(page[-1], score_field)
+    return page, encode_cursor(page[-1])
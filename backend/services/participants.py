@@ -0,0 +1,106 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from bson import ObjectId
+from datetime import datetime
+from typing import Dict, List
+from models.Tournament import TournamentStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+def join_filter(tournament_id: ObjectId, user_id: ObjectId) -> dict:
+    """Match a tournament only if the user may join it right now
+
+    The status, deadline, membership and capacity checks are evaluated by
+    the server together with the update, so concurrent joins can never
+    overfill a tournament or register a user twice.
+    """
+    return {
+        "_id": tournament_id,
+        "status": TournamentStatus.REGISTRATION,
+        "registrationDeadline": {"$gt": datetime.utcnow()},
+        "participants": {"$ne": user_id},
+        "$expr": {"$lt": ["$participantCount", "$maxParticipants"]}
+    }
+
+def join_update(user_id: ObjectId) -> dict:
+    """Add a user and keep participantCount in step with the array"""
+    return {
+        "$addToSet": {"participants": user_id},
+        "$inc": {"participantCount": 1},
+        "$set": {"updatedAt": datetime.utcnow()}
+    }
+
+def bulk_join_filter(tournament_id: ObjectId, expected_count: int) -> dict:
+    """Match a tournament only if it is still open and nobody joined since it was read
+
+    Participants are only ever added, so an unchanged participantCount means
+    an unchanged participant list and the capacity computed from it holds.
+    The deadline is checked by the server as in join_filter.
+    """
+    return {
+        "_id": tournament_id,
+        "status": TournamentStatus.REGISTRATION,
+        "registrationDeadline": {"$gt": datetime.utcnow()},
+        "participantCount": expected_count
+    }
+
+def bulk_join_update(user_ids: List[ObjectId]) -> dict:
+    """Add several users at once and keep participantCount in step"""
+    return {
+        "$addToSet": {"participants": {"$each": user_ids}},
+        "$inc": {"participantCount": len(user_ids)},
+        "$set": {"updatedAt": datetime.utcnow()}
+    }
+
+async def resolve_users(db: AsyncIOMotorDatabase, entries: List[str]) -> Dict[str, ObjectId]:
+    """Resolve user IDs or usernames to user ObjectIds in a single query"""
+    ids = [ObjectId(entry) for entry in entries if ObjectId.is_valid(entry)]
+    usernames = list(entries)
+
+    clauses = []
+    if ids:
+        clauses.append({"_id": {"$in": ids}})
+    if usernames:
+        clauses.append({"username": {"$in": usernames}})
+    if not clauses:
+        return {}
+
+    users = await db.users.find({"$or": clauses}, {"username": 1}).to_list(len(entries) * 2)
+
+    by_id = {str(user["_id"]): user["_id"] for user in users}
+    by_username = {user["username"]: user["_id"] for user in users}
+
+    resolved = {}
+    for entry in entries:
+        user_id = by_id.get(entry) or by_username.get(entry)
+        if user_id is not None:
+            resolved[entry] = user_id
+    return resolved
+
+async def backfill_participant_counts(db: AsyncIOMotorDatabase, batch_size: int = 500) -> int:
+    """Set participantCount on tournaments stored before it was maintained"""
+    updated = 0
+    operations = []
+    cursor = db.tournaments.find(
+        {"participantCount": {"$exists": False}},
+        {"participants": 1}
+    ).batch_size(batch_size)
+
+    async for tournament in cursor:
+        operations.append(UpdateOne(
+            {"_id": tournament["_id"], "participantCount": {"$exists": False}},
+            {"$set": {"participantCount": len(tournament.get("participants", []))}}
+        ))
+        if len(operations) >= batch_size:
+            await db.tournaments.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        await db.tournaments.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    if updated:
+        logger.info(f"Backfilled participantCount on {updated} tournaments")
+    return updated
@@ -0,0 +1,127 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from bson import ObjectId
+from datetime import datetime
+from typing import List, Optional
+from services.response_cache import TournamentResponseCache
+from services.archive import ARCHIVE_COLLECTION
+from services.search import index_tournament
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pending username propagations, one document per user keyed by user ID
+PROFILE_FANOUT_COLLECTION = "profile_fanout"
+
+# Jobs handled per pass of the fan-out loop
+FANOUT_BATCH_SIZE = 100
+
+SUMMARY_FIELDS = {"username": 1, "avatar": 1}
+
+def _summary(user_id: ObjectId, user: Optional[dict]) -> dict:
+    # Deleted users keep their slot so positions still line up with the
+    # tournament's participant list
+    return {
+        "id": str(user_id),
+        "username": user["username"] if user else None,
+        "avatar": user.get("avatar") if user else None
+    }
+
+async def user_summaries(db: AsyncIOMotorDatabase, user_ids: List[ObjectId]) -> List[dict]:
+    """Resolve {id, username, avatar} for many users in a single query
+
+    The result follows the order of user_ids.
+    """
+    if not user_ids:
+        return []
+    users = await db.users.find({"_id": {"$in": list(set(user_ids))}}, SUMMARY_FIELDS).to_list(None)
+    by_id = {user["_id"]: user for user in users}
+    return [_summary(user_id, by_id.get(user_id)) for user_id in user_ids]
+
+async def enqueue_profile_fanout(db: AsyncIOMotorDatabase, user_id: ObjectId, username: str):
+    """Record that copies of a user's username must be brought up to date
+
+    Repeated renames collapse into the job for the latest username.
+    """
+    await db[PROFILE_FANOUT_COLLECTION].update_one(
+        {"_id": user_id},
+        {"$set": {"username": username, "queuedAt": datetime.utcnow()}},
+        upsert=True
+    )
+
+async def apply_profile_fanout(db: AsyncIOMotorDatabase, batch_size: int = FANOUT_BATCH_SIZE) -> int:
+    """Propagate queued usernames to the tournaments that copy them
+
+    organizerName is the only copy, kept on hot and archived tournaments
+    alike; avatars and participant names are resolved at read time.
+    updatedAt is bumped so ETags change, and the search postings of both
+    are rebuilt so the new name is found and the old one is not. A job is removed only if it was not re-queued meanwhile, so a
+    rename that races with the pass is picked up by the next one. Returns
+    the number of jobs handled.
+    """
+    jobs = await db[PROFILE_FANOUT_COLLECTION].find().sort("queuedAt", 1).limit(batch_size).to_list(batch_size)
+
+    for job in jobs:
+        modified = 0
+        for collection in (db.tournaments, db[ARCHIVE_COLLECTION]):
+            result = await collection.update_many(
+                {"organizer": job["_id"], "organizerName": {"$ne": job["username"]}},
+                {"$set": {"organizerName": job["username"], "updatedAt": datetime.utcnow()}}
+            )
+            modified += result.modified_count
+
+        # Re-indexed even when nothing changed here, in case a previous
+        # pass renamed the tournaments and stopped before indexing them
+        for collection, archived in ((db.tournaments, False), (db[ARCHIVE_COLLECTION], True)):
+            cursor = collection.find(
+                {"organizer": job["_id"]},
+                {"name": 1, "game": 1, "organizerName": 1, "createdAt": 1}
+            )
+            async for tournament in cursor:
+                await index_tournament(db, tournament, archived)
+
+        await db[PROFILE_FANOUT_COLLECTION].delete_one({"_id": job["_id"], "queuedAt": job["queuedAt"]})
+        if modified:
+            logger.info(f"Propagated username of {job['_id']} to {modified} tournaments")
+
+    return len(jobs)
+
+class ProfileFanout:
+    """Background propagation of profile changes
+
+    enqueue() wakes the loop right after a rename; it also polls every
+    `interval_seconds` so jobs queued by other workers, or left behind by a
+    crash, are still handled. Passes are idempotent, so every worker may
+    run the loop.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase):
+        self.db = db
+        self._wakeup = asyncio.Event()
+
+    async def enqueue(self, user_id: ObjectId, username: str):
+        await enqueue_profile_fanout(self.db, user_id, username)
+        self._wakeup.set()
+
+    async def run(self, interval_seconds: float, response_cache: Optional[TournamentResponseCache] = None):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+
+            try:
+                handled = 0
+                while True:
+                    count = await apply_profile_fanout(self.db)
+                    handled += count
+                    if count < FANOUT_BATCH_SIZE:
+                        break
+                if handled and response_cache is not None:
+                    await response_cache.invalidate()
+            except Exception as e:
+                logger.error(f"Error propagating profile changes: {e}")
+
+async def ensure_profile_indexes(db: AsyncIOMotorDatabase):
+    await db[PROFILE_FANOUT_COLLECTION].create_index("queuedAt")
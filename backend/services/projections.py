@@ -0,0 +1,19 @@
+# Lightweight tournament list shape: drops rules, judges and the participant
+# ID array in favour of the maintained participantCount
+TOURNAMENT_SUMMARY_PROJECTION = {
+    "name": 1,
+    "game": 1,
+    "description": 1,
+    "organizer": 1,
+    "organizerName": 1,
+    "maxParticipants": 1,
+    "participantCount": 1,
+    "status": 1,
+    "startDate": 1,
+    "endDate": 1,
+    "registrationDeadline": 1,
+    "prize": 1,
+    "winner": 1,
+    "createdAt": 1,
+    "updatedAt": 1
+}
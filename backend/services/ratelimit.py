@@ -0,0 +1,195 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from fastapi import Depends, HTTPException, Request, status
+from jose import JWTError, jwt
+from services.metrics import REGISTRY
+from typing import Callable, Dict, Optional
+import math
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMITED_REQUESTS = REGISTRY.counter(
+    "rate_limited_requests",
+    "Requests rejected by the rate limiter or a concurrency limit",
+    ("route", "reason")
+)
+
+class RateLimitBackend(ABC):
+    """Token bucket storage shared by the rate limiters
+
+    The default implementation lives in process, so every worker enforces
+    its own budget. A shared store (e.g. Redis with a Lua script) can be
+    plugged in by implementing consume() atomically.
+    """
+
+    @abstractmethod
+    async def consume(self, key: str, rate: float, burst: float, cost: float) -> float:
+        """Take `cost` tokens from a bucket refilling at `rate` per second up
+        to `burst`; return 0 when taken, else the seconds until they would be
+        available (nothing is taken then)"""
+
+    def stats(self) -> dict:
+        """Return backend specific counters"""
+        return {}
+
+class InProcessRateLimitBackend(RateLimitBackend):
+    """Token buckets in this worker's memory, least recently used dropped first
+
+    A dropped bucket starts full again, so max_keys should comfortably
+    exceed the number of clients active within a refill period.
+    """
+
+    def __init__(self, max_keys: int = 100000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self._clock = clock
+        # key -> [tokens, last refill time]
+        self._buckets: "OrderedDict[str, list]" = OrderedDict()
+        self.evictions = 0
+
+    async def consume(self, key: str, rate: float, burst: float, cost: float) -> float:
+        now = self._clock()
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [burst, now]
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(burst, bucket[0] + (now - bucket[1]) * rate)
+            bucket[1] = now
+
+        if bucket[0] >= cost:
+            bucket[0] -= cost
+            return 0.0
+        return (cost - bucket[0]) / rate if rate > 0 else math.inf
+
+    def stats(self) -> dict:
+        return {"buckets": len(self._buckets), "evictions": self.evictions}
+
+class BucketPolicy:
+    """Refill rate (tokens per second) and capacity of one kind of bucket"""
+
+    __slots__ = ("rate", "burst")
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+
+class RouteLimit:
+    """Cost of one request to a route and its concurrency cap (None: no cap)"""
+
+    __slots__ = ("cost", "concurrency")
+
+    def __init__(self, cost: float = 1, concurrency: Optional[int] = None):
+        self.cost = cost
+        self.concurrency = concurrency
+
+class RateLimiter:
+    """Admission control for expensive routes
+
+    Every limited request spends its route's cost from a per-IP bucket and,
+    when it carries a valid bearer token, from a per-user bucket; empty
+    buckets answer 429 with Retry-After. Routes with a concurrency cap shed
+    requests beyond it with 503 instead of queueing them, so bursts on slow
+    routes cannot occupy the worker that also serves cheap ones. Concurrency
+    is always counted per worker.
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        per_ip: BucketPolicy,
+        per_user: BucketPolicy,
+        routes: Dict[str, RouteLimit],
+        secret_key: str,
+        algorithm: str,
+        trust_forwarded: bool = False,
+        enabled: bool = True
+    ):
+        self.backend = backend
+        self.per_ip = per_ip
+        self.per_user = per_user
+        self.routes = routes
+        self.secret_key = secret_key
+        self.algorithm = algorithm
+        self.trust_forwarded = trust_forwarded
+        self.enabled = enabled
+        self.in_flight = {name: 0 for name in routes}
+
+    def client_ip(self, request: Request) -> str:
+        if self.trust_forwarded:
+            forwarded = request.headers.get("x-forwarded-for")
+            if forwarded:
+                return forwarded.split(",")[0].strip()
+        return request.client.host if request.client else "unknown"
+
+    def user_id(self, request: Request) -> Optional[str]:
+        """Subject of a valid bearer token; invalid tokens are left to the route"""
+        authorization = request.headers.get("authorization", "")
+        if not authorization.lower().startswith("bearer "):
+            return None
+        try:
+            return jwt.decode(authorization[7:], self.secret_key, algorithms=[self.algorithm]).get("sub")
+        except JWTError:
+            return None
+
+    async def _check_buckets(self, name: str, limit: RouteLimit, request: Request):
+        checks = [("ip", f"ip:{self.client_ip(request)}", self.per_ip)]
+        user_id = self.user_id(request)
+        if user_id:
+            checks.append(("user", f"user:{user_id}", self.per_user))
+
+        for reason, key, policy in checks:
+            wait = await self.backend.consume(f"ratelimit:{key}", policy.rate, policy.burst, limit.cost)
+            if wait > 0:
+                RATE_LIMITED_REQUESTS.inc(name, reason)
+                raise HTTPException(
+                    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                    detail="Too many requests, please retry later",
+                    headers={"Retry-After": str(max(1, math.ceil(min(wait, 3600))))}
+                )
+
+    def limit(self, name: str, applies: Optional[Callable[[Request], bool]] = None):
+        """Dependency admitting requests to the route registered as `name`
+
+        With `applies`, only requests for which it returns True are limited
+        (e.g. list requests that carry a search term).
+        """
+        limit = self.routes[name]
+
+        async def admit(request: Request):
+            if not self.enabled or (applies is not None and not applies(request)):
+                yield
+                return
+
+            await self._check_buckets(name, limit, request)
+
+            if limit.concurrency is not None and self.in_flight[name] >= limit.concurrency:
+                RATE_LIMITED_REQUESTS.inc(name, "concurrency")
+                logger.warning(f"{name} at its concurrency limit, shedding request")
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail="Server is busy, please retry shortly",
+                    headers={"Retry-After": "1"}
+                )
+
+            self.in_flight[name] += 1
+            try:
+                yield
+            finally:
+                self.in_flight[name] -= 1
+
+        return admit
+
+    def stats(self) -> dict:
+        """Requests in flight per limited route"""
+        return dict(self.in_flight)
+
+def admission(rate_limiter: Optional[RateLimiter], name: str, applies: Optional[Callable[[Request], bool]] = None) -> list:
+    """Route `dependencies` for a limited route; empty without a limiter"""
+    if rate_limiter is None:
+        return []
+    return [Depends(rate_limiter.limit(name, applies))]
@@ -0,0 +1,289 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne, ReplaceOne, ASCENDING, DESCENDING
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from models.Match import MatchStatus
+from services.brackets import MATCHES_COLLECTION
+from services.archive import ARCHIVE_COLLECTION
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+RATINGS_COLLECTION = "ratings"
+
+# Elo parameters; the incremental and batch paths must use the same ones
+INITIAL_RATING = 1500.0
+K_FACTOR = 32.0
+ELO_SCALE = 400.0
+
+# Documents per bulk write when storing recomputed ratings
+RATING_WRITE_BATCH = 1000
+
+# Leaderboard order; the index below serves it without an in-memory sort
+LEADERBOARD_SORT = [("rating", DESCENDING), ("player", ASCENDING)]
+
+# Completion order in which recomputation replays matches
+REPLAY_SORT = [("updatedAt", ASCENDING), ("_id", ASCENDING)]
+
+def expected_score(rating: float, opponent: float) -> float:
+    return 1.0 / (1.0 + 10 ** ((opponent - rating) / ELO_SCALE))
+
+def elo_delta(winner_rating: float, loser_rating: float) -> float:
+    """Points the winner gains and the loser loses"""
+    return K_FACTOR * (1.0 - expected_score(winner_rating, loser_rating))
+
+async def ensure_match_replay_index(db: AsyncIOMotorDatabase):
+    """Index completed matches in the order recomputation replays them"""
+    await db[MATCHES_COLLECTION].create_index([("status", ASCENDING)] + REPLAY_SORT)
+
+async def ensure_rating_indexes(db: AsyncIOMotorDatabase):
+    await db[RATINGS_COLLECTION].create_index([("game", ASCENDING), ("player", ASCENDING)], unique=True)
+    await db[RATINGS_COLLECTION].create_index([("game", ASCENDING)] + LEADERBOARD_SORT)
+
+async def record_rating_result(
+    db: AsyncIOMotorDatabase,
+    game: str,
+    winner_id: ObjectId,
+    loser_id: ObjectId,
+    now: Optional[datetime] = None
+):
+    """Apply one decided match to both players' ratings for a game
+
+    The delta is computed from the ratings read here and applied with $inc,
+    so concurrent results for the same player are never lost; at worst a
+    delta is based on a rating a few points out of date.
+    """
+    now = now or datetime.utcnow()
+    ratings = db[RATINGS_COLLECTION]
+
+    # Create missing rows first; $inc cannot share a field with $setOnInsert
+    try:
+        await ratings.bulk_write([
+            UpdateOne(
+                {"game": game, "player": player},
+                {"$setOnInsert": {"rating": INITIAL_RATING, "matches": 0, "wins": 0, "losses": 0}},
+                upsert=True
+            )
+            for player in (winner_id, loser_id)
+        ], ordered=False)
+    except BulkWriteError as e:
+        # A concurrent result inserted the same row first
+        if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])):
+            raise
+
+    current = {
+        doc["player"]: doc["rating"]
+        for doc in await ratings.find(
+            {"game": game, "player": {"$in": [winner_id, loser_id]}},
+            {"player": 1, "rating": 1}
+        ).to_list(2)
+    }
+    delta = elo_delta(current[winner_id], current[loser_id])
+
+    await ratings.bulk_write([
+        UpdateOne(
+            {"game": game, "player": winner_id},
+            {"$inc": {"rating": delta, "matches": 1, "wins": 1}, "$set": {"updatedAt": now}}
+        ),
+        UpdateOne(
+            {"game": game, "player": loser_id},
+            {"$inc": {"rating": -delta, "matches": 1, "losses": 1}, "$set": {"updatedAt": now}}
+        )
+    ], ordered=False)
+
+def _schedule(winners: np.ndarray, losers: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Link each result to the next and previous results of its players
+
+    Every result has two slots, 2 * i for its winner and 2 * i + 1 for its
+    loser. Returns, per slot, the slot holding the same player's next
+    result (-1 if none), and the result holding that player's previous one
+    (len(winners) if none). Slots are ordered by (player, slot) with a
+    single sort of packed integer keys.
+    """
+    count = len(winners)
+    slots = 2 * count
+    shift = slots.bit_length()
+
+    keys = np.empty(slots, dtype=np.int64)
+    keys[0::2] = winners
+    keys[1::2] = losers
+    keys <<= shift
+    keys |= np.arange(slots, dtype=np.int64)
+    keys.sort()
+
+    same_player = (keys[1:] >> shift) == (keys[:-1] >> shift)
+    ordered = keys & ((1 << shift) - 1)
+
+    next_slot = np.empty(slots, dtype=np.int64)
+    next_slot[ordered[:-1]] = np.where(same_player, ordered[1:], -1)
+    next_slot[ordered[-1]] = -1
+
+    previous_result = np.empty(slots, dtype=np.int64)
+    previous_result[ordered[1:]] = np.where(same_player, ordered[:-1] >> 1, count)
+    previous_result[ordered[0]] = count
+    return next_slot, previous_result
+
+def replay_elo(winners: np.ndarray, losers: np.ndarray, player_count: int) -> np.ndarray:
+    """Ratings after replaying results in order, identical to applying them one by one
+
+    Results are applied in waves in which no player appears twice: a
+    result joins the wave after the later of its players' previous
+    results, so every player still sees their results in order. The first
+    wave holds every player's first result; each later one is found from
+    the results that follow the wave just applied, so building the waves
+    costs a few array operations per wave rather than a step per result.
+    """
+    ratings = np.full(player_count, INITIAL_RATING)
+    count = len(winners)
+    if not count:
+        return ratings
+
+    next_slot, previous_result = _schedule(winners, losers)
+
+    # Wave each result was applied in; the extra entry stands for "no
+    # previous result" and counts as applied
+    wave_of = np.full(count + 1, -1, dtype=np.int64)
+    wave_of[count] = -2
+
+    wave = 0
+    batch = np.flatnonzero((previous_result[0::2] == count) & (previous_result[1::2] == count))
+    while len(batch):
+        w = winners[batch]
+        l = losers[batch]
+        delta = K_FACTOR * (1.0 - 1.0 / (1.0 + 10 ** ((ratings[l] - ratings[w]) / ELO_SCALE)))
+        ratings[w] += delta
+        ratings[l] -= delta
+        wave_of[batch] = wave
+
+        # A following result is ready once its other player's previous
+        # result is applied too. If both were applied in this wave it
+        # arrives through both slots; only the winner slot's arrival counts.
+        arrivals = next_slot[np.concatenate((2 * batch, 2 * batch + 1))]
+        arrivals = arrivals[arrivals >= 0]
+        other_wave = wave_of[previous_result[arrivals ^ 1]]
+        ready = (other_wave != -1) & ~((arrivals & 1 == 1) & (other_wave == wave))
+        batch = arrivals[ready] >> 1
+        wave += 1
+    return ratings
+
+async def _decided_results(db: AsyncIOMotorDatabase, game: Optional[str]) -> Dict[str, List[Tuple[ObjectId, ObjectId]]]:
+    """Decided two-player results per game in completion order
+
+    Completed matches are streamed in completion order through their index
+    and attributed to games through their tournaments. Byes are stored as
+    completed matches without a second player and are skipped.
+    """
+    query = {"bracket": {"$exists": True}}
+    if game:
+        query["game"] = game
+    games = {}
+    for collection in (db.tournaments, db[ARCHIVE_COLLECTION]):
+        async for t in collection.find(query, {"game": 1}):
+            games[t["_id"]] = t["game"]
+
+    results: Dict[str, List[Tuple[ObjectId, ObjectId]]] = {}
+    cursor = db[MATCHES_COLLECTION].find(
+        {"status": MatchStatus.COMPLETED},
+        {"tournament": 1, "players": 1, "winner": 1}
+    ).sort(REPLAY_SORT).batch_size(5000)
+    async for match in cursor:
+        first, second = match["players"]
+        if first is None or second is None or match.get("winner") is None or match["tournament"] not in games:
+            continue
+        loser = second if match["winner"] == first else first
+        results.setdefault(games[match["tournament"]], []).append((match["winner"], loser))
+    return results
+
+async def recompute_ratings(db: AsyncIOMotorDatabase, game: Optional[str] = None) -> int:
+    """Rebuild ratings from every recorded result, for one game or all
+
+    Results recorded while this runs may be overwritten; run it when
+    ratings are missing or the formula changed. Returns the number of
+    rating rows written.
+    """
+    results = await _decided_results(db, game)
+    now = datetime.utcnow()
+    written = 0
+
+    for game_name, pairs in results.items():
+        index: Dict[ObjectId, int] = {}
+        winners = np.fromiter((index.setdefault(w, len(index)) for w, _ in pairs), dtype=np.int64, count=len(pairs))
+        losers = np.fromiter((index.setdefault(l, len(index)) for _, l in pairs), dtype=np.int64, count=len(pairs))
+        ratings = replay_elo(winners, losers, len(index))
+        wins = np.bincount(winners, minlength=len(index))
+        losses = np.bincount(losers, minlength=len(index))
+
+        operations = []
+        for player, i in index.items():
+            operations.append(ReplaceOne(
+                {"game": game_name, "player": player},
+                {
+                    "game": game_name,
+                    "player": player,
+                    "rating": float(ratings[i]),
+                    "matches": int(wins[i] + losses[i]),
+                    "wins": int(wins[i]),
+                    "losses": int(losses[i]),
+                    "updatedAt": now
+                },
+                upsert=True
+            ))
+            if len(operations) >= RATING_WRITE_BATCH:
+                await db[RATINGS_COLLECTION].bulk_write(operations, ordered=False)
+                written += len(operations)
+                operations = []
+        if operations:
+            await db[RATINGS_COLLECTION].bulk_write(operations, ordered=False)
+            written += len(operations)
+
+        # Players whose results were all removed no longer have a rating
+        await db[RATINGS_COLLECTION].delete_many({"game": game_name, "updatedAt": {"$lt": now}})
+
+    logger.info(f"Recomputed {written} ratings across {len(results)} games")
+    return written
+
+async def leaderboard(db: AsyncIOMotorDatabase, game: str, limit: int) -> List[dict]:
+    """Top players of a game, read in index order"""
+    rows = await db[RATINGS_COLLECTION].find({"game": game}).sort(LEADERBOARD_SORT).limit(limit).to_list(limit)
+    for rank, row in enumerate(rows, start=1):
+        row["rank"] = rank
+    return rows
+
+async def player_standing(db: AsyncIOMotorDatabase, game: str, player: ObjectId, neighbours: int) -> Optional[dict]:
+    """A player's rating row with its rank and the rows around it
+
+    The rank is a count over the (game, rating, player) index rather than a
+    sort, and neighbours are read from the index in both directions.
+    """
+    ratings = db[RATINGS_COLLECTION]
+    row = await ratings.find_one({"game": game, "player": player})
+    if row is None:
+        return None
+
+    # Rows ordered before this one: higher rating, or equal rating and lower player ID
+    ahead = {"game": game, "$or": [
+        {"rating": {"$gt": row["rating"]}},
+        {"rating": row["rating"], "player": {"$lt": player}}
+    ]}
+    behind = {"game": game, "$or": [
+        {"rating": {"$lt": row["rating"]}},
+        {"rating": row["rating"], "player": {"$gt": player}}
+    ]}
+    rank = await ratings.count_documents(ahead) + 1
+
+    above = await ratings.find(ahead).sort(
+        [("rating", ASCENDING), ("player", DESCENDING)]
+    ).limit(neighbours).to_list(neighbours)
+    below = await ratings.find(behind).sort(LEADERBOARD_SORT).limit(neighbours).to_list(neighbours)
+
+    above.reverse()
+    for offset, neighbour in enumerate(above):
+        neighbour["rank"] = rank - len(above) + offset
+    for offset, neighbour in enumerate(below, start=1):
+        neighbour["rank"] = rank + offset
+    row["rank"] = rank
+
+    return {"player": row, "above": above, "below": below}
@@ -0,0 +1,110 @@
+from fastapi import Response
+from services.cache import CacheBackend
+from services.serialization import dumps
+from typing import Iterable, Optional, Tuple
+import hashlib
+import json
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+# Counter bumped on every tournament write; list keys embed its value so a
+# single increment invalidates every cached list page at once
+GENERATION_KEY = "tournaments:generation"
+
+# Detail and participant keys embed the generation of their tournament's
+# stripe instead, so a write only evicts the entries of the tournaments it
+# touched (and of the few sharing their stripe). Striping bounds the number
+# of counters, which are never evicted. Writes that cannot name the
+# tournaments they touched bump ALL_DETAILS_KEY, which every key embeds.
+DETAIL_GENERATION_STRIPES = 4096
+ALL_DETAILS_KEY = "tournaments:generation:all"
+
+def _stripe_key(tournament_id) -> str:
+    stripe = zlib.crc32(str(tournament_id).encode()) % DETAIL_GENERATION_STRIPES
+    return f"tournaments:generation:{stripe}"
+
+def make_etag(*parts) -> str:
+    """Build a strong ETag from values that change whenever the payload does"""
+    digest = hashlib.sha1("|".join(str(p) for p in parts).encode()).hexdigest()
+    return f'"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against a strong ETag"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def serialize(payload: dict) -> bytes:
+    """Serialize a response body once so cache hits can reuse the bytes"""
+    return dumps(payload)
+
+class TournamentResponseCache:
+    """Read-through cache for tournament detail and list responses
+
+    Entries are (etag, body) pairs. Every key embeds generation counters
+    that writers bump through invalidate(); a reader captures its key before
+    querying Mongo, so a result read before a write can never be stored
+    under a key that is valid after it. With the in-process backend, writes
+    on other workers are only picked up once entries expire by TTL.
+    """
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+
+    async def _tournament_generation(self, tournament_id: str) -> str:
+        everything = await self.backend.get_counter(ALL_DETAILS_KEY)
+        stripe = await self.backend.get_counter(_stripe_key(tournament_id))
+        return f"{everything}.{stripe}"
+
+    async def detail_key(self, tournament_id: str) -> str:
+        generation = await self._tournament_generation(tournament_id)
+        return f"tournament:{generation}:{tournament_id}"
+
+    async def participants_key(self, tournament_id: str) -> str:
+        generation = await self._tournament_generation(tournament_id)
+        return f"participants:{generation}:{tournament_id}"
+
+    async def list_key(self, params: dict) -> str:
+        generation = await self.backend.get_counter(GENERATION_KEY)
+        normalized = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        return f"tournaments:{generation}:{digest}"
+
+    def facets_key(self, params: dict) -> str:
+        """Key for facet counts; it skips the generation so the frequent
+        writes that cannot change counts (joins, results) do not evict
+        them, and entries are stored with a short TTL instead"""
+        normalized = json.dumps(params, sort_keys=True, default=str)
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        return f"facets:{digest}"
+
+    async def get(self, key: str) -> Optional[Tuple[str, bytes]]:
+        return await self.backend.get(key)
+
+    async def set(self, key: str, entry: Tuple[str, bytes], ttl_seconds: Optional[float] = None):
+        await self.backend.set(key, entry, ttl_seconds)
+
+    async def invalidate(self, tournament_ids: Optional[Iterable] = None):
+        """Drop cached responses after a write to `tournament_ids`
+
+        Every list page is dropped, along with the detail and participant
+        entries of the given tournaments; without IDs, those of every
+        tournament.
+        """
+        await self.backend.incr(GENERATION_KEY)
+        if tournament_ids is None:
+            await self.backend.incr(ALL_DETAILS_KEY)
+            return
+        for key in {_stripe_key(tournament_id) for tournament_id in tournament_ids}:
+            await self.backend.incr(key)
+
+def cached_response(entry: Tuple[str, bytes], if_none_match: Optional[str]) -> Response:
+    """Answer from a cache entry, with 304 when the client already has it"""
+    etag, body = entry
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
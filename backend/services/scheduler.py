@@ -0,0 +1,179 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne, ASCENDING
+from bson import ObjectId
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from models.Tournament import TournamentStatus
+from services.stats import record_status_change
+from services.response_cache import TournamentResponseCache
+from services.leases import INSTANCE_ID, acquire_lease, release_lease
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Lease letting a single replica apply the transitions
+TRANSITIONS_LOCK = "tournament-transitions"
+
+# Tournaments moved per bulk_write; a full batch triggers another pass at once
+TRANSITION_BATCH_SIZE = 500
+
+def plan_transition(tournament: dict, now: datetime) -> Tuple[TournamentStatus, Optional[datetime]]:
+    """Status a tournament should have at `now`, and when it changes next
+
+    Registration runs until startDate and play until endDate. Tournaments
+    with a bracket are completed by their last result, not by the clock.
+    """
+    status = TournamentStatus(tournament["status"])
+    if status == TournamentStatus.COMPLETED:
+        return status, None
+
+    if status == TournamentStatus.REGISTRATION:
+        if tournament["startDate"] > now:
+            return status, tournament["startDate"]
+        status = TournamentStatus.ACTIVE
+
+    if tournament.get("bracket"):
+        return status, None
+    if tournament["endDate"] > now:
+        return status, tournament["endDate"]
+    return TournamentStatus.COMPLETED, None
+
+def next_transition_at(tournament: dict) -> Optional[datetime]:
+    """Due time of the next scheduled transition of a tournament, if any"""
+    status = tournament["status"]
+    if status == TournamentStatus.REGISTRATION:
+        return tournament["startDate"]
+    if status == TournamentStatus.ACTIVE and not tournament.get("bracket"):
+        return tournament["endDate"]
+    return None
+
+async def ensure_scheduler_indexes(db: AsyncIOMotorDatabase):
+    """Index the due times so each pass only reads tournaments that are due"""
+    await db.tournaments.create_index("nextTransitionAt")
+
+async def backfill_transition_times(db: AsyncIOMotorDatabase, batch_size: int = 500) -> int:
+    """Set nextTransitionAt on tournaments stored before it was maintained"""
+    updated = 0
+    operations = []
+    cursor = db.tournaments.find(
+        {"nextTransitionAt": {"$exists": False}},
+        {"status": 1, "startDate": 1, "endDate": 1, "bracket.format": 1}
+    ).batch_size(batch_size)
+
+    async for tournament in cursor:
+        operations.append(UpdateOne(
+            {"_id": tournament["_id"], "nextTransitionAt": {"$exists": False}},
+            {"$set": {"nextTransitionAt": next_transition_at(tournament)}}
+        ))
+        if len(operations) >= batch_size:
+            await db.tournaments.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        await db.tournaments.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    if updated:
+        logger.info(f"Backfilled nextTransitionAt on {updated} tournaments")
+    return updated
+
+async def apply_due_transitions(
+    db: AsyncIOMotorDatabase,
+    now: Optional[datetime] = None,
+    batch_size: int = TRANSITION_BATCH_SIZE
+) -> Dict[Tuple[TournamentStatus, TournamentStatus], List[ObjectId]]:
+    """Move every due tournament in one batch to the status it should have
+
+    Each update is conditional on the status and due time that were read,
+    so a concurrent change (a bracket being generated, a final result)
+    wins over the scheduler. Returns the applied transitions as
+    {(old_status, new_status): [tournament IDs]}.
+    """
+    now = now or datetime.utcnow()
+    due = await db.tournaments.find(
+        {"nextTransitionAt": {"$lte": now}},
+        {"status": 1, "startDate": 1, "endDate": 1, "nextTransitionAt": 1, "bracket.format": 1}
+    ).sort("nextTransitionAt", ASCENDING).limit(batch_size).to_list(batch_size)
+
+    groups: Dict[tuple, List[UpdateOne]] = {}
+    ids: Dict[tuple, List[ObjectId]] = {}
+    for tournament in due:
+        new_status, next_at = plan_transition(tournament, now)
+        key = (TournamentStatus(tournament["status"]), new_status)
+        groups.setdefault(key, []).append(UpdateOne(
+            {
+                "_id": tournament["_id"],
+                "status": tournament["status"],
+                "nextTransitionAt": tournament["nextTransitionAt"]
+            },
+            {"$set": {"status": new_status, "nextTransitionAt": next_at, "updatedAt": now}}
+        ))
+        ids.setdefault(key, []).append(tournament["_id"])
+
+    applied = {}
+    for (old_status, new_status), operations in groups.items():
+        result = await db.tournaments.bulk_write(operations, ordered=False)
+        changed = ids[(old_status, new_status)]
+
+        if result.modified_count < len(operations):
+            # Some were changed concurrently; find the ones this pass moved
+            changed = await db.tournaments.distinct("_id", {
+                "_id": {"$in": changed},
+                "status": new_status,
+                "updatedAt": now
+            })
+
+        if changed and old_status != new_status:
+            await record_status_change(db, old_status, new_status, len(changed))
+            applied[(old_status, new_status)] = changed
+
+    return applied
+
+async def run_scheduler(
+    db: AsyncIOMotorDatabase,
+    interval_seconds: float,
+    lease_seconds: float,
+    response_cache: Optional[TournamentResponseCache] = None
+):
+    """Apply due status transitions while holding the transitions lease
+
+    Every replica runs this loop; only the lease holder does any work. It
+    wakes at least every `interval_seconds`, or earlier when the next due
+    time is closer. Event stream clients on every replica learn of the
+    changes through their StatusRelay.
+    """
+    try:
+        while True:
+            delay = interval_seconds
+            try:
+                if await acquire_lease(db, TRANSITIONS_LOCK, INSTANCE_ID, lease_seconds):
+                    applied = await apply_due_transitions(db)
+
+                    if applied:
+                        if response_cache:
+                            await response_cache.invalidate(
+                                [tournament_id for changed in applied.values() for tournament_id in changed]
+                            )
+                        for (old_status, new_status), changed in applied.items():
+                            logger.info(
+                                f"Moved {len(changed)} tournaments from {old_status.value} to {new_status.value}"
+                            )
+
+                    upcoming = await db.tournaments.find(
+                        {"nextTransitionAt": {"$ne": None}},
+                        {"nextTransitionAt": 1}
+                    ).sort("nextTransitionAt", ASCENDING).limit(1).to_list(1)
+                    if upcoming:
+                        until_due = (upcoming[0]["nextTransitionAt"] - datetime.utcnow()).total_seconds()
+                        delay = min(interval_seconds, max(until_due, 0))
+            except Exception as e:
+                logger.error(f"Error applying scheduled transitions: {e}")
+
+            await asyncio.sleep(delay)
+    finally:
+        try:
+            await release_lease(db, TRANSITIONS_LOCK, INSTANCE_ID)
+        except Exception:
+            pass
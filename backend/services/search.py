@@ -0,0 +1,261 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import ASCENDING, DESCENDING
+from typing import Dict, List, Optional, Tuple
+from services.pagination import KEYSET_SORT, ranked_keyset_filter, build_page
+import re
+import unicodedata
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Collection holding one posting per (term, tournament) pair
+SEARCH_COLLECTION = "tournament_search"
+
+# Field the relevance score is exposed under in search results
+SCORE_FIELD = "searchScore"
+
+# Prefixes shorter than this are not indexed (and not searchable), prefixes
+# longer than MAX_PREFIX_LENGTH are truncated on both index and query side
+MIN_PREFIX_LENGTH = 2
+MAX_PREFIX_LENGTH = 20
+
+# Relevance weight per indexed field; full-token matches count double
+FIELD_WEIGHTS = {
+    "name": 3,
+    "game": 2,
+    "organizerName": 1
+}
+EXACT_MATCH_MULTIPLIER = 2
+
+# Fields the browse page filters on, counted by tournament_facets()
+FACET_FIELDS = ("game", "status")
+
+_TOKEN_RE = re.compile(r"\w+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, strip accents and split text into word tokens"""
+    normalized = unicodedata.normalize("NFKD", text or "")
+    stripped = "".join(c for c in normalized if not unicodedata.combining(c))
+    return _TOKEN_RE.findall(stripped.lower())
+
+def build_postings(tournament: dict) -> Dict[str, int]:
+    """Compute the best score of every indexed prefix of a tournament"""
+    postings = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        for token in tokenize(tournament.get(field, "")):
+            top = min(len(token), MAX_PREFIX_LENGTH)
+            for length in range(MIN_PREFIX_LENGTH, top + 1):
+                term = token[:length]
+                score = weight * EXACT_MATCH_MULTIPLIER if term == token else weight
+                if score > postings.get(term, 0):
+                    postings[term] = score
+    return postings
+
+def query_terms(search: str) -> List[str]:
+    """Turn a raw search string into the distinct index terms to look up"""
+    terms = []
+    for token in tokenize(search):
+        term = token[:MAX_PREFIX_LENGTH]
+        if len(term) >= MIN_PREFIX_LENGTH and term not in terms:
+            terms.append(term)
+    return terms
+
+async def ensure_search_indexes(db: AsyncIOMotorDatabase):
+    """Create the indexes backing the search postings collection"""
+    await db[SEARCH_COLLECTION].create_index(
+        [("term", ASCENDING), ("tournament", ASCENDING)],
+        unique=True
+    )
+    await db[SEARCH_COLLECTION].create_index("tournament")
+
+async def index_tournament(db: AsyncIOMotorDatabase, tournament: dict, archived: bool = False):
+    """(Re)build the search postings of a single tournament
+
+    Postings of archived tournaments are marked, so searches of the hot
+    collection skip them without a lookup.
+    """
+    await db[SEARCH_COLLECTION].delete_many({"tournament": tournament["_id"]})
+
+    postings = build_postings(tournament)
+    if not postings:
+        return
+
+    marker = {"archived": True} if archived else {}
+    await db[SEARCH_COLLECTION].insert_many([
+        {
+            "term": term,
+            "tournament": tournament["_id"],
+            "score": score,
+            "createdAt": tournament["createdAt"],
+            **marker
+        }
+        for term, score in postings.items()
+    ], ordered=False)
+
+async def remove_tournament(db: AsyncIOMotorDatabase, tournament_id):
+    """Drop every search posting of a tournament"""
+    await db[SEARCH_COLLECTION].delete_many({"tournament": tournament_id})
+
+async def rebuild_search_index(db: AsyncIOMotorDatabase, batch_size: int = 500) -> int:
+    """Rebuild the postings of every tournament, e.g. to backfill existing data"""
+    indexed = 0
+    cursor = db.tournaments.find(
+        {},
+        {"name": 1, "game": 1, "organizerName": 1, "createdAt": 1}
+    ).batch_size(batch_size)
+
+    async for tournament in cursor:
+        await index_tournament(db, tournament)
+        indexed += 1
+
+    logger.info(f"Rebuilt search index for {indexed} tournaments")
+    return indexed
+
+def _posting_filter(terms: List[str], archived: Optional[bool]) -> dict:
+    """Postings of the terms for hot (False), archived (True) or all (None) tournaments"""
+    query = {"term": {"$in": terms}}
+    if archived is not None:
+        query["archived"] = True if archived else {"$ne": True}
+    return query
+
+def _matching_stages(terms: List[str], archived: Optional[bool] = False) -> List[dict]:
+    """Pipeline stages yielding one row per tournament matching every term"""
+    return [
+        {"$match": _posting_filter(terms, archived)},
+        {"$group": {
+            "_id": "$tournament",
+            SCORE_FIELD: {"$sum": "$score"},
+            "hits": {"$sum": 1},
+            "createdAt": {"$first": "$createdAt"}
+        }},
+        # Every query term must match (prefix or full token)
+        {"$match": {"hits": len(terms)}}
+    ]
+
+def _lookup_stages(collections: List[str]) -> List[dict]:
+    """Stages replacing each row by its tournament, looked up in `collections` in order
+
+    A tournament caught in more than one collection by an archival pass
+    is taken from the first.
+    """
+    stages = [
+        {"$lookup": {"from": name, "localField": "_id", "foreignField": "_id", "as": f"found{i}"}}
+        for i, name in enumerate(collections)
+    ]
+    stages.extend([
+        {"$addFields": {"tournament": {"$slice": [
+            {"$concatArrays": [f"$found{i}" for i in range(len(collections))]}, 1
+        ]}}},
+        {"$unwind": "$tournament"}
+    ])
+    return stages
+
+async def search_tournaments(
+    db: AsyncIOMotorDatabase,
+    search: str,
+    filters: dict,
+    after: Optional[str],
+    limit: int,
+    projection: Optional[dict] = None,
+    archive_collection: Optional[str] = None
+) -> Tuple[list, Optional[str]]:
+    """Return one relevance-ranked page of tournaments matching every search term
+
+    Results are ordered by (searchScore, createdAt, _id) descending and the
+    returned cursor continues that order. With `archive_collection`,
+    archived tournaments are ranked together with the hot ones.
+    """
+    terms = query_terms(search)
+    if not terms:
+        return [], None
+
+    collections = ["tournaments"]
+    if archive_collection:
+        collections.append(archive_collection)
+    pipeline = _matching_stages(terms, None if archive_collection else False)
+
+    page_filter = ranked_keyset_filter(after, SCORE_FIELD)
+    if page_filter:
+        pipeline.append({"$match": page_filter})
+
+    sort = {SCORE_FIELD: DESCENDING}
+    sort.update(dict(KEYSET_SORT))
+    pipeline.append({"$sort": sort})
+
+    # Join the candidates back to their tournaments. Without filters the
+    # page can be cut before the lookup so only limit + 1 documents are read.
+    if not filters:
+        pipeline.append({"$limit": limit + 1})
+
+    pipeline.extend(_lookup_stages(collections))
+
+    if filters:
+        pipeline.append({"$match": {f"tournament.{k}": v for k, v in filters.items()}})
+        pipeline.append({"$limit": limit + 1})
+
+    pipeline.extend([
+        {"$addFields": {f"tournament.{SCORE_FIELD}": f"${SCORE_FIELD}"}},
+        {"$replaceRoot": {"newRoot": "$tournament"}}
+    ])
+
+    if projection:
+        ranked_projection = dict(projection)
+        ranked_projection[SCORE_FIELD] = 1
+        pipeline.append({"$project": ranked_projection})
+
+    docs = await db[SEARCH_COLLECTION].aggregate(pipeline).to_list(limit + 1)
+    return build_page(docs, limit, SCORE_FIELD)
+
+async def count_facets(collection, pipeline: List[dict], filters: dict) -> Dict[str, list]:
+    """Run the facet counts over the documents `pipeline` yields from `collection`
+
+    Only the first $match can use an index: it narrows on the filters when
+    all of them are set, as every facet then needs one of them.
+    """
+    pipeline = list(pipeline)
+    if filters and len(filters) == len(FACET_FIELDS):
+        pipeline.append({"$match": {"$or": [{field: value} for field, value in filters.items()]}})
+    pipeline.append({"$project": {"_id": 0, **{field: 1 for field in FACET_FIELDS}}})
+
+    facets = {
+        "total": [{"$match": filters}, {"$count": "count"}]
+    }
+    for field in FACET_FIELDS:
+        others = {key: value for key, value in filters.items() if key != field}
+        facets[field] = [
+            {"$match": others},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": DESCENDING, "_id": ASCENDING}}
+        ]
+    pipeline.append({"$facet": facets})
+
+    result = (await collection.aggregate(pipeline).to_list(1))[0]
+    counts = {"total": result["total"][0]["count"] if result["total"] else 0}
+    for field in FACET_FIELDS:
+        counts[field] = [{"value": row["_id"], "count": row["count"]} for row in result[field]]
+    return counts
+
+async def tournament_facets(
+    db: AsyncIOMotorDatabase,
+    search: Optional[str],
+    filters: dict,
+    archive_collection: Optional[str] = None
+) -> Dict[str, list]:
+    """Count tournaments per value of each facet field in one aggregation
+
+    Counts the hot tournaments, or with `archive_collection` the archived
+    ones. Each facet applies the search and every filter except its own, so
+    the counts show what selecting another option would return. The total
+    applies every filter.
+    """
+    collection = archive_collection or "tournaments"
+    if search:
+        terms = query_terms(search)
+        if not terms:
+            return {"total": 0, **{field: [] for field in FACET_FIELDS}}
+        pipeline = _matching_stages(terms, bool(archive_collection)) + _lookup_stages([collection]) + [
+            {"$replaceRoot": {"newRoot": "$tournament"}}
+        ]
+        return await count_facets(db[SEARCH_COLLECTION], pipeline, filters)
+
+    return await count_facets(db[collection], [], filters)
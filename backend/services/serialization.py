@@ -0,0 +1,51 @@
+from fastapi.responses import JSONResponse
+from bson import ObjectId
+from datetime import datetime
+from enum import Enum
+from typing import Any
+import json
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - falls back to the stdlib encoder
+    orjson = None
+
+def bson_default(value: Any) -> Any:
+    """JSON fallback for the BSON types stored in our documents"""
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def _orjson_default(value: Any) -> Any:
+    # Called once per ObjectId, so keep the common case short; binary.hex()
+    # skips the hexlify/decode round trip of ObjectId.__str__
+    if value.__class__ is ObjectId:
+        return value.binary.hex()
+    return bson_default(value)
+
+def dumps(payload: Any) -> bytes:
+    """Serialize raw Mongo documents to compact JSON bytes
+
+    ObjectIds (including those nested in participant arrays) are converted
+    by the encoder itself, so documents can be returned as read from Mongo
+    without first walking them in Python. With orjson installed, datetimes
+    and enums are handled natively and produce the same output as
+    bson_default.
+    """
+    if orjson is not None:
+        return orjson.dumps(payload, default=_orjson_default)
+    return json.dumps(payload, default=bson_default, separators=(",", ":")).encode()
+
+def ndjson_line(doc: dict) -> bytes:
+    """Serialize one raw Mongo document as a newline-terminated JSON line"""
+    return dumps(doc) + b"\n"
+
+class BSONJSONResponse(JSONResponse):
+    """JSON response that accepts raw Mongo documents"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,182 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+from services.database import maintenance_timeout
+from services.archive import ARCHIVE_COLLECTION
+from services.leases import INSTANCE_ID, acquire_lease, release_lease
+from datetime import datetime
+from typing import Optional
+import asyncio
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Single document holding the platform-wide counters
+STATS_COLLECTION = "platform_stats"
+STATS_ID = "platform"
+
+# Lease held by the replica running reconciliation passes
+RECONCILE_LOCK = "stats-reconciliation"
+
+# Recounts per rebuild before giving up on writes racing the counts
+REBUILD_ATTEMPTS = 3
+
+# Statuses counted as "active" on the home page
+ACTIVE_STATUSES = ("registration", "active")
+
+_PRIZE_RE = re.compile(r'\$([0-9,]+)')
+
+def parse_prize_amount(prize: Optional[str]) -> int:
+    """Sum every dollar amount found in a free-form prize string"""
+    total = 0
+    for amount in _PRIZE_RE.findall(prize or ""):
+        try:
+            total += int(amount.replace(',', ''))
+        except ValueError:
+            pass
+    return total
+
+async def _increment(db: AsyncIOMotorDatabase, counters: dict):
+    await db[STATS_COLLECTION].update_one(
+        {"_id": STATS_ID},
+        {"$inc": {**counters, "revision": 1}, "$set": {"updatedAt": datetime.utcnow()}},
+        upsert=True
+    )
+
+async def record_tournament_created(db: AsyncIOMotorDatabase, tournament: dict):
+    """Account for a newly inserted tournament"""
+    counters = {
+        "totalTournaments": 1,
+        "totalPrizeValue": tournament.get("prizeAmount", 0)
+    }
+    if tournament.get("status") in ACTIVE_STATUSES:
+        counters["activeTournaments"] = 1
+    await _increment(db, counters)
+
+async def record_status_change(
+    db: AsyncIOMotorDatabase,
+    old_status: str,
+    new_status: str,
+    count: int = 1
+):
+    """Account for `count` tournaments moving from one status to another"""
+    delta = int(new_status in ACTIVE_STATUSES) - int(old_status in ACTIVE_STATUSES)
+    if delta and count:
+        await _increment(db, {"activeTournaments": delta * count})
+
+async def record_user_registered(db: AsyncIOMotorDatabase):
+    """Account for a newly registered user"""
+    await _increment(db, {"totalPlayers": 1})
+
+async def backfill_prize_amounts(db: AsyncIOMotorDatabase, batch_size: int = 500) -> int:
+    """Parse the prize of tournaments stored before prizeAmount existed"""
+    updated = 0
+    operations = []
+    cursor = db.tournaments.find(
+        {"prizeAmount": {"$exists": False}},
+        {"prize": 1}
+    ).batch_size(batch_size)
+
+    async for tournament in cursor:
+        operations.append(UpdateOne(
+            {"_id": tournament["_id"]},
+            {"$set": {"prizeAmount": parse_prize_amount(tournament.get("prize"))}}
+        ))
+        if len(operations) >= batch_size:
+            await db.tournaments.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        await db.tournaments.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    return updated
+
+async def _count_stats(db: AsyncIOMotorDatabase) -> dict:
+    # Archived tournaments are completed, so they only add to the totals
+    total_prize = 0
+    total_tournaments = 0
+    for collection in (db.tournaments, db[ARCHIVE_COLLECTION]):
+        prize_totals = await collection.aggregate([
+            {"$group": {"_id": None, "total": {"$sum": "$prizeAmount"}}}
+        ]).to_list(1)
+        total_prize += prize_totals[0]["total"] if prize_totals else 0
+        total_tournaments += await collection.count_documents({})
+
+    return {
+        "totalTournaments": total_tournaments,
+        "activeTournaments": await db.tournaments.count_documents({
+            "status": {"$in": list(ACTIVE_STATUSES)}
+        }),
+        "totalPlayers": await db.users.count_documents({}),
+        "totalPrizeValue": total_prize
+    }
+
+async def rebuild_stats(db: AsyncIOMotorDatabase) -> dict:
+    """Recompute every counter from scratch and swap it into the stats document
+
+    Increments landing while the counts run may or may not be in them, so
+    the counters are only replaced if the document's revision, which every
+    increment bumps, is unchanged since before counting. Otherwise it
+    recounts, up to REBUILD_ATTEMPTS times, and leaves the document alone
+    if every attempt raced. Returns the last counts either way.
+    """
+    await backfill_prize_amounts(db)
+
+    for attempt in range(REBUILD_ATTEMPTS):
+        current = await db[STATS_COLLECTION].find_one({"_id": STATS_ID}, {"revision": 1})
+        revision = current.get("revision") if current else None
+
+        counters = await _count_stats(db)
+        counters["updatedAt"] = datetime.utcnow()
+        try:
+            # A missing document matches a null revision and is inserted;
+            # one created meanwhile collides on _id instead
+            result = await db[STATS_COLLECTION].update_one(
+                {"_id": STATS_ID, "revision": revision},
+                {"$set": {**counters, "revision": (revision or 0) + 1}},
+                upsert=True
+            )
+        except DuplicateKeyError:
+            continue
+        if result.matched_count or result.upserted_id is not None:
+            logger.info(f"Rebuilt platform stats: {counters}")
+            return counters
+
+    logger.warning(f"Platform stats changed during each of {REBUILD_ATTEMPTS} rebuilds; left as they are")
+    return counters
+
+async def ensure_stats(db: AsyncIOMotorDatabase):
+    """Build the counters document if it does not exist yet"""
+    if await db[STATS_COLLECTION].count_documents({"_id": STATS_ID}, limit=1) == 0:
+        await rebuild_stats(db)
+
+async def get_stats(db: AsyncIOMotorDatabase) -> dict:
+    """Read the counters document, building it on first use"""
+    stats = await db[STATS_COLLECTION].find_one({"_id": STATS_ID})
+    if stats is None:
+        stats = await rebuild_stats(db)
+    return stats
+
+async def run_reconciliation(db: AsyncIOMotorDatabase, interval_seconds: float, lease_seconds: float):
+    """Periodically rebuild the counters to correct any drift
+
+    Every replica runs this loop; only the holder of the reconciliation
+    lease rebuilds.
+    """
+    try:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                if await acquire_lease(db, RECONCILE_LOCK, INSTANCE_ID, lease_seconds):
+                    with maintenance_timeout():
+                        await rebuild_stats(db)
+            except Exception as e:
+                logger.error(f"Error reconciling platform stats: {e}")
+    finally:
+        try:
+            await release_lease(db, RECONCILE_LOCK, INSTANCE_ID)
+        except Exception:
+            pass
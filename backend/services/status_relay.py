@@ -0,0 +1,111 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import OperationFailure
+from bson import ObjectId
+from typing import Dict, Optional, Tuple
+from services.events import EventBus
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Seconds to wait before reopening a change stream that failed
+WATCH_RETRY_SECONDS = 5
+
+# Server error for change streams on a standalone mongod
+CHANGE_STREAMS_UNSUPPORTED = 40573
+
+# Only status changes are relayed; the winner rides along on completion
+STATUS_PIPELINE = [
+    {"$match": {
+        "operationType": "update",
+        "updateDescription.updatedFields.status": {"$exists": True}
+    }},
+    {"$project": {
+        "documentKey": 1,
+        "updateDescription.updatedFields.status": 1,
+        "updateDescription.updatedFields.winner": 1
+    }}
+]
+
+def status_event(status: str, winner: Optional[ObjectId] = None) -> dict:
+    """Payload of a `status` event"""
+    data = {"status": status}
+    if winner is not None:
+        data["winner"] = str(winner)
+    return data
+
+class StatusRelay:
+    """Publish tournament status changes to this worker's event bus
+
+    Status changes are made by whichever worker holds the scheduler lease or
+    served the request, so every worker runs a relay to reach its own event
+    stream clients. It follows a change stream on `tournaments` where the
+    deployment has them (replica sets and sharded clusters), and otherwise
+    polls every `poll_seconds` the tournaments its clients are watching.
+    """
+
+    def __init__(self, db: AsyncIOMotorDatabase, event_bus: EventBus):
+        self.db = db
+        self.event_bus = event_bus
+        # Last polled (status, winner) per watched tournament
+        self._seen: Dict[str, Tuple[str, Optional[ObjectId]]] = {}
+
+    async def run(self, poll_seconds: float):
+        resume_after = None
+        while True:
+            try:
+                async with self.db.tournaments.watch(STATUS_PIPELINE, resume_after=resume_after) as stream:
+                    async for change in stream:
+                        resume_after = stream.resume_token
+                        fields = change["updateDescription"]["updatedFields"]
+                        self.event_bus.publish(
+                            str(change["documentKey"]["_id"]), "status",
+                            status_event(fields["status"], fields.get("winner"))
+                        )
+            except OperationFailure as e:
+                if e.code == CHANGE_STREAMS_UNSUPPORTED:
+                    logger.info("Change streams unavailable; polling tournament status instead")
+                    break
+                # e.g. the resume point fell off the oplog: start afresh
+                logger.error(f"Error following tournament status changes: {e}")
+                resume_after = None
+            except Exception as e:
+                logger.error(f"Error following tournament status changes: {e}")
+            await asyncio.sleep(WATCH_RETRY_SECONDS)
+
+        while True:
+            try:
+                await self.poll()
+            except Exception as e:
+                logger.error(f"Error polling tournament status: {e}")
+            await asyncio.sleep(poll_seconds)
+
+    async def poll(self) -> int:
+        """Publish status changes of watched tournaments since the last poll
+
+        A tournament is only compared from its second poll on, so clients
+        connecting do not get an event for the status they just loaded.
+        Returns the number of events published.
+        """
+        watched = {
+            name: ObjectId(name) for name in self.event_bus.channel_names()
+            if ObjectId.is_valid(name)
+        }
+        seen = {}
+        if watched:
+            cursor = self.db.tournaments.find(
+                {"_id": {"$in": list(watched.values())}},
+                {"status": 1, "winner": 1}
+            )
+            async for tournament in cursor:
+                seen[str(tournament["_id"])] = (tournament["status"], tournament.get("winner"))
+
+        published = 0
+        for name, current in seen.items():
+            previous = self._seen.get(name)
+            if previous is not None and previous[0] != current[0]:
+                self.event_bus.publish(name, "status", status_event(*current))
+                published += 1
+        # Archived and deleted tournaments and closed channels drop out
+        self._seen = seen
+        return published
@@ -0,0 +1,173 @@
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from datetime import datetime
+from typing import Dict, List, Optional
+from services.archive import ARCHIVE_COLLECTION
+import logging
+
+logger = logging.getLogger(__name__)
+
+# One document per user, keyed by the user's _id
+USER_STATS_COLLECTION = "user_stats"
+
+# Recounts per rebuild before giving up on users whose counters keep changing
+REBUILD_ATTEMPTS = 3
+
+EMPTY_USER_STATS = {
+    "tournamentsCreated": 0,
+    "tournamentsParticipated": 0,
+    "tournamentsWon": 0
+}
+
+async def record_tournament_organized(db: AsyncIOMotorDatabase, user_id: ObjectId):
+    """Account for a tournament created by a user"""
+    await db[USER_STATS_COLLECTION].update_one(
+        {"_id": user_id},
+        {"$inc": {"tournamentsCreated": 1, "revision": 1}, "$set": {"updatedAt": datetime.utcnow()}},
+        upsert=True
+    )
+
+async def record_participations(db: AsyncIOMotorDatabase, user_ids: List[ObjectId]):
+    """Account for users who joined a tournament"""
+    if not user_ids:
+        return
+
+    now = datetime.utcnow()
+    await db[USER_STATS_COLLECTION].bulk_write([
+        UpdateOne(
+            {"_id": user_id},
+            {"$inc": {"tournamentsParticipated": 1, "revision": 1}, "$set": {"updatedAt": now}},
+            upsert=True
+        )
+        for user_id in user_ids
+    ], ordered=False)
+
+async def record_wins(db: AsyncIOMotorDatabase, user_ids: List[ObjectId]):
+    """Account for users who won a tournament"""
+    if not user_ids:
+        return
+
+    now = datetime.utcnow()
+    await db[USER_STATS_COLLECTION].bulk_write([
+        UpdateOne(
+            {"_id": user_id},
+            {"$inc": {"tournamentsWon": 1, "revision": 1}, "$set": {"updatedAt": now}},
+            upsert=True
+        )
+        for user_id in user_ids
+    ], ordered=False)
+
+async def get_user_stats(db: AsyncIOMotorDatabase, user_id: ObjectId) -> dict:
+    """Read a user's materialized counters"""
+    doc = await db[USER_STATS_COLLECTION].find_one({"_id": user_id}) or {}
+    return {key: doc.get(key, default) for key, default in EMPTY_USER_STATS.items()}
+
+async def _count_user_stats(
+    db: AsyncIOMotorDatabase,
+    user_ids: Optional[List[ObjectId]] = None
+) -> Dict[ObjectId, dict]:
+    """Count the tournaments every user, or only the given ones, created, joined and won"""
+    counters = {}
+
+    def add(user_id, key: str, count: int):
+        values = counters.setdefault(user_id, dict(EMPTY_USER_STATS))
+        values[key] += count
+
+    def only(field: str) -> list:
+        return [{"$match": {field: {"$in": user_ids}}}] if user_ids is not None else []
+
+    # Archived tournaments still count towards their users' totals
+    for collection in (db.tournaments, db[ARCHIVE_COLLECTION]):
+        async for row in collection.aggregate(only("organizer") + [
+            {"$group": {"_id": "$organizer", "count": {"$sum": 1}}}
+        ]):
+            add(row["_id"], "tournamentsCreated", row["count"])
+
+        async for row in collection.aggregate(only("participants") + [
+            {"$unwind": "$participants"}
+        ] + only("participants") + [
+            {"$group": {"_id": "$participants", "count": {"$sum": 1}}}
+        ]):
+            add(row["_id"], "tournamentsParticipated", row["count"])
+
+        async for row in collection.aggregate([
+            {"$match": {"winner": {"$exists": True, **({"$in": user_ids} if user_ids is not None else {})}}},
+            {"$group": {"_id": "$winner", "count": {"$sum": 1}}}
+        ]):
+            add(row["_id"], "tournamentsWon", row["count"])
+
+    return counters
+
+async def _swap_user_stats(
+    db: AsyncIOMotorDatabase,
+    revisions: Dict[ObjectId, Optional[int]],
+    counters: Dict[ObjectId, dict],
+    batch_size: int
+) -> List[ObjectId]:
+    """Write counters of users whose revision is unchanged; returns the others
+
+    A missing document matches a null revision and is inserted; one
+    created meanwhile collides on _id instead.
+    """
+    now = datetime.utcnow()
+    user_ids = list(revisions)
+    raced = []
+
+    for start in range(0, len(user_ids), batch_size):
+        batch = user_ids[start:start + batch_size]
+        operations = [
+            UpdateOne(
+                {"_id": user_id, "revision": revisions[user_id]},
+                {"$set": {
+                    **counters.get(user_id, EMPTY_USER_STATS),
+                    "revision": (revisions[user_id] or 0) + 1,
+                    "updatedAt": now
+                }},
+                upsert=True
+            )
+            for user_id in batch
+        ]
+        try:
+            await db[USER_STATS_COLLECTION].bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            if any(error["code"] != 11000 for error in errors):
+                raise
+            raced.extend(batch[error["index"]] for error in errors)
+
+    return raced
+
+async def rebuild_user_stats(db: AsyncIOMotorDatabase, batch_size: int = 500) -> int:
+    """Recompute the counters of every user from tournaments
+
+    Joins, creations and wins keep landing while this counts, so each
+    user's counters are only replaced if the revision their increments
+    bump is unchanged since before counting. Users whose counters changed
+    are recounted, up to REBUILD_ATTEMPTS times in all, and otherwise left
+    as they are. Returns the number of users written.
+    """
+    user_ids = None
+    written = 0
+
+    for attempt in range(REBUILD_ATTEMPTS):
+        query = {"_id": {"$in": user_ids}} if user_ids is not None else {}
+        revisions = {
+            doc["_id"]: doc.get("revision")
+            async for doc in db[USER_STATS_COLLECTION].find(query, {"revision": 1})
+        }
+        counters = await _count_user_stats(db, user_ids)
+        for user_id in counters:
+            revisions.setdefault(user_id, None)
+
+        raced = await _swap_user_stats(db, revisions, counters, batch_size)
+        written += len(revisions) - len(raced)
+        if not raced:
+            break
+        user_ids = raced
+    else:
+        logger.warning(f"User stats of {len(raced)} users changed during each rebuild; left as they are")
+
+    logger.info(f"Rebuilt user stats for {written} users")
+    return written
@@ -54,7 +54,7 @@ const TournamentCard = ({ tournament }) => {
           </div>
           <div className="flex items-center space-x-2 text-slate-600">
             <Users className="h-4 w-4" />
-            <span>{tournament.participants}/{tournament.maxParticipants}</span>
+            <span>{tournament.participantCount}/{tournament.maxParticipants}</span>
           </div>
           <div className="flex items-center space-x-2 text-slate-600">
             <Trophy className="h-4 w-4" />
@@ -25,13 +25,21 @@ const Home = () => {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        // Fetch platform stats
-        const statsResponse = await axios.get(`${API}/stats`);
-        setStats(statsResponse.data);
+        // Fetch platform stats and the featured tournaments in one round trip
+        const response = await axios.post(`${API}/batch/`, {
+          requests: [
+            { id: 'stats', path: '/api/stats' },
+            { id: 'featured', path: '/api/tournaments?status=registration&limit=3' }
+          ]
+        });
+        const [statsResult, featuredResult] = response.data.results;
 
-        // Fetch tournaments for featured section
-        const tournamentsResponse = await axios.get(`${API}/tournaments?status=registration`);
-        setFeaturedTournaments(tournamentsResponse.data.tournaments.slice(0, 3));
+        if (statsResult.status === 200) {
+          setStats(statsResult.body);
+        }
+        if (featuredResult.status === 200) {
+          setFeaturedTournaments(featuredResult.body.tournaments);
+        }
       } catch (error) {
         console.error('Error fetching data:', error);
       } finally {
@@ -206,7 +214,7 @@ const Home = () => {
                   <div className="flex items-center justify-between text-sm text-slate-600">
                     <span className="flex items-center">
                       <Users className="h-4 w-4 mr-1" />
-                      {tournament.participants}/{tournament.maxParticipants}
+                      {tournament.participantCount}/{tournament.maxParticipants}
                     </span>
                     <span className="flex items-center">
                       <Trophy className="h-4 w-4 mr-1" />
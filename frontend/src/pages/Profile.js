@@ -230,7 +230,7 @@ const Profile = () => {
                           <div className="flex items-center gap-4 mt-2 text-sm text-slate-500">
                             <span className="flex items-center gap-1">
                               <Users className="h-3 w-3" />
-                              {tournament.participants}/{tournament.maxParticipants}
+                              {tournament.participantCount}/{tournament.maxParticipants}
                             </span>
                             <span className="flex items-center gap-1">
                               <Calendar className="h-3 w-3" />
@@ -46,6 +46,35 @@ const TournamentDetails = () => {
     fetchTournament();
   }, [id]);
 
+  // Live participant and status updates pushed by the server
+  useEffect(() => {
+    const source = new EventSource(`${API}/tournaments/${id}/events`);
+
+    source.addEventListener('participants', (event) => {
+      const data = JSON.parse(event.data);
+      setTournament((current) => current && {
+        ...current,
+        participantCount: data.participantCount,
+        participants: [
+          ...current.participants,
+          ...data.joined.filter((userId) => !current.participants.includes(userId))
+        ]
+      });
+    });
+
+    source.addEventListener('status', (event) => {
+      const data = JSON.parse(event.data);
+      setTournament((current) => current && { ...current, status: data.status });
+    });
+
+    source.addEventListener('resync', async () => {
+      const response = await axios.get(`${API}/tournaments/${id}`);
+      setTournament(response.data.tournament);
+    });
+
+    return () => source.close();
+  }, [id]);
+
   if (loading) {
     return (
       <div className="text-center py-12">
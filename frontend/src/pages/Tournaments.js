@@ -1,4 +1,4 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { useAuth } from '../context/AuthContext';
 import { Button } from '../components/ui/button';
 import { Input } from '../components/ui/input';
@@ -12,6 +12,7 @@ import axios from 'axios';
 
 const BACKEND_URL = process.env.REACT_APP_BACKEND_URL;
 const API = `${BACKEND_URL}/api`;
+const PAGE_SIZE = 20;
 
 const Tournaments = () => {
   const { isAuthenticated } = useAuth();
@@ -21,35 +22,91 @@ const Tournaments = () => {
   const [selectedStatus, setSelectedStatus] = useState('all');
   const [tournaments, setTournaments] = useState([]);
   const [loading, setLoading] = useState(true);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
+  const [facets, setFacets] = useState(null);
+  // Bumped on every new search so pages of an older one are dropped
+  const requestId = useRef(0);
+  const loadMoreRef = useRef(null);
 
   useEffect(() => {
     fetchTournaments();
   }, [selectedGame, selectedStatus, searchTerm]);
 
+  const filterParams = () => {
+    const params = new URLSearchParams();
+
+    if (selectedGame !== 'all') {
+      params.append('game', selectedGame);
+    }
+    if (selectedStatus !== 'all') {
+      params.append('status', selectedStatus);
+    }
+    if (searchTerm.trim()) {
+      params.append('search', searchTerm.trim());
+    }
+    return params;
+  };
+
   const fetchTournaments = async () => {
+    const id = ++requestId.current;
     try {
       setLoading(true);
-      const params = new URLSearchParams();
-      
-      if (selectedGame !== 'all') {
-        params.append('game', selectedGame);
-      }
-      if (selectedStatus !== 'all') {
-        params.append('status', selectedStatus);
-      }
-      if (searchTerm.trim()) {
-        params.append('search', searchTerm.trim());
-      }
+      setNextCursor(null);
+      const params = filterParams();
+      const pageParams = new URLSearchParams(params);
+      pageParams.append('limit', PAGE_SIZE);
 
-      const response = await axios.get(`${API}/tournaments?${params.toString()}`);
+      const [response, facetsResponse] = await Promise.all([
+        axios.get(`${API}/tournaments?${pageParams.toString()}`),
+        axios.get(`${API}/tournaments/facets?${params.toString()}`).catch(() => null)
+      ]);
+      if (id !== requestId.current) return;
       setTournaments(response.data.tournaments);
+      setNextCursor(response.data.nextCursor);
+      setFacets(facetsResponse ? facetsResponse.data : null);
     } catch (error) {
       console.error('Error fetching tournaments:', error);
     } finally {
-      setLoading(false);
+      if (id === requestId.current) {
+        setLoading(false);
+      }
+    }
+  };
+
+  const loadMore = async () => {
+    if (!nextCursor || loadingMore) return;
+    const id = requestId.current;
+    try {
+      setLoadingMore(true);
+      const params = filterParams();
+      params.append('limit', PAGE_SIZE);
+      params.append('after', nextCursor);
+
+      const response = await axios.get(`${API}/tournaments?${params.toString()}`);
+      if (id !== requestId.current) return;
+      setTournaments(prev => [...prev, ...response.data.tournaments]);
+      setNextCursor(response.data.nextCursor);
+    } catch (error) {
+      console.error('Error loading more tournaments:', error);
+    } finally {
+      setLoadingMore(false);
     }
   };
 
+  // Load the next page when the "load more" button scrolls into view
+  useEffect(() => {
+    const target = loadMoreRef.current;
+    if (!target || !nextCursor || !('IntersectionObserver' in window)) return;
+    const observer = new IntersectionObserver(entries => {
+      if (entries[0].isIntersecting) {
+        loadMore();
+      }
+    }, { rootMargin: '200px' });
+    observer.observe(target);
+    return () => observer.disconnect();
+  }, [nextCursor, loadingMore, loading]);
+
   const statusOptions = [
     { value: 'all', label: 'Todos los Estados' },
     { value: 'registration', label: 'Inscripciones Abiertas' },
@@ -66,7 +123,17 @@ const Tournaments = () => {
   // Tournaments are already filtered by the API
   const filteredTournaments = tournaments;
 
+  // Pages hold only part of the results, so counts come from the facets
+  // endpoint; the loaded pages are the fallback if it fails
   const getStatusCounts = () => {
+    if (facets) {
+      const counts = { all: 0, registration: 0, active: 0, completed: 0 };
+      facets.status.forEach(({ value, count }) => {
+        counts[value] = count;
+        counts.all += count;
+      });
+      return counts;
+    }
     return {
       all: tournaments.length,
       registration: tournaments.filter(t => t.status === 'registration').length,
@@ -76,6 +143,7 @@ const Tournaments = () => {
   };
 
   const statusCounts = getStatusCounts();
+  const resultCount = facets ? facets.total : filteredTournaments.length;
 
   return (
     <div className="space-y-8">
@@ -161,7 +229,7 @@ const Tournaments = () => {
       <div>
         <div className="flex items-center justify-between mb-6">
           <p className="text-slate-600">
-            {filteredTournaments.length} torneo{filteredTournaments.length !== 1 ? 's' : ''} encontrado{filteredTournaments.length !== 1 ? 's' : ''}
+            {resultCount} torneo{resultCount !== 1 ? 's' : ''} encontrado{resultCount !== 1 ? 's' : ''}
           </p>
         </div>
 
@@ -192,11 +260,24 @@ const Tournaments = () => {
             )}
           </div>
         ) : (
-          <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
-            {filteredTournaments.map(tournament => (
-              <TournamentCard key={tournament.id} tournament={tournament} />
-            ))}
-          </div>
+          <>
+            <div className="grid md:grid-cols-2 lg:grid-cols-3 gap-6">
+              {filteredTournaments.map(tournament => (
+                <TournamentCard key={tournament.id} tournament={tournament} />
+              ))}
+            </div>
+            {nextCursor && (
+              <div ref={loadMoreRef} className="flex justify-center mt-8">
+                <Button
+                  variant="outline"
+                  onClick={loadMore}
+                  disabled={loadingMore}
+                >
+                  {loadingMore ? 'Cargando...' : 'Cargar más torneos'}
+                </Button>
+              </div>
+            )}
+          </>
         )}
       </div>
     </div>
@@ -0,0 +1,17 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+os.environ.setdefault("MONGO_URL", "mongodb://localhost:27017")
+os.environ.setdefault("DB_NAME", "tourneyhub_test")
+
+@pytest.fixture
+def db():
+    """A fresh mongomock-motor database per test"""
+    from mongomock_motor import AsyncMongoMockClient
+    return AsyncMongoMockClient()["tourneyhub_test"]
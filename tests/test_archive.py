@@ -0,0 +1,71 @@
+"""Completed-tournament searches and facets must span the archive"""
+from datetime import datetime, timedelta
+import asyncio
+
+from bson import ObjectId
+
+from services.archive import ARCHIVE_COLLECTION, archive_completed, facets_with_archive
+from services.search import SEARCH_COLLECTION, index_tournament, search_tournaments
+
+def tournament(name, status, age_days):
+    created = datetime.utcnow() - timedelta(days=age_days)
+    return {
+        "_id": ObjectId(),
+        "name": name,
+        "game": "Chess",
+        "organizerName": "host",
+        "status": status,
+        "createdAt": created,
+        "updatedAt": created
+    }
+
+async def seed(db):
+    old = tournament("Chess Open 2019", "completed", 400)
+    recent = tournament("Chess Open 2024", "completed", 1)
+    live = tournament("Chess Open Live", "registration", 0)
+    for doc in (old, recent, live):
+        await db.tournaments.insert_one(doc)
+        await index_tournament(db, doc)
+    archived = await archive_completed(db, timedelta(days=90))
+    return old, recent, live, archived
+
+def test_archived_postings_are_kept_and_marked(db):
+    async def run():
+        old, _, _, archived = await seed(db)
+        postings = await db[SEARCH_COLLECTION].find({"tournament": old["_id"]}).to_list(None)
+        return old, archived, postings
+
+    old, archived, postings = asyncio.run(run())
+
+    assert archived == [old["_id"]]
+    assert postings and all(posting.get("archived") for posting in postings)
+
+def test_completed_search_includes_the_archive(db):
+    async def run():
+        old, recent, live, _ = await seed(db)
+        hot, _ = await search_tournaments(db, "chess open", {}, None, 10)
+        history, _ = await search_tournaments(
+            db, "chess open", {"status": "completed"}, None, 10, archive_collection=ARCHIVE_COLLECTION
+        )
+        return (old, recent, live), hot, history
+
+    (old, recent, live), hot, history = asyncio.run(run())
+
+    assert {t["_id"] for t in hot} == {recent["_id"], live["_id"]}
+    assert {t["_id"] for t in history} == {old["_id"], recent["_id"]}
+    assert len(history) == 2
+
+def test_search_facets_count_the_archive_like_the_search(db):
+    async def run():
+        await seed(db)
+        return (
+            await facets_with_archive(db, "chess", {}),
+            await facets_with_archive(db, "chess", {"status": "completed"})
+        )
+
+    unfiltered, completed = asyncio.run(run())
+
+    assert unfiltered["total"] == 2
+    assert {row["value"]: row["count"] for row in unfiltered["status"]} == {"completed": 2, "registration": 1}
+    assert completed["total"] == 2
+    assert completed["game"] == [{"value": "Chess", "count": 2}]
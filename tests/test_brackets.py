@@ -0,0 +1,178 @@
+"""Bracket generation, bye collapsing, Swiss pairing and result propagation"""
+from collections import Counter
+from datetime import datetime, timedelta
+from itertools import combinations
+import asyncio
+
+from bson import ObjectId
+import pytest
+
+from models.Match import BracketFormat, MatchStatus
+from services.brackets import (
+    MATCHES_COLLECTION,
+    default_swiss_rounds,
+    double_elimination,
+    insert_matches,
+    report_result,
+    round_robin,
+    seed_positions,
+    single_elimination,
+    swiss_pairings,
+    swiss_round
+)
+
+SIZES = [2, 3, 5, 8, 13, 64, 128]
+
+def resolve(matches):
+    """Play every match in memory, the better seed (lower index) winning
+
+    Returns (champion, losses per player, number of matches played).
+    Fails if a match never gets both of its players.
+    """
+    by_id = {match["_id"]: match for match in matches}
+    losses = Counter()
+    played = 0
+    champion = None
+
+    while True:
+        ready = [
+            match for match in by_id.values()
+            if match["status"] == MatchStatus.PENDING and None not in match["players"]
+        ]
+        if not ready:
+            break
+        for match in ready:
+            winner, loser = sorted(match["players"])
+            match["winner"] = winner
+            match["status"] = MatchStatus.COMPLETED
+            losses[loser] += 1
+            played += 1
+            for link, player in (("next", winner), ("loserNext", loser)):
+                if match[link]:
+                    by_id[match[link]["match"]]["players"][match[link]["slot"]] = player
+            if not match["next"]:
+                champion = winner
+
+    assert all(match["status"] == MatchStatus.COMPLETED for match in by_id.values())
+    return champion, losses, played
+
+def test_seed_positions_keep_top_seeds_apart():
+    order = seed_positions(8)
+    assert order == [0, 7, 3, 4, 1, 6, 2, 5]
+    # Seeds 0 and 1 are in different halves, 0-3 in different quarters
+    assert {order.index(0) // 4, order.index(1) // 4} == {0, 1}
+    assert len({order.index(seed) // 2 for seed in range(4)}) == 4
+
+@pytest.mark.parametrize("count", SIZES)
+def test_single_elimination_collapses_byes(count):
+    players = list(range(count))
+    matches = single_elimination(players)
+
+    # Every stored match is one two players actually play
+    assert len(matches) == count - 1
+    champion, losses, played = resolve(matches)
+    assert played == count - 1
+    assert champion == 0
+    assert all(losses[player] == 1 for player in players[1:])
+
+def test_single_elimination_gives_byes_to_top_seeds():
+    matches = single_elimination(list(range(5)))
+    first_round = [player for match in matches if match["round"] == 1 for player in match["players"]]
+    # Seeds 0-2 skip the opening round and wait in round two
+    assert sorted(first_round) == [3, 4]
+    waiting = [player for match in matches if match["round"] == 2 for player in match["players"]]
+    assert sorted(player for player in waiting if player is not None) == [0, 1, 2]
+
+@pytest.mark.parametrize("count", SIZES)
+def test_double_elimination_eliminates_after_two_losses(count):
+    players = list(range(count))
+    matches = double_elimination(players)
+
+    assert len(matches) == 2 * count - 2
+    champion, losses, played = resolve(matches)
+    assert played == 2 * count - 2
+    assert champion == 0
+    assert losses[0] == 0
+    assert all(losses[player] == 2 for player in players[1:])
+
+@pytest.mark.parametrize("count", [2, 5, 8, 13])
+def test_round_robin_pairs_everyone_once(count):
+    players = list(range(count))
+    matches = round_robin(players)
+
+    pairs = [frozenset(match["players"]) for match in matches]
+    assert sorted(map(sorted, pairs)) == sorted(map(sorted, map(frozenset, combinations(players, 2))))
+
+    by_round = {}
+    for match in matches:
+        by_round.setdefault(match["round"], []).extend(match["players"])
+    assert all(len(seen) == len(set(seen)) for seen in by_round.values())
+
+def test_swiss_pairing_avoids_rematches_and_repeat_byes():
+    players = list(range(15))
+    rounds = default_swiss_rounds(len(players))
+    assert rounds == 4
+
+    matches = []
+    for round_number in range(1, rounds + 1):
+        new = swiss_round(players, matches, round_number)
+        seen = [player for match in new for player in match["players"] if player is not None]
+        assert sorted(seen) == players
+        for match in new:
+            if match["players"][1] is not None:
+                match["winner"] = min(match["players"])
+                match["status"] = MatchStatus.COMPLETED
+        matches.extend(new)
+
+    pairs = [frozenset(match["players"]) for match in matches if match["players"][1] is not None]
+    assert len(pairs) == len(set(pairs))
+    byes = [match["players"][0] for match in matches if match["players"][1] is None]
+    assert len(byes) == rounds
+    assert len(byes) == len(set(byes))
+
+def test_swiss_pairing_falls_back_to_neighbours_when_every_pair_met():
+    ranked = [0, 1, 2, 3]
+    played = {frozenset(pair) for pair in combinations(ranked, 2)}
+    pairs, bye = swiss_pairings(ranked, played, set())
+    assert pairs == [(0, 1), (2, 3)]
+    assert bye is None
+
+def test_report_result_advances_to_the_champion(db):
+    async def scenario():
+        players = [ObjectId() for _ in range(8)]
+        now = datetime.utcnow()
+        tournament = {
+            "_id": ObjectId(),
+            "status": "active",
+            "participants": players,
+            "bracket": {"format": BracketFormat.SINGLE_ELIMINATION, "players": players},
+            "startDate": now - timedelta(hours=1),
+            "updatedAt": now
+        }
+        await db.tournaments.insert_one(tournament)
+        await insert_matches(db, tournament["_id"], single_elimination(players))
+
+        updates = []
+        outcome = None
+        while True:
+            match = await db[MATCHES_COLLECTION].find_one({
+                "tournament": tournament["_id"],
+                "status": MatchStatus.PENDING,
+                "players": {"$ne": None}
+            })
+            if match is None:
+                break
+            winner = min(match["players"], key=players.index)
+            outcome = await report_result(db, tournament, match, winner)
+            updates.append(len(outcome["updated"]))
+
+        stored = await db.tournaments.find_one({"_id": tournament["_id"]})
+        return players, updates, outcome, stored
+
+    players, updates, outcome, stored = asyncio.run(scenario())
+    assert len(updates) == 7
+    # One write for the result and at most one for the match it feeds
+    assert max(updates) <= 2
+    assert outcome["champion"] == players[0]
+    assert stored["status"] == "completed"
+    assert stored["winner"] == players[0]
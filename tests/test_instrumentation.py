@@ -0,0 +1,26 @@
+"""Per-request stats are updated from Motor's executor threads"""
+from concurrent.futures import ThreadPoolExecutor
+
+from services.instrumentation import MAX_LOGGED_COMMANDS, RequestStats
+
+THREADS = 8
+COMMANDS = 5000
+
+def test_concurrent_commands_are_all_counted():
+    stats = RequestStats(capture=True)
+
+    def run(thread):
+        for i in range(COMMANDS):
+            request_id = thread * COMMANDS + i
+            stats.command_started(request_id, ("find", "tournaments", {}))
+            stats.command_finished(request_id, 0.001)
+            stats.add_offload(0.001)
+
+    with ThreadPoolExecutor(THREADS) as pool:
+        list(pool.map(run, range(THREADS)))
+
+    assert stats.db_calls == THREADS * COMMANDS
+    assert round(stats.db_seconds, 6) == round(THREADS * COMMANDS * 0.001, 6)
+    assert round(stats.offload_seconds, 6) == round(THREADS * COMMANDS * 0.001, 6)
+    assert len(stats.commands) == MAX_LOGGED_COMMANDS
+    assert stats.pending == {}
@@ -0,0 +1,149 @@
+"""Concurrent joins must never overfill a tournament"""
+from datetime import datetime, timedelta
+import asyncio
+
+from bson import ObjectId
+from fastapi import FastAPI
+import httpx
+
+from auth import create_access_token, init_auth, token_data_for
+from routes.tournaments import create_tournaments_router
+from services.participants import bulk_join_filter
+from services.serialization import BSONJSONResponse
+
+PLAYERS = 500
+SLOTS = 128
+
+async def seed(db):
+    now = datetime.utcnow()
+    users = [
+        {
+            "_id": ObjectId(),
+            "username": f"racer{i}",
+            "email": f"racer{i}@example.com",
+            "password": "",
+            "avatar": "",
+            "createdAt": now,
+            "updatedAt": now
+        }
+        for i in range(PLAYERS)
+    ]
+    await db.users.insert_many(users)
+
+    tournament = {
+        "_id": ObjectId(),
+        "name": "Join race",
+        "game": "Chess",
+        "description": "Concurrent join test",
+        "rules": "",
+        "organizer": users[0]["_id"],
+        "organizerName": users[0]["username"],
+        "participants": [],
+        "participantCount": 0,
+        "maxParticipants": SLOTS,
+        "status": "registration",
+        "startDate": now + timedelta(days=2),
+        "endDate": now + timedelta(days=3),
+        "registrationDeadline": now + timedelta(days=1),
+        "prize": "",
+        "prizeAmount": 0,
+        "judges": [],
+        "createdAt": now,
+        "updatedAt": now
+    }
+    await db.tournaments.insert_one(tournament)
+    return users, tournament["_id"]
+
+def create_app(db):
+    init_auth(db)
+    app = FastAPI(default_response_class=BSONJSONResponse)
+    app.include_router(create_tournaments_router(db), prefix="/api")
+    return app
+
+async def race(db):
+    app = create_app(db)
+    users, tournament_id = await seed(db)
+
+    async def join(client, user):
+        token = create_access_token(token_data_for(user))
+        response = await client.post(
+            f"/api/tournaments/{tournament_id}/join",
+            headers={"Authorization": f"Bearer {token}"}
+        )
+        return response.status_code
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        codes = await asyncio.gather(*(join(client, user) for user in users))
+
+    return codes, await db.tournaments.find_one({"_id": tournament_id})
+
+def test_concurrent_joins_fill_exactly_the_capacity(db):
+    # mongomock answers without yielding, so the joins do not interleave
+    # inside Mongo here; benchmarks.join_race runs the same race for real
+    codes, tournament = asyncio.run(race(db))
+
+    assert codes.count(200) == SLOTS
+    assert set(codes) == {200, 400}
+    assert len(tournament["participants"]) == SLOTS
+    assert len(set(tournament["participants"])) == SLOTS
+    assert tournament["participantCount"] == len(tournament["participants"])
+
+async def bulk_after_deadline(db):
+    app = create_app(db)
+    users, tournament_id = await seed(db)
+    await db.tournaments.update_one(
+        {"_id": tournament_id},
+        {"$set": {"registrationDeadline": datetime.utcnow() - timedelta(minutes=1)}}
+    )
+
+    token = create_access_token(token_data_for(users[0]))
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            f"/api/tournaments/{tournament_id}/participants/bulk",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"users": [user["username"] for user in users[1:4]]}
+        )
+
+    # The write itself must refuse too, for deadlines passing mid-request
+    matched = await db.tournaments.find_one(bulk_join_filter(tournament_id, 0))
+    return response, matched, await db.tournaments.find_one({"_id": tournament_id})
+
+def test_bulk_registration_closes_at_the_deadline(db):
+    response, matched, tournament = asyncio.run(bulk_after_deadline(db))
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Registration deadline has passed"
+    assert matched is None
+    assert tournament["participants"] == []
+
+async def bulk_register(db):
+    app = create_app(db)
+    users, tournament_id = await seed(db)
+    token = create_access_token(token_data_for(users[0]))
+    entries = [users[1]["username"], str(users[2]["_id"]), "nobody"]
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.post(
+            f"/api/tournaments/{tournament_id}/participants/bulk",
+            headers={"Authorization": f"Bearer {token}"},
+            json={"users": entries}
+        )
+    return users, tournament_id, response
+
+def test_bulk_registration_returns_the_raw_document_encoded(db):
+    users, tournament_id, response = asyncio.run(bulk_register(db))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [(r["status"], r["userId"]) for r in body["results"]] == [
+        ("added", str(users[1]["_id"])),
+        ("added", str(users[2]["_id"])),
+        ("unknown_user", None)
+    ]
+    assert body["tournament"]["_id"] == str(tournament_id)
+    assert body["tournament"]["organizer"] == str(users[0]["_id"])
+    assert body["tournament"]["participants"] == [str(users[1]["_id"]), str(users[2]["_id"])]
+    assert body["tournament"]["participantCount"] == 2
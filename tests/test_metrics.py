@@ -0,0 +1,32 @@
+"""Metrics must render in the Prometheus 0.0.4 text format"""
+from services.metrics import MetricsRegistry
+
+def test_counter_metadata_names_its_samples():
+    registry = MetricsRegistry()
+    calls = registry.counter("single_flight_calls", "Coalesced reads by outcome", ("name", "outcome"))
+    calls.inc("detail", "executed")
+    calls.inc("detail", "coalesced", amount=2)
+
+    assert registry.render().splitlines() == [
+        "# HELP single_flight_calls_total Coalesced reads by outcome",
+        "# TYPE single_flight_calls_total counter",
+        'single_flight_calls_total{name="detail",outcome="executed"} 1',
+        'single_flight_calls_total{name="detail",outcome="coalesced"} 2'
+    ]
+
+def test_histogram_and_gauge_keep_their_names():
+    registry = MetricsRegistry()
+    registry.histogram("wait_seconds", "Wait time", buckets=(1,)).observe(0.5)
+    registry.gauge("in_flight", "Requests in flight", lambda: 3)
+
+    assert registry.render().splitlines() == [
+        "# HELP wait_seconds Wait time",
+        "# TYPE wait_seconds histogram",
+        'wait_seconds_bucket{le="1"} 1',
+        'wait_seconds_bucket{le="+Inf"} 1',
+        "wait_seconds_sum 0.5",
+        "wait_seconds_count 1",
+        "# HELP in_flight Requests in flight",
+        "# TYPE in_flight gauge",
+        "in_flight 3"
+    ]
@@ -0,0 +1,107 @@
+"""The migration runner applies each version once, in order, under its lease"""
+from datetime import datetime, timedelta
+import asyncio
+
+import pytest
+
+from services import migrations
+from services.leases import LOCKS_COLLECTION
+from services.migrations import (
+    MIGRATIONS_COLLECTION,
+    MIGRATIONS_LOCK,
+    Migration,
+    MigrationError,
+    apply_migrations,
+    pending_migrations
+)
+
+def recording(order, version):
+    async def apply(db):
+        order.append(version)
+    return apply
+
+def test_pending_migrations_apply_once_in_version_order(db):
+    order = []
+    # Listed out of order on purpose; version 2 is already recorded
+    listed = [Migration(version, f"step {version}", recording(order, version)) for version in (3, 1, 4, 2)]
+
+    async def run():
+        await db[MIGRATIONS_COLLECTION].insert_one({"_id": 2})
+        first = await apply_migrations(db, listed)
+        second = await apply_migrations(db, listed)
+        return first, second, await pending_migrations(db, listed), await db[LOCKS_COLLECTION].find_one({"_id": MIGRATIONS_LOCK})
+
+    first, second, pending, lease = asyncio.run(run())
+
+    assert first == [1, 3, 4]
+    assert order == [1, 3, 4]
+    assert second == []
+    assert pending == []
+    assert lease is None
+
+def test_worker_stops_when_its_lease_is_taken_over(db):
+    order = []
+
+    async def slow(db):
+        order.append(1)
+        # The lease expires mid-migration and another worker takes it over
+        await db[LOCKS_COLLECTION].update_one(
+            {"_id": MIGRATIONS_LOCK},
+            {"$set": {"owner": "other-worker", "expiresAt": datetime.utcnow() + timedelta(minutes=5)}}
+        )
+
+    listed = [Migration(1, "slow", slow), Migration(2, "next", recording(order, 2))]
+
+    async def run():
+        with pytest.raises(MigrationError, match="Lost the migrations lease"):
+            await apply_migrations(db, listed)
+        return (
+            await db[MIGRATIONS_COLLECTION].distinct("_id"),
+            await db[LOCKS_COLLECTION].find_one({"_id": MIGRATIONS_LOCK})
+        )
+
+    recorded, lease = asyncio.run(run())
+
+    assert order == [1]
+    assert recorded == [1]
+    # The new holder keeps its lease
+    assert lease["owner"] == "other-worker"
+
+def test_waiting_worker_returns_once_the_holder_finishes(db, monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATION_POLL_SECONDS", 0)
+    order = []
+    listed = [Migration(1, "step", recording(order, 1))]
+
+    async def run():
+        await db[LOCKS_COLLECTION].insert_one({
+            "_id": MIGRATIONS_LOCK,
+            "owner": "other-worker",
+            "expiresAt": datetime.utcnow() + timedelta(minutes=5)
+        })
+
+        async def holder_finishes():
+            await asyncio.sleep(0.05)
+            await db[MIGRATIONS_COLLECTION].insert_one({"_id": 1})
+
+        finishing = asyncio.create_task(holder_finishes())
+        applied = await apply_migrations(db, listed, wait_seconds=5)
+        await finishing
+        return applied
+
+    assert asyncio.run(run()) == []
+    assert order == []
+
+def test_waiting_worker_gives_up_after_its_deadline(db, monkeypatch):
+    monkeypatch.setattr(migrations, "MIGRATION_POLL_SECONDS", 0)
+    listed = [Migration(1, "step", recording([], 1))]
+
+    async def run():
+        await db[LOCKS_COLLECTION].insert_one({
+            "_id": MIGRATIONS_LOCK,
+            "owner": "other-worker",
+            "expiresAt": datetime.utcnow() + timedelta(minutes=5)
+        })
+        with pytest.raises(MigrationError, match="Timed out"):
+            await apply_migrations(db, listed, wait_seconds=0.05)
+
+    asyncio.run(run())
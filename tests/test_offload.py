@@ -0,0 +1,42 @@
+"""The offload queue bound must hold when callers are cancelled"""
+import asyncio
+import threading
+
+from fastapi import HTTPException
+import pytest
+
+from services.offload import BoundedExecutor
+
+def test_cancelled_callers_keep_their_slots_until_the_call_finishes():
+    executor = BoundedExecutor("test", max_workers=1, max_queue=1)
+    release = threading.Event()
+
+    async def run():
+        running = asyncio.create_task(executor.run(release.wait))
+        queued = asyncio.create_task(executor.run(release.wait))
+        await asyncio.sleep(0.05)
+
+        # The running call keeps its worker; the queued one is cancelled
+        # before it starts and gives its slot back
+        running.cancel()
+        queued.cancel()
+        await asyncio.gather(running, queued, return_exceptions=True)
+        await asyncio.sleep(0.05)
+        during = executor.stats()
+
+        with pytest.raises(HTTPException):
+            await asyncio.gather(executor.run(release.wait), executor.run(release.wait))
+
+        release.set()
+        await asyncio.sleep(0.05)
+        return during, executor.stats()
+
+    try:
+        during, after = asyncio.run(run())
+    finally:
+        release.set()
+        executor.shutdown()
+
+    assert (during["inFlight"], during["queued"]) == (1, 0)
+    assert executor.rejected == 1
+    assert (after["inFlight"], after["queued"]) == (0, 0)
@@ -0,0 +1,96 @@
+"""Batch Elo replay must match applying results one by one"""
+from datetime import datetime, timedelta
+import asyncio
+
+from bson import ObjectId
+import numpy as np
+import pytest
+
+from models.Match import MatchStatus
+from services.archive import ARCHIVE_COLLECTION
+from services.brackets import MATCHES_COLLECTION
+from services.ratings import (
+    INITIAL_RATING,
+    RATINGS_COLLECTION,
+    elo_delta,
+    recompute_ratings,
+    replay_elo
+)
+
+def replay_sequential(winners, losers, player_count):
+    ratings = [INITIAL_RATING] * player_count
+    for winner, loser in zip(winners.tolist(), losers.tolist()):
+        delta = elo_delta(ratings[winner], ratings[loser])
+        ratings[winner] += delta
+        ratings[loser] -= delta
+    return ratings
+
+def random_results(seed, count, players):
+    rng = np.random.default_rng(seed)
+    winners = rng.integers(0, players, count)
+    losers = (winners + rng.integers(1, players, count)) % players
+    return winners, losers
+
+@pytest.mark.parametrize("count,players", [(1, 2), (50, 3), (2000, 40), (20000, 5000)])
+def test_replay_matches_sequential(count, players):
+    winners, losers = random_results(count, count, players)
+    expected = replay_sequential(winners, losers, players)
+    np.testing.assert_allclose(replay_elo(winners, losers, players), expected, rtol=0, atol=1e-9)
+
+def test_replay_keeps_rematch_order():
+    # Back-to-back rematches between the same pair, with the winner
+    # alternating, only agree if every result is applied in order
+    winners = np.array([0, 1, 0, 0, 2, 1, 1, 2, 0, 1], dtype=np.int64)
+    losers = np.array([1, 0, 1, 2, 0, 0, 2, 1, 1, 0], dtype=np.int64)
+    expected = replay_sequential(winners, losers, 3)
+    np.testing.assert_allclose(replay_elo(winners, losers, 3), expected, rtol=0, atol=1e-9)
+
+def test_replay_without_results():
+    empty = np.array([], dtype=np.int64)
+    assert replay_elo(empty, empty, 4).tolist() == [INITIAL_RATING] * 4
+
+def test_recompute_replays_completed_matches_in_order(db):
+    chess, go, archived = ObjectId(), ObjectId(), ObjectId()
+    a, b, c = ObjectId(), ObjectId(), ObjectId()
+    start = datetime.utcnow()
+
+    def match(tournament, players, winner, minutes, status=MatchStatus.COMPLETED):
+        return {
+            "_id": ObjectId(),
+            "tournament": tournament,
+            "players": players,
+            "winner": winner,
+            "status": status,
+            "updatedAt": start + timedelta(minutes=minutes)
+        }
+
+    async def run():
+        await db.tournaments.insert_many([
+            {"_id": chess, "game": "Chess", "bracket": "single_elimination"},
+            {"_id": go, "game": "Go", "bracket": "single_elimination"},
+            {"_id": ObjectId(), "game": "Chess"}
+        ])
+        await db[ARCHIVE_COLLECTION].insert_one({"_id": archived, "game": "Chess", "bracket": "swiss"})
+        # Inserted out of completion order; byes and pending matches are skipped
+        await db[MATCHES_COLLECTION].insert_many([
+            match(chess, [b, a], b, 3),
+            match(archived, [a, b], a, 1),
+            match(chess, [a, c], a, 2),
+            match(chess, [c, None], c, 0),
+            match(chess, [b, c], None, 4, MatchStatus.PENDING),
+            match(go, [c, a], c, 5)
+        ])
+        written = await recompute_ratings(db, "Chess")
+        rows = await db[RATINGS_COLLECTION].find({}).to_list(None)
+        return written, {(row["game"], row["player"]): row for row in rows}
+
+    written, rows = asyncio.run(run())
+
+    assert written == 3
+    assert {game for game, _ in rows} == {"Chess"}
+    # a beats b (archived), a beats c, then b beats a
+    expected = replay_sequential(np.array([0, 0, 1]), np.array([1, 2, 0]), 3)
+    for player, i in {a: 0, b: 1, c: 2}.items():
+        assert rows[("Chess", player)]["rating"] == pytest.approx(expected[i])
+    assert (rows[("Chess", a)]["wins"], rows[("Chess", a)]["losses"]) == (2, 1)
+    assert rows[("Chess", c)]["matches"] == 1
@@ -0,0 +1,146 @@
+"""Tournament response cache over a stand-in shared backend"""
+from datetime import datetime, timedelta
+from typing import Any, Optional
+import asyncio
+
+from bson import ObjectId
+from fastapi import FastAPI
+import httpx
+
+from routes.tournaments import create_tournaments_router
+from services.cache import CacheBackend
+from services.response_cache import TournamentResponseCache, _stripe_key
+from services.serialization import BSONJSONResponse
+
+class SharedDictBackend(CacheBackend):
+    """Stand-in for a shared store: every cache built on it sees one state"""
+
+    def __init__(self):
+        self.values = {}
+        self.counters = {}
+
+    async def get(self, key: str) -> Optional[Any]:
+        return self.values.get(key)
+
+    async def set(self, key: str, value: Any, ttl_seconds: Optional[float] = None):
+        self.values[key] = value
+
+    async def delete(self, key: str):
+        self.values.pop(key, None)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+    async def get_counter(self, key: str) -> int:
+        return self.counters.get(key, 0)
+
+def two_tournaments_on_different_stripes():
+    first = str(ObjectId())
+    second = str(ObjectId())
+    while _stripe_key(second) == _stripe_key(first):
+        second = str(ObjectId())
+    return first, second
+
+def test_write_evicts_only_the_written_tournament_and_lists():
+    async def scenario():
+        cache = TournamentResponseCache(SharedDictBackend())
+        written, other = two_tournaments_on_different_stripes()
+        before = (
+            await cache.detail_key(written),
+            await cache.participants_key(written),
+            await cache.detail_key(other),
+            await cache.list_key({"status": "registration"})
+        )
+        await cache.invalidate([ObjectId(written)])
+        after = (
+            await cache.detail_key(written),
+            await cache.participants_key(written),
+            await cache.detail_key(other),
+            await cache.list_key({"status": "registration"})
+        )
+        return before, after
+
+    before, after = asyncio.run(scenario())
+    assert after[0] != before[0]
+    assert after[1] != before[1]
+    assert after[2] == before[2]
+    assert after[3] != before[3]
+
+def test_invalidate_without_ids_evicts_every_detail():
+    async def scenario():
+        cache = TournamentResponseCache(SharedDictBackend())
+        first, second = two_tournaments_on_different_stripes()
+        before = [await cache.detail_key(first), await cache.detail_key(second)]
+        await cache.invalidate()
+        return before, [await cache.detail_key(first), await cache.detail_key(second)]
+
+    before, after = asyncio.run(scenario())
+    assert all(old != new for old, new in zip(before, after))
+
+def test_writes_on_one_worker_invalidate_the_others():
+    async def scenario():
+        backend = SharedDictBackend()
+        writer = TournamentResponseCache(backend)
+        reader = TournamentResponseCache(backend)
+        tournament_id = str(ObjectId())
+
+        key = await reader.detail_key(tournament_id)
+        await reader.set(key, ('"etag"', b"{}"))
+        cached = await reader.get(await reader.detail_key(tournament_id))
+
+        await writer.invalidate([tournament_id])
+        return cached, await reader.get(await reader.detail_key(tournament_id))
+
+    cached, after_write = asyncio.run(scenario())
+    assert cached == ('"etag"', b"{}")
+    assert after_write is None
+
+def test_detail_answers_304_until_the_tournament_changes(db):
+    async def scenario():
+        now = datetime.utcnow()
+        tournament = {
+            "_id": ObjectId(),
+            "name": "Cache Cup",
+            "game": "Chess",
+            "description": "Response cache test",
+            "organizer": ObjectId(),
+            "organizerName": "organizer",
+            "participants": [],
+            "participantCount": 0,
+            "maxParticipants": 8,
+            "status": "registration",
+            "startDate": now + timedelta(days=2),
+            "endDate": now + timedelta(days=3),
+            "registrationDeadline": now + timedelta(days=1),
+            "createdAt": now,
+            "updatedAt": now
+        }
+        await db.tournaments.insert_one(tournament)
+
+        cache = TournamentResponseCache(SharedDictBackend())
+        app = FastAPI(default_response_class=BSONJSONResponse)
+        app.include_router(create_tournaments_router(db, cache), prefix="/api")
+
+        path = f"/api/tournaments/{tournament['_id']}"
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.get(path)
+            etag = first.headers["etag"]
+            unchanged = await client.get(path, headers={"If-None-Match": etag})
+
+            await db.tournaments.update_one(
+                {"_id": tournament["_id"]},
+                {"$set": {"name": "Cache Cup II", "updatedAt": now + timedelta(seconds=1)}}
+            )
+            await cache.invalidate([tournament["_id"]])
+            changed = await client.get(path, headers={"If-None-Match": etag})
+
+        return first, unchanged, changed
+
+    first, unchanged, changed = asyncio.run(scenario())
+    assert first.status_code == 200
+    assert unchanged.status_code == 304
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != first.headers["etag"]
+    assert changed.json()["tournament"]["name"] == "Cache Cup II"
@@ -0,0 +1,67 @@
+"""Stats rebuilds must not lose increments made while they count"""
+import asyncio
+
+from services import stats
+from services.stats import (
+    REBUILD_ATTEMPTS,
+    STATS_COLLECTION,
+    STATS_ID,
+    rebuild_stats,
+    record_user_registered
+)
+
+def test_rebuild_creates_missing_document(db):
+    async def run():
+        await db.users.insert_many([{"username": "a"}, {"username": "b"}])
+        counters = await rebuild_stats(db)
+        return counters, await db[STATS_COLLECTION].find_one({"_id": STATS_ID})
+
+    counters, document = asyncio.run(run())
+
+    assert counters["totalPlayers"] == 2
+    assert document["totalPlayers"] == 2
+    assert document["revision"] == 1
+
+def test_rebuild_recounts_when_an_increment_races(db, monkeypatch):
+    count_stats = stats._count_stats
+    calls = []
+
+    async def racing_count(database):
+        counters = await count_stats(database)
+        if not calls:
+            # A registration lands after the users were counted
+            await database.users.insert_one({"username": "late"})
+            await record_user_registered(database)
+        calls.append(counters)
+        return counters
+
+    async def run():
+        await db.users.insert_one({"username": "early"})
+        await rebuild_stats(db)
+        monkeypatch.setattr(stats, "_count_stats", racing_count)
+        await rebuild_stats(db)
+        return await db[STATS_COLLECTION].find_one({"_id": STATS_ID})
+
+    document = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert document["totalPlayers"] == 2
+
+def test_rebuild_leaves_document_when_every_attempt_races(db, monkeypatch):
+    count_stats = stats._count_stats
+
+    async def always_racing(database):
+        counters = await count_stats(database)
+        await record_user_registered(database)
+        return counters
+
+    async def run():
+        await rebuild_stats(db)
+        monkeypatch.setattr(stats, "_count_stats", always_racing)
+        await rebuild_stats(db)
+        return await db[STATS_COLLECTION].find_one({"_id": STATS_ID})
+
+    document = asyncio.run(run())
+
+    # Increments are kept rather than overwritten by stale counts
+    assert document["totalPlayers"] == REBUILD_ATTEMPTS
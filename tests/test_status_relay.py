@@ -0,0 +1,49 @@
+"""Status changes made by any worker reach this worker's event streams"""
+import asyncio
+
+from bson import ObjectId
+
+from services.events import EventBus, sse_frame
+from services.status_relay import StatusRelay
+
+def test_poll_publishes_status_changes_of_watched_tournaments(db):
+    watched, unwatched = ObjectId(), ObjectId()
+    winner = ObjectId()
+
+    async def run():
+        await db.tournaments.insert_many([
+            {"_id": watched, "status": "registration"},
+            {"_id": unwatched, "status": "registration"}
+        ])
+        bus = EventBus(coalesce_seconds=0)
+        subscriber = bus.subscribe(str(watched))
+        relay = StatusRelay(db, bus)
+
+        # The first poll only records what the client already loaded
+        first = await relay.poll()
+
+        # Another worker moves both tournaments on
+        await db.tournaments.update_many({}, {"$set": {"status": "active"}})
+        second = await relay.poll()
+        # Let the bus flush so the two changes are not coalesced
+        await asyncio.sleep(0.01)
+        await db.tournaments.update_one(
+            {"_id": watched},
+            {"$set": {"status": "completed", "winner": winner}}
+        )
+        third = await relay.poll()
+        unchanged = await relay.poll()
+
+        await asyncio.sleep(0.01)
+        frames = []
+        while not subscriber.queue.empty():
+            frames.append(subscriber.queue.get_nowait())
+        return (first, second, third, unchanged), frames
+
+    counts, frames = asyncio.run(run())
+
+    assert counts == (0, 1, 1, 0)
+    assert frames == [
+        sse_frame("status", {"status": "active"}),
+        sse_frame("status", {"status": "completed", "winner": str(winner)})
+    ]
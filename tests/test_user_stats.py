@@ -0,0 +1,61 @@
+"""User stats rebuilds must not lose increments made while they count"""
+import asyncio
+
+from bson import ObjectId
+
+from services import user_stats
+from services.archive import ARCHIVE_COLLECTION
+from services.user_stats import (
+    USER_STATS_COLLECTION,
+    get_user_stats,
+    rebuild_user_stats,
+    record_participations
+)
+
+def test_rebuild_counts_hot_and_archived_tournaments(db):
+    organizer, player, idle = ObjectId(), ObjectId(), ObjectId()
+
+    async def run():
+        await db.tournaments.insert_one({"organizer": organizer, "participants": [player]})
+        await db[ARCHIVE_COLLECTION].insert_one({
+            "organizer": organizer, "participants": [player, organizer], "winner": player
+        })
+        # A stale document with no tournaments behind it is reset
+        await db[USER_STATS_COLLECTION].insert_one({"_id": idle, "tournamentsCreated": 4})
+        written = await rebuild_user_stats(db)
+        return written, [await get_user_stats(db, user_id) for user_id in (organizer, player, idle)]
+
+    written, (organized, played, reset) = asyncio.run(run())
+
+    assert written == 3
+    assert organized == {"tournamentsCreated": 2, "tournamentsParticipated": 1, "tournamentsWon": 0}
+    assert played == {"tournamentsCreated": 0, "tournamentsParticipated": 2, "tournamentsWon": 1}
+    assert reset == {"tournamentsCreated": 0, "tournamentsParticipated": 0, "tournamentsWon": 0}
+
+def test_rebuild_recounts_users_whose_counters_changed(db, monkeypatch):
+    racer, steady = ObjectId(), ObjectId()
+    count_user_stats = user_stats._count_user_stats
+    calls = []
+
+    async def racing_count(database, user_ids=None):
+        counters = await count_user_stats(database, user_ids)
+        if not calls:
+            # A join lands after the participants were counted
+            await database.tournaments.insert_one({"organizer": ObjectId(), "participants": [racer]})
+            await record_participations(database, [racer])
+        calls.append(user_ids)
+        return counters
+
+    async def run():
+        await db.tournaments.insert_one({"organizer": steady, "participants": [racer]})
+        await record_participations(db, [racer])
+        monkeypatch.setattr(user_stats, "_count_user_stats", racing_count)
+        await rebuild_user_stats(db)
+        return [await get_user_stats(db, user_id) for user_id in (racer, steady)]
+
+    racer_stats, steady_stats = asyncio.run(run())
+
+    # Only the user whose document changed is recounted
+    assert calls == [None, [racer]]
+    assert racer_stats["tournamentsParticipated"] == 2
+    assert steady_stats["tournamentsCreated"] == 1